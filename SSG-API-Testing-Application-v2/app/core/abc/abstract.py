@@ -2,9 +2,25 @@
 This file contains different abstract base classes that form the basis for other request-related classes.
 """
 
+import functools
+import inspect
+import itertools
+
 import requests
+import streamlit as st
 
 from abc import ABC, abstractmethod
+from typing import Any, Callable, TypeVar
+
+from app.utils.async_utils import THREAD_OFFLOADER
+
+T = TypeVar("T")
+
+# source of revision numbers for request info models, which increase every time a field of any model changes
+_REVISIONS = itertools.count(1)
+
+# names of the slots used internally by AbstractRequestInfo, which are not fields of the model
+_INTERNAL_SLOTS = ("__dict__", "__weakref__", "_memo", "_revision", "_parents")
 
 
 class AbstractRequest(ABC):
@@ -34,13 +50,217 @@ class AbstractRequest(ABC):
 
         pass
 
+    async def execute_async(self, *args, **kwargs) -> requests.Response:
+        """
+        Executes the request without blocking the running event loop and returns the response.
+
+        This accepts the same arguments as execute(), and goes through the same pooled sessions and
+        encryption handling as execute() does. The request is still sent by execute() on a worker thread of
+        THREAD_OFFLOADER, so the number of requests in flight at once is capped by the size of its pool, which can
+        be changed with THREAD_OFFLOADER.configure().
+        """
+
+        return await THREAD_OFFLOADER.run(self.execute, *args, **kwargs)
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Converts a field value into a hashable value, such that equal field values are converted into equal hashable
+    values.
+
+    :param value: Field value
+    :return: Hashable value
+    """
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        # values which cannot be hashed, such as uploaded files, do not contribute to the hash
+        return type(value).__name__
+
+
+@functools.cache
+def _slot_names(cls: type) -> tuple[str, ...]:
+    """
+    Returns the names of every slot declared along the class hierarchy of a class.
+
+    :param cls: Class to inspect
+    :return: Tuple of slot names, from the base class down to the class itself
+    """
+
+    names = []
+
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+
+    return tuple(name for name in names if name not in _INTERNAL_SLOTS)
+
+
+def memoized(method: Callable[..., T]) -> Callable[..., T]:
+    """
+    Decorator for the validate() and payload() methods of request info models, which reuses the result of a
+    previous call with the same arguments until a field of the model, or of a model nested within it, changes.
+
+    Only results which cannot be modified by the caller are reused: JSON strings, and the errors and warnings returned
+    by validate(), which are kept as tuples and handed out as fresh lists. Payload dictionaries are rebuilt on every
+    call, as building them is cheaper than copying them, and callers are free to modify them, so calls to payload()
+    without as_json_str go straight to the method.
+
+    :param method: Method to memoize
+    :return: Memoized method
+    """
+
+    name = method.__qualname__
+    parameters = list(inspect.signature(method).parameters)
+
+    # position of the as_json_str argument after self, if the method takes one
+    json_index = parameters.index("as_json_str") - 1 if "as_json_str" in parameters else None
+
+    @functools.wraps(method)
+    def wrapper(self: "AbstractRequestInfo", *args, **kwargs):
+        if json_index is not None and not (args[json_index] if len(args) > json_index else
+                                           kwargs.get("as_json_str", False)):
+            return method(self, *args, **kwargs)
+
+        # only payloads depend on the session state
+        fields = type(self).SESSION_FIELDS if json_index is not None else ()
+        session = tuple(st.session_state[field] if field in st.session_state else None
+                        for field in fields) if len(fields) > 0 else ()
+        state = (getattr(self, "_revision", 0), session)
+        key = (name, args, tuple(sorted(kwargs.items())) if len(kwargs) > 0 else ())
+        memo = getattr(self, "_memo", None)
+
+        if memo is None:
+            memo = {}
+            object.__setattr__(self, "_memo", memo)
+
+        entry = memo.get(key)
+
+        if entry is not None and entry[0] == state:
+            return entry[1] if isinstance(entry[1], str) else tuple(list(item) for item in entry[1])
+
+        result = method(self, *args, **kwargs)
+
+        if isinstance(result, str):
+            memo[key] = (state, result)
+        elif isinstance(result, tuple) and all(isinstance(item, list) for item in result):
+            memo[key] = (state, tuple(tuple(item) for item in result))
+
+        return result
+
+    wrapper.memoized = True
+    return wrapper
+
+
+@functools.cache
+def _is_model(cls: type) -> bool:
+    """Returns True if instances of the class are request info models, which may be nested within other models"""
+
+    return issubclass(cls, AbstractRequestInfo)
+
+
+def _tracked_setattr(self: "AbstractRequestInfo", name: str, value: Any) -> None:
+    """
+    Sets an attribute of a model with memoized methods, marking the model as changed if the attribute is a field,
+    and registering the model as the parent of any model assigned to the field.
+    """
+
+    object.__setattr__(self, name, value)
+
+    if name in _INTERNAL_SLOTS:
+        return
+
+    if type(value) is list or type(value) is tuple:
+        self._changed(*[item for item in value if _is_model(type(item))])
+    elif _is_model(type(value)):
+        self._changed(value)
+    else:
+        self._changed()
+
 
 class AbstractRequestInfo(ABC):
     """
     Abstract class used to represent the collection of information to pass into the
     different APIs
+
+    Subclasses that are created in large numbers declare their fields in __slots__, so that their instances do not
+    carry a per-instance __dict__, and can be hashed by the values of those fields.
+
+    Models whose validate() or payload() methods are decorated with memoized() track every change to their fields,
+    so that those methods are only recomputed after a field changes. A change to a model also counts as a change to
+    every model it is nested in. Methods which modify a field in place, such as appending to a list, must call
+    _changed() after doing so, passing in any model added. Models without memoized methods, such as those created in
+    bulk, do not track changes, and setting their fields costs no more than on a plain object.
     """
 
+    __slots__ = ("_memo", "_revision", "_parents")
+
+    # keys of the session state which the payload of the model depends on, which are part of its memo
+    SESSION_FIELDS: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if getattr(cls.validate, "memoized", False) or getattr(cls.payload, "memoized", False):
+            cls.__setattr__ = _tracked_setattr
+
+    def _changed(self, *children: "AbstractRequestInfo") -> None:
+        """
+        Marks the model, and every model it is nested in, as changed.
+
+        :param children: Models which were added to a field of the model, whose changes are tracked from now on
+        """
+
+        for child in children:
+            parents = getattr(child, "_parents", None)
+
+            if parents is None:
+                object.__setattr__(child, "_parents", [self])
+            elif not any(parent is self for parent in parents):
+                parents.append(self)
+
+        revision = next(_REVISIONS)
+        pending = [self]
+        seen = set()
+
+        while len(pending) > 0:
+            model = pending.pop()
+
+            if id(model) not in seen:
+                seen.add(id(model))
+                object.__setattr__(model, "_revision", revision)
+                pending.extend(getattr(model, "_parents", ()))
+
+    def __getstate__(self):
+        # the memo and the parents of a model are not part of its value, so copies of the model start without them
+        instance, slots = super().__getstate__()
+        return instance, {name: value for name, value in (slots or {}).items() if name not in _INTERNAL_SLOTS}
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    @property
+    def __dict__(self) -> dict[str, Any]:
+        """Returns a snapshot of the fields declared in __slots__, so that vars() still works on slotted subclasses"""
+
+        return {name: getattr(self, name) for name in _slot_names(type(self)) if hasattr(self, name)}
+
+    def _fields(self) -> tuple:
+        """Returns the hashable values of every field declared in __slots__"""
+
+        return tuple(_freeze(getattr(self, name, None)) for name in _slot_names(type(self)))
+
     @abstractmethod
     def __repr__(self):
         pass
@@ -2,6 +2,8 @@
 Contains a class used for querying for assessment records.
 """
 
+import copy
+
 import requests
 import streamlit as st
 
@@ -9,6 +11,8 @@ from app.core.models.assessments import SearchAssessmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.pagination_utils import decrypt_page, PageIterator
+from app.utils.retry_utils import idempotent
 
 
 class SearchAssessment(AbstractRequest):
@@ -16,6 +20,9 @@ class SearchAssessment(AbstractRequest):
 
     _TYPE: HttpMethod = HttpMethod.POST
 
+    # largest number of records the API returns in a page
+    MAX_PAGE_SIZE: int = 100
+
     def __init__(self, search_info: SearchAssessmentInfo):
         super().__init__()
         self.req: HTTPRequestBuilder = None
@@ -46,7 +53,43 @@ class SearchAssessment(AbstractRequest):
         """
         Executes the HTTP request and returns the response object.
 
+        Searching does not modify any records, so the request is retried on transient failures.
+
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        return self.req.post_encrypted(encryption_key, cert_pem, key_pem, retry_if=idempotent)
+
+    @staticmethod
+    def iterate(search_info: SearchAssessmentInfo, encryption_key: str, cert_pem: str, key_pem: str,
+                page_size: int = MAX_PAGE_SIZE, max_workers: int = PageIterator.MAX_WORKERS) -> PageIterator[dict]:
+        """
+        Searches for assessment records across every page of results, starting from the page set in search_info.
+
+        The next page is fetched while the current page is being consumed, and once the total number of records is
+        known, up to max_workers pages are fetched in parallel. Iteration stops fetching pages as soon as the caller
+        stops consuming records.
+
+        :param search_info: SearchAssessmentInfo object containing the search criteria. It is not modified
+        :param encryption_key: Encryption key used to encrypt the requests and decrypt the responses
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param page_size: Number of records to fetch in each page
+        :param max_workers: Number of pages fetched in parallel once the total number of records is known
+        :return: PageIterator which yields the decrypted assessment records
+        """
+
+        if not isinstance(page_size, int) or not 1 <= page_size <= SearchAssessment.MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be an integer between 1 and {SearchAssessment.MAX_PAGE_SIZE}!")
+
+        criteria = copy.copy(search_info)
+        criteria.pageSize = page_size
+
+        def prepare(page: int) -> SearchAssessment:
+            criteria.page = page
+            return SearchAssessment(criteria)
+
+        def send(request: SearchAssessment) -> tuple[list[dict], int | None]:
+            return decrypt_page(request.execute(encryption_key, cert_pem, key_pem), encryption_key)
+
+        return PageIterator(prepare, send, page_size, first_page=search_info.page or 0, max_workers=max_workers)
@@ -9,6 +9,7 @@ from app.core.models.assessments import UpdateVoidAssessmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.cache_utils import RESPONSE_CACHE
 
 
 class UpdateVoidAssessment(AbstractRequest):
@@ -51,4 +52,9 @@ class UpdateVoidAssessment(AbstractRequest):
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        response = self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+
+        # cached views of the record served by this endpoint are now stale
+        RESPONSE_CACHE.invalidate(self.req.endpoint)
+
+        return response
@@ -0,0 +1,451 @@
+"""
+Contains classes used for uploading the attendance of every trainee for every session of a course run at once, from
+a session-by-trainee attendance matrix.
+"""
+
+import csv
+import json
+
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+from app.core.abc.abstract import AbstractRequest
+from app.core.attendance.upload_course_session_attendance import UploadCourseSessionAttendance
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.constants import Attendance, IdType, SurveyLanguage
+from app.core.models.attendance import UploadAttendanceInfo
+from app.utils.batch_utils import BatchExecutor, BatchResult
+from app.utils.job_utils import JobJournal, ResumableJob
+from app.utils.roster_utils import read_roster
+
+
+class AttendanceRecord:
+    """Encapsulates the outcome of uploading the attendance of a single trainee for a single session"""
+
+    # outcomes of a record
+    PENDING: str = "PENDING"
+    UPLOADED: str = "UPLOADED"
+    FAILED: str = "FAILED"
+    INVALID: str = "INVALID"
+    SKIPPED: str = "SKIPPED"
+
+    def __init__(self, line: int, trainee_id: str | None, session_id: str, status: Attendance | None, outcome: str,
+                 error: str = None):
+        """
+        Initialises the record.
+
+        :param line: Line number of the trainee within the matrix
+        :param trainee_id: ID of the trainee
+        :param session_id: ID of the session
+        :param status: Attendance status requested for the trainee, or None if the cell was empty or invalid
+        :param outcome: Outcome of the upload
+        :param error: Reason why the attendance could not be uploaded, if any
+        """
+
+        self.line = line
+        self.trainee_id = trainee_id
+        self.session_id = session_id
+        self.status = status
+        self.outcome = outcome
+        self.error = error
+
+    def __repr__(self):
+        return f"AttendanceRecord(trainee={self.trainee_id}, session={self.session_id}, outcome={self.outcome})"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def row(self) -> dict[str, Any]:
+        """Returns the record as a row of the reconciliation report"""
+
+        return {
+            "line": self.line,
+            "traineeId": self.trainee_id or "",
+            "sessionId": self.session_id,
+            "status": self.status.value[1] if self.status is not None else "",
+            "outcome": self.outcome,
+            "error": self.error or ""
+        }
+
+
+class AttendanceReconciliation:
+    """
+    Reconciliation report of a bulk attendance upload, which accounts for every cell of the attendance matrix:
+    whether its attendance was uploaded, was rejected by the API, could not be sent as it was invalid, or was
+    skipped as the cell was empty.
+    """
+
+    # column names of the report
+    COLUMNS: tuple[str, ...] = ("line", "traineeId", "sessionId", "status", "outcome", "error")
+
+    def __init__(self):
+        self.records: list[AttendanceRecord] = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record: AttendanceRecord) -> None:
+        """
+        Adds a record to the report.
+
+        :param record: AttendanceRecord to add
+        """
+
+        self.records.append(record)
+
+    def summary(self) -> dict[str, int]:
+        """
+        Returns the number of records with each outcome.
+
+        :return: Mapping of outcome to the number of records with that outcome
+        """
+
+        counts = {outcome: 0 for outcome in (AttendanceRecord.PENDING, AttendanceRecord.UPLOADED,
+                                             AttendanceRecord.FAILED, AttendanceRecord.INVALID,
+                                             AttendanceRecord.SKIPPED)}
+
+        for record in self.records:
+            counts[record.outcome] += 1
+
+        return counts
+
+    def by_session(self) -> dict[str, dict[str, int]]:
+        """
+        Returns the number of records with each outcome for every session, in the order of the sessions in the
+        matrix.
+
+        :return: Mapping of session ID to the number of records with each outcome
+        """
+
+        sessions: dict[str, dict[str, int]] = {}
+
+        for record in self.records:
+            counts = sessions.setdefault(record.session_id, {})
+            counts[record.outcome] = counts.get(record.outcome, 0) + 1
+
+        return sessions
+
+    def discrepancies(self) -> list[AttendanceRecord]:
+        """
+        Returns the records of every cell whose attendance is not reflected by the API, i.e. those which failed,
+        were invalid, or were never uploaded as the upload was interrupted.
+
+        :return: List of AttendanceRecord objects
+        """
+
+        return [record for record in self.records
+                if record.outcome in (AttendanceRecord.PENDING, AttendanceRecord.FAILED, AttendanceRecord.INVALID)]
+
+    def rows(self) -> list[dict[str, Any]]:
+        """Returns every record as a row of the report, in the order of the cells in the matrix"""
+
+        return [record.row() for record in self.records]
+
+    def to_csv(self, destination: str | TextIO) -> None:
+        """
+        Writes the report to a CSV file.
+
+        :param destination: Path to the CSV file, or a text file-like object
+        """
+
+        if isinstance(destination, str):
+            with open(destination, "w", encoding="utf-8", newline="") as file:
+                self.to_csv(file)
+
+            return
+
+        writer = csv.DictWriter(destination, fieldnames=AttendanceReconciliation.COLUMNS)
+        writer.writeheader()
+        writer.writerows(self.rows())
+
+
+class BulkAttendanceUpload:
+    """
+    Class used for uploading the attendance of a whole course run from a session-by-trainee attendance matrix.
+
+    Each row of the matrix describes a trainee, using the columns in TRAINEE_COLUMNS, and every other column is
+    taken to be a session ID, whose cells hold the attendance status of the trainee for that session, either as a
+    code (e.g. "1") or a description (e.g. "Confirmed"). Empty cells are skipped. The attendance for every non-empty
+    cell is uploaded through UploadCourseSessionAttendance on a BatchExecutor, and so is paced by the rate limiter
+    shared by every request in the application.
+    """
+
+    # mapping of the columns of the matrix which describe the trainee to the properties of UploadAttendanceInfo
+    TRAINEE_COLUMNS: dict[str, str] = {
+        "traineeId": "trainee_id",
+        "traineeName": "trainee_name",
+        "traineeEmail": "trainee_email",
+        "traineeIdType": "trainee_id_type",
+        "mobile": "contactNumber_mobile",
+        "areaCode": "contactNumber_areacode",
+        "countryCode": "contactNumber_countryCode",
+        "numberOfHours": "numberOfHours",
+        "surveyLanguage": "surveyLanguage_code"
+    }
+
+    # properties of UploadAttendanceInfo which hold enums or numbers, as every other property holds a string
+    ENUM_FIELDS: dict[str, type] = {"trainee_id_type": IdType, "surveyLanguage_code": SurveyLanguage}
+    INT_FIELDS: frozenset[str] = frozenset({"contactNumber_areacode", "contactNumber_countryCode"})
+    FLOAT_FIELDS: frozenset[str] = frozenset({"numberOfHours"})
+
+    def __init__(self, run_id: str, course_reference_number: str, corppass_id: str, executor: BatchExecutor = None,
+                 request_factory: Callable[[str, UploadAttendanceInfo], AbstractRequest] =
+                 UploadCourseSessionAttendance):
+        """
+        Initialises the upload.
+
+        :param run_id: Run ID of the course run
+        :param course_reference_number: Course reference number of the course run
+        :param corppass_id: CorpPass ID of the user uploading the attendance
+        :param executor: BatchExecutor used to upload the attendance. If not specified, BatchExecutor.adaptive()
+                         is used
+        :param request_factory: Function which creates the request that uploads the attendance of a trainee
+        """
+
+        if not isinstance(run_id, str) or len(run_id) == 0:
+            raise ValueError("Run ID must be a non-empty string!")
+
+        if not isinstance(course_reference_number, str) or len(course_reference_number) == 0:
+            raise ValueError("Course Reference Number must be a non-empty string!")
+
+        if not isinstance(corppass_id, str) or len(corppass_id) == 0:
+            raise ValueError("CorpPass ID must be a non-empty string!")
+
+        self.run_id = run_id
+        self.course_reference_number = course_reference_number
+        self.corppass_id = corppass_id
+        self.executor = executor if executor is not None else BatchExecutor.adaptive()
+        self.request_factory = request_factory
+
+    @staticmethod
+    def _enum(enum: type, value: Any) -> Any:
+        """
+        Looks up a member of an enum whose values are (code, description) tuples by its code, description or name.
+
+        :param enum: Enum to look up
+        :param value: Code, description or name of the member
+        :return: Member of the enum
+        """
+
+        text = str(int(value) if isinstance(value, float) and value.is_integer() else value).strip().lower()
+
+        for member in enum:
+            if text in (member.value[0].lower(), member.value[1].lower(), member.name.lower()):
+                return member
+
+        raise ValueError(f"{value} is not a valid {enum.__name__}!")
+
+    @staticmethod
+    def _convert(field: str, value: Any) -> Any:
+        """
+        Converts the value of a cell into the type expected by a property of UploadAttendanceInfo.
+
+        :param field: Name of the property
+        :param value: Value of the cell
+        :return: Converted value
+        """
+
+        if field in BulkAttendanceUpload.ENUM_FIELDS:
+            return BulkAttendanceUpload._enum(BulkAttendanceUpload.ENUM_FIELDS[field], value)
+
+        try:
+            if field in BulkAttendanceUpload.INT_FIELDS:
+                return int(float(value)) if isinstance(value, str) and "." in value else int(value)
+
+            if field in BulkAttendanceUpload.FLOAT_FIELDS:
+                return float(value)
+        except ValueError:
+            raise ValueError(f"{value} is not a number!")
+
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+
+        return value if isinstance(value, str) else str(value)
+
+    @staticmethod
+    def _frame_rows(frame: Any) -> Iterator[tuple[int, dict[str, Any]]]:
+        """
+        Reads the rows of a pandas DataFrame in the same shape as read_roster(), treating missing values as empty
+        cells.
+
+        :param frame: pandas DataFrame
+        :return: Iterator of the line number and the row of every row
+        """
+
+        columns = [str(column).strip() for column in frame.columns]
+
+        for line, values in enumerate(frame.itertuples(index=False, name=None), start=2):
+            row = {}
+
+            for column, value in zip(columns, values):
+                # NaN and NaT are the only values which are not equal to themselves
+                if value is None or value != value or (isinstance(value, str) and len(value.strip()) == 0):
+                    value = None
+                elif isinstance(value, str):
+                    value = value.strip()
+
+                row[column] = value
+
+            yield line, row
+
+    def _rows(self, source: Any, sheet: str = None) -> Iterator[tuple[int, dict[str, Any]]]:
+        """
+        Reads the rows of the matrix from a file or a DataFrame.
+
+        :param source: Path to a CSV or Excel file, a file-like object, a pandas DataFrame, or an iterable of
+                       dictionaries mapping column names to cell values
+        :param sheet: Name of the worksheet to read, if the matrix is an Excel workbook
+        :return: Iterator of the line number and the row of every row
+        """
+
+        if hasattr(source, "itertuples") and hasattr(source, "columns"):
+            return BulkAttendanceUpload._frame_rows(source)
+
+        if isinstance(source, str) or hasattr(source, "read"):
+            return read_roster(source, sheet=sheet)
+
+        if isinstance(source, Iterable):
+            return enumerate(source, start=2)
+
+        raise ValueError("Attendance matrix must be a path, a file-like object, a DataFrame or an iterable of rows!")
+
+    def build(self, line: int, row: dict[str, Any], report: AttendanceReconciliation) \
+            -> Iterator[tuple[AttendanceRecord, UploadAttendanceInfo]]:
+        """
+        Builds the attendance of a trainee for every session in a row of the matrix, adding a record of every cell to
+        the report. Cells which are empty or cannot be uploaded are given their final outcome straight away.
+
+        :param line: Line number of the row
+        :param row: Row of the matrix, mapping column names to cell values
+        :param report: AttendanceReconciliation to add the records to
+        :return: Iterator of the pending record and the attendance of every cell which can be uploaded
+        """
+
+        trainee_id = row.get("traineeId")
+        trainee_id = str(trainee_id) if trainee_id is not None else None
+        sessions = [column for column in row if column not in BulkAttendanceUpload.TRAINEE_COLUMNS]
+
+        # the trainee's details are shared by every session, so problems with them fail every session of the row
+        trainee_error = None
+        trainee = {}
+
+        for column, field in BulkAttendanceUpload.TRAINEE_COLUMNS.items():
+            if row.get(column) is not None:
+                try:
+                    trainee[field] = BulkAttendanceUpload._convert(field, row[column])
+                except ValueError as ex:
+                    trainee_error = f"{column}: {ex}"
+
+        for session_id in sessions:
+            cell = row[session_id]
+
+            if cell is None:
+                report.add(AttendanceRecord(line, trainee_id, session_id, None, AttendanceRecord.SKIPPED))
+                continue
+
+            try:
+                status = BulkAttendanceUpload._enum(Attendance, cell)
+            except ValueError as ex:
+                report.add(AttendanceRecord(line, trainee_id, session_id, None, AttendanceRecord.INVALID, str(ex)))
+                continue
+
+            record = AttendanceRecord(line, trainee_id, session_id, status, AttendanceRecord.INVALID)
+            report.add(record)
+
+            if trainee_error is not None:
+                record.error = trainee_error
+                continue
+
+            info = UploadAttendanceInfo()
+            info.sessionId = session_id
+            info.status_code = status
+            info.referenceNumber = self.course_reference_number
+            info.corppassId = self.corppass_id
+
+            try:
+                for field, value in trainee.items():
+                    setattr(info, field, value)
+            except ValueError as ex:
+                record.error = str(ex)
+                continue
+
+            errors, _ = info.validate()
+
+            if len(errors) > 0:
+                record.error = " ".join(errors)
+                continue
+
+            record.outcome = AttendanceRecord.PENDING
+            yield record, info
+
+    def _requests(self, rows: Iterator[tuple[int, dict[str, Any]]], report: AttendanceReconciliation,
+                  pending: dict[str, AttendanceRecord]) -> Iterator[tuple[str, AbstractRequest]]:
+        """
+        Lazily turns the rows of the matrix into requests.
+
+        :param rows: Iterator of the line number and the row of every row of the matrix
+        :param report: AttendanceReconciliation to add the records to
+        :param pending: Dictionary which is filled with the record of every request yielded, keyed by the key of the
+                        cell
+        :return: Iterator of the key of the cell and the request of every cell which can be uploaded
+        """
+
+        for line, row in rows:
+            for record, info in self.build(line, row, report):
+                key = f"{line}:{record.trainee_id}:{record.session_id}"
+                pending[key] = record
+                yield key, self.request_factory(self.run_id, info)
+
+    @staticmethod
+    def _error(result: BatchResult, encryption_key: str) -> str:
+        """
+        Returns the reason why an upload failed.
+
+        :param result: BatchResult of the failed upload
+        :param encryption_key: Encryption key used to decrypt the response
+        :return: Reason for the failure
+        """
+
+        if result.error is not None:
+            return f"{type(result.error).__name__}: {result.error}"
+
+        try:
+            error = Cryptography.decrypt(encryption_key, json.loads(result.response.text)["error"]).decode("utf-8")
+        except Exception:
+            error = result.response.text
+
+        return f"HTTP {result.status_code}: {error}"
+
+    def run(self, source: Any, encryption_key: str, cert_pem: str, key_pem: str,
+            sheet: str = None, journal: JobJournal = None) -> AttendanceReconciliation:
+        """
+        Uploads the attendance of every non-empty cell of the matrix, and reconciles the matrix against the outcome
+        of every upload.
+
+        :param source: Path to a CSV or Excel file, a file-like object, a pandas DataFrame, or an iterable of
+                       dictionaries mapping column names to cell values
+        :param encryption_key: Encryption key used to encrypt the requests and decrypt the responses
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param sheet: Name of the worksheet to read, if the matrix is an Excel workbook
+        :param journal: JobJournal to record the state of every upload in. Cells which the journal shows were
+                        uploaded by an earlier run are not uploaded again
+        :return: AttendanceReconciliation of the upload
+        """
+
+        report = AttendanceReconciliation()
+        pending: dict[str, AttendanceRecord] = {}
+        items = self._requests(self._rows(source, sheet), report, pending)
+
+        def describe(result: BatchResult) -> str | None:
+            return None if result.ok else BulkAttendanceUpload._error(result, encryption_key)
+
+        for outcome in ResumableJob(journal, self.executor).run(items, describe, encryption_key, cert_pem, key_pem):
+            record = pending.pop(outcome.key)
+
+            if outcome.state == JobJournal.CONFIRMED:
+                record.outcome = AttendanceRecord.UPLOADED
+            else:
+                record.outcome = AttendanceRecord.FAILED
+                record.error = outcome.detail
+
+        return report
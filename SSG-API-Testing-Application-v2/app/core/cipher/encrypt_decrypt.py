@@ -1,6 +1,14 @@
+import functools
+import hashlib
+import os
+import threading
+
 import streamlit as st
 
 from base64 import b64encode, b64decode
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, TextIO
 from cryptography.hazmat.primitives.ciphers import Cipher
 from cryptography.hazmat.primitives.ciphers.algorithms import AES
 from cryptography.hazmat.primitives.ciphers.modes import CBC
@@ -8,6 +16,165 @@ from cryptography.hazmat.primitives.padding import PKCS7
 from cryptography.hazmat.backends import default_backend
 
 
+class CipherResult:
+    """Encapsulates the outcome of encrypting or decrypting a single item within a batch"""
+
+    def __init__(self, index: int, value: bytes | str | None = None, error: Exception | None = None):
+        """
+        Initialises the result.
+
+        :param index: Position of the item within the batch
+        :param value: Ciphertext or plaintext of the item, if successful
+        :param error: Exception raised while encrypting or decrypting the item, if any
+        """
+
+        self.index = index
+        self.value = value
+        self.error = error
+
+    def __repr__(self):
+        return f"CipherResult(index={self.index}, ok={self.ok})"
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    def ok(self) -> bool:
+        """True if the item was encrypted or decrypted successfully"""
+
+        return self.error is None
+
+
+def _apply(func: Callable[[str, bytes | str, bool], bytes | str], key: str, item: bytes | str,
+           return_bytes: bool) -> tuple[bytes | str | None, Exception | None]:
+    """
+    Encrypts or decrypts a single item of a batch, capturing any exception raised. This is defined at the module
+    level so that it can be sent to worker processes.
+
+    :param func: Cryptography.encrypt or Cryptography.decrypt
+    :param key: Key to encrypt or decrypt the item with
+    :param item: Item to encrypt or decrypt
+    :param return_bytes: If True, the output will be returned as a bytes object
+    :return: Tuple of the output and the exception raised, one of which is None
+    """
+
+    try:
+        return func(key, item, return_bytes), None
+    except Exception as ex:
+        return None, ex
+
+
+class CiphertextCache:
+    """
+    Thread-safe, size-bounded cache of ciphertexts, keyed by the digests of the encryption key and the plaintext.
+
+    As the SSG APIs use a fixed initialisation vector, encrypting the same plaintext with the same key always gives
+    the same ciphertext, so repeated encryptions of a payload (e.g. displaying it before sending it, or sending it
+    again on a retry) can reuse the first ciphertext. Neither the key nor the plaintext is held by the cache, and
+    as the key forms part of every cache key, ciphertexts produced with a rotated key are never returned.
+    """
+
+    # maximum number of ciphertexts to keep in the cache
+    MAX_ENTRIES: int = 512
+
+    # maximum number of bytes of ciphertext to keep in the cache
+    MAX_BYTES: int = 16 * 1024 * 1024
+
+    # plaintexts larger than this number of bytes are not cached
+    MAX_ITEM_BYTES: int = 1024 * 1024
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES,
+                 max_item_bytes: int = MAX_ITEM_BYTES):
+        """
+        Initialises the cache.
+
+        :param max_entries: Maximum number of ciphertexts to keep in the cache
+        :param max_bytes: Maximum number of bytes of ciphertext to keep in the cache
+        :param max_item_bytes: Plaintexts larger than this number of bytes are not cached
+        """
+
+        for name, value in (("entries", max_entries), ("bytes", max_bytes), ("item bytes", max_item_bytes)):
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"Maximum number of {name} must be a non-negative integer!")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self._entries: OrderedDict[tuple[bytes, bytes], bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def key(key: str | bytes, plaintext: bytes) -> tuple[bytes, bytes]:
+        """
+        Builds the cache key of a plaintext encrypted with an encryption key.
+
+        :param key: Encryption key
+        :param plaintext: Plaintext message
+        :return: Cache key
+        """
+
+        if not isinstance(key, (str, bytes)):
+            raise ValueError("Encryption key must be a base64-encoded string!")
+
+        return (hashlib.sha256(key.encode() if isinstance(key, str) else key).digest(),
+                hashlib.sha256(plaintext).digest())
+
+    def encrypt(self, key: str, plaintext: bytes, encrypt: Callable[[str, bytes], bytes]) -> bytes:
+        """
+        Returns the cached ciphertext of the plaintext, encrypting and caching it if it is not cached.
+
+        :param key: Encryption key
+        :param plaintext: Plaintext message
+        :param encrypt: Function which encrypts the plaintext with the key, if it is not cached
+        :return: Base64-encoded ciphertext
+        """
+
+        if len(plaintext) > self.max_item_bytes:
+            return encrypt(key, plaintext)
+
+        cache_key = CiphertextCache.key(key, plaintext)
+
+        with self._lock:
+            ciphertext = self._entries.get(cache_key)
+
+            if ciphertext is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return ciphertext
+
+            self.misses += 1
+
+        ciphertext = encrypt(key, plaintext)
+
+        if len(ciphertext) > self.max_bytes:
+            return ciphertext
+
+        with self._lock:
+            if cache_key not in self._entries:
+                self._entries[cache_key] = ciphertext
+                self._bytes += len(ciphertext)
+
+            while len(self._entries) > 0 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+        return ciphertext
+
+    def clear(self) -> None:
+        """Removes all cached ciphertexts."""
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
 class Cryptography:
     """
     Class used to encrypt and decrypt a message using AES-256, CBC and PKCS7
@@ -18,6 +185,43 @@ class Cryptography:
     # Initialisation vector used for encryption and decryption
     INITIAL_VECTOR: bytes = "SSGAPIInitVector".encode()
 
+    # maximum number of distinct keys whose ciphers are kept in memory
+    CIPHER_CACHE_SIZE: int = 32
+
+    # lengths in bytes of the AES-128, AES-192 and AES-256 keys accepted
+    KEY_SIZES: tuple[int, ...] = (16, 24, 32)
+
+    # default number of bytes read from a stream at a time
+    CHUNK_SIZE: int = 64 * 1024
+
+    # number of chunks that each worker process is sent at a time when processing batches on a process pool
+    CHUNKS_PER_WORKER: int = 4
+
+    @staticmethod
+    @functools.lru_cache(maxsize=CIPHER_CACHE_SIZE)
+    def cipher(key: str) -> Cipher:
+        """
+        Decodes and validates an AES key, and returns the cipher for the key.
+
+        The key is only decoded once, after which the cipher is cached. The cipher itself holds no state, so fresh
+        encryption and decryption contexts can be created from it cheaply with encryptor() and decryptor().
+        Whitespace within the key, such as a trailing line break left over from the file it was copied from, is
+        ignored.
+
+        :param key: Base64-encoded AES-128, AES-192 or AES-256 key
+        :return: Cipher object for AES/CBC using the key
+        """
+
+        if not isinstance(key, (str, bytes)):
+            raise ValueError("Encryption key must be a base64-encoded string!")
+
+        enc_key = b64decode("".join(key.split()) if isinstance(key, str) else b"".join(key.split()), validate=True)
+
+        if len(enc_key) not in Cryptography.KEY_SIZES:
+            raise ValueError("Encryption key must be a 128, 192 or 256-bit key!")
+
+        return Cipher(AES(enc_key), CBC(Cryptography.INITIAL_VECTOR), backend=default_backend())
+
     @staticmethod
     def encrypt(key: str, plaintext: bytes | str, return_bytes: bool = True) -> bytes | str | None:
         """
@@ -40,22 +244,31 @@ class Cryptography:
         if isinstance(plaintext, str):
             plaintext = plaintext.encode()
 
-        enc_key = b64decode(key)
-        cipher_algo = Cipher(AES(enc_key), CBC(
-            Cryptography.INITIAL_VECTOR), backend=default_backend())
+        encoded_ciphertext = CIPHERTEXT_CACHE.encrypt(key, plaintext, Cryptography._encrypt)
+
+        if return_bytes:
+            return encoded_ciphertext
+
+        return encoded_ciphertext.decode()
+
+    @staticmethod
+    def _encrypt(key: str, plaintext: bytes) -> bytes:
+        """
+        Encrypts a message using AES-256/CBC/PKCS7 without going through the ciphertext cache.
+
+        :param key: Encryption key to encrypt the plaintext
+        :param plaintext: Plaintext message to be encrypted
+        :return: Base64-encoded ciphertext
+        """
+
         padding_algo = PKCS7(128).padder()
 
-        encryptor = cipher_algo.encryptor()
+        encryptor = Cryptography.cipher(key).encryptor()
         padded_plaintext = padding_algo.update(
             plaintext) + padding_algo.finalize()
         ciphertext = encryptor.update(padded_plaintext) + encryptor.finalize()
 
-        encoded_ciphertext = b64encode(ciphertext)
-
-        if return_bytes:
-            return encoded_ciphertext
-
-        return encoded_ciphertext.decode()
+        return b64encode(ciphertext)
 
     @staticmethod
     def decrypt(key: str, ciphertext: str | bytes, return_bytes: bool = True) -> bytes | str | None:
@@ -79,12 +292,9 @@ class Cryptography:
         # decode the input text into a bytes object
         decoded_ciphertext = b64decode(ciphertext)
 
-        enc_key = b64decode(key)
-        cipher_algo = Cipher(AES(enc_key), CBC(
-            Cryptography.INITIAL_VECTOR), backend=default_backend())
         padding_algo = PKCS7(128).unpadder()
 
-        decryptor = cipher_algo.decryptor()
+        decryptor = Cryptography.cipher(key).decryptor()
         plaintext = decryptor.update(decoded_ciphertext) + decryptor.finalize()
         unpadded_plaintext = padding_algo.update(
             plaintext) + padding_algo.finalize()
@@ -93,3 +303,186 @@ class Cryptography:
             return unpadded_plaintext
 
         return unpadded_plaintext.decode()
+
+    @staticmethod
+    def _chunks(source: BinaryIO | TextIO | Iterable[bytes | str], chunk_size: int) -> Iterator[bytes]:
+        """
+        Reads a file-like object or an iterable in chunks, encoding any strings into bytes.
+
+        :param source: File-like object with a read() method, or an iterable of bytes or strings
+        :param chunk_size: Number of bytes or characters to read from a file-like object at a time
+        :return: Iterator of bytes
+        """
+
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("Chunk size must be a positive integer!")
+
+        if isinstance(source, (bytes, bytearray, str)):
+            source = [source]
+        elif hasattr(source, "read"):
+            stream = source
+            source = iter(lambda: stream.read(chunk_size), stream.read(0))
+
+        for chunk in source:
+            yield chunk.encode() if isinstance(chunk, str) else bytes(chunk)
+
+    @staticmethod
+    def encrypt_stream(key: str, plaintext: BinaryIO | TextIO | Iterable[bytes | str],
+                       chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Encrypts a stream using AES-256/CBC/PKCS7 and yields the base64-encoded ciphertext chunk by chunk.
+
+        Only one chunk of the stream is held in memory at a time. Joining the chunks yields the same ciphertext as
+        encrypt() does for the whole plaintext.
+
+        :param key: Encryption key to encrypt the plaintext
+        :param plaintext: File-like object with a read() method, or an iterable of bytes or strings, containing the
+                          plaintext message to be encrypted
+        :param chunk_size: Number of bytes to read from a file-like object at a time
+        :return: Iterator of base64-encoded ciphertext chunks
+        """
+
+        encryptor = Cryptography.cipher(key).encryptor()
+        padding_algo = PKCS7(128).padder()
+
+        # base64 encodes 3 bytes at a time, so any trailing bytes are carried over to the next chunk
+        pending = b""
+
+        for chunk in Cryptography._chunks(plaintext, chunk_size):
+            pending += encryptor.update(padding_algo.update(chunk))
+            aligned = len(pending) - len(pending) % 3
+
+            if aligned > 0:
+                yield b64encode(pending[:aligned])
+                pending = pending[aligned:]
+
+        pending += encryptor.update(padding_algo.finalize()) + encryptor.finalize()
+
+        if len(pending) > 0:
+            yield b64encode(pending)
+
+    @staticmethod
+    def decrypt_stream(key: str, ciphertext: BinaryIO | TextIO | Iterable[bytes | str],
+                       chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Decrypts a stream of base64-encoded ciphertext and yields the plaintext chunk by chunk.
+
+        Only one chunk of the stream is held in memory at a time. Joining the chunks yields the same plaintext as
+        decrypt() does for the whole ciphertext. Whitespace within the ciphertext, such as line breaks, is ignored.
+
+        :param key: Key to decrypt ciphertext
+        :param ciphertext: File-like object with a read() method, or an iterable of bytes or strings, containing the
+                           base64-encoded ciphertext to be decrypted
+        :param chunk_size: Number of bytes or characters to read from a file-like object at a time
+        :return: Iterator of plaintext chunks
+        """
+
+        decryptor = Cryptography.cipher(key).decryptor()
+        padding_algo = PKCS7(128).unpadder()
+
+        # base64 decodes 4 characters at a time, so any trailing characters are carried over to the next chunk
+        pending = b""
+
+        for chunk in Cryptography._chunks(ciphertext, chunk_size):
+            pending += b"".join(chunk.split())
+            aligned = len(pending) - len(pending) % 4
+
+            if aligned > 0:
+                plaintext = padding_algo.update(decryptor.update(b64decode(pending[:aligned])))
+                pending = pending[aligned:]
+
+                if len(plaintext) > 0:
+                    yield plaintext
+
+        if len(pending) > 0:
+            raise ValueError("Ciphertext is not valid base64!")
+
+        plaintext = padding_algo.update(decryptor.finalize()) + padding_algo.finalize()
+
+        if len(plaintext) > 0:
+            yield plaintext
+
+    @staticmethod
+    def _many(func: Callable[[str, bytes | str, bool], bytes | str], key: str, items: Iterable[bytes | str],
+              return_bytes: bool, max_workers: int | None, use_processes: bool) -> list[CipherResult]:
+        """
+        Encrypts or decrypts a batch of items on a pool of workers.
+
+        :param func: Cryptography.encrypt or Cryptography.decrypt
+        :param key: Key to encrypt or decrypt the items with
+        :param items: Items to encrypt or decrypt
+        :param return_bytes: If True, the outputs will be returned as bytes objects
+        :param max_workers: Maximum number of workers. Defaults to the number of CPUs.
+        :param use_processes: If True, the batch is processed on a pool of processes instead of threads
+        :return: List of CipherResult objects, in the same order as the items
+        """
+
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("Maximum number of workers must be a positive integer!")
+
+        # an invalid key fails every item, so it is reported once for the whole batch instead
+        Cryptography.cipher(key)
+
+        items = items if isinstance(items, (list, tuple)) else list(items)
+
+        if len(items) == 0:
+            return []
+
+        workers = min(max_workers or os.cpu_count() or 1, len(items))
+        task = functools.partial(_apply, func, key, return_bytes=return_bytes)
+
+        if use_processes:
+            # items are pickled in chunks to limit the number of round-trips to the worker processes
+            chunksize = max(1, len(items) // (workers * Cryptography.CHUNKS_PER_WORKER))
+            executor: Executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # threads share the items with the caller, so no item is copied
+            chunksize = 1
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cipher")
+
+        with executor:
+            return [CipherResult(index, value, error)
+                    for index, (value, error) in enumerate(executor.map(task, items, chunksize=chunksize))]
+
+    @staticmethod
+    def encrypt_many(key: str, plaintexts: Iterable[bytes | str], return_bytes: bool = True,
+                     max_workers: int = None, use_processes: bool = False) -> list[CipherResult]:
+        """
+        Encrypts a batch of messages using AES-256/CBC/PKCS7 on a pool of workers.
+
+        A message that cannot be encrypted does not fail the batch; its exception is reported in its result instead.
+
+        :param key: Encryption key to encrypt the plaintexts
+        :param plaintexts: Plaintext messages to be encrypted
+        :param return_bytes: If True, the ciphertexts will be returned as bytes objects
+        :param max_workers: Maximum number of workers. Defaults to the number of CPUs.
+        :param use_processes: If True, the batch is encrypted on a pool of processes, which is able to use every CPU
+                              core for large batches, at the cost of copying the messages to the processes
+        :return: List of CipherResult objects, in the same order as the plaintexts
+        """
+
+        return Cryptography._many(Cryptography.encrypt, key, plaintexts, return_bytes, max_workers, use_processes)
+
+    @staticmethod
+    def decrypt_many(key: str, ciphertexts: Iterable[bytes | str], return_bytes: bool = True,
+                     max_workers: int = None, use_processes: bool = False) -> list[CipherResult]:
+        """
+        Decrypts a batch of encrypted messages on a pool of workers.
+
+        A message that cannot be decrypted, such as one with invalid base64 or padding, does not fail the batch; its
+        exception is reported in its result instead.
+
+        :param key: Key to decrypt the ciphertexts
+        :param ciphertexts: Ciphertext messages to be decrypted
+        :param return_bytes: If True, the plaintexts will be returned as bytes objects
+        :param max_workers: Maximum number of workers. Defaults to the number of CPUs.
+        :param use_processes: If True, the batch is decrypted on a pool of processes, which is able to use every CPU
+                              core for large batches, at the cost of copying the messages to the processes
+        :return: List of CipherResult objects, in the same order as the ciphertexts
+        """
+
+        return Cryptography._many(Cryptography.decrypt, key, ciphertexts, return_bytes, max_workers, use_processes)
+
+
+# shared ciphertext cache used by Cryptography.encrypt() within this process
+CIPHERTEXT_CACHE = CiphertextCache()
@@ -9,6 +9,7 @@ from app.core.abc.abstract import AbstractRequest
 from app.core.models.course_runs import DeleteRunInfo
 from app.core.constants import HttpMethod, OptionalSelector
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.cache_utils import RESPONSE_CACHE
 
 
 class DeleteCourseRun(AbstractRequest):
@@ -19,6 +20,7 @@ class DeleteCourseRun(AbstractRequest):
     def __init__(self, runId: str, include_expired: OptionalSelector, delete_runinfo: DeleteRunInfo):
         super().__init__()
         self.req: HTTPRequestBuilder = None
+        self._stale_endpoints: list[str] = []
         self._prepare(runId, include_expired, delete_runinfo)
 
     def __repr__(self):
@@ -53,6 +55,10 @@ class DeleteCourseRun(AbstractRequest):
 
         self.req = self.req.with_body(delete_runinfo.payload())
 
+        # cached views of the course run and its sessions are stale once the course run is deleted
+        self._stale_endpoints = [f"{st.session_state['url'].value}/courses/courseRuns/id/{runId}",
+                                 f"{st.session_state['url'].value}/courses/runs/{runId}/sessions"]
+
     def execute(self, encryption_key, cert_pem, key_pem) -> requests.Response:
         """
         Executes the HTTP request and returns the response object.
@@ -60,4 +66,7 @@ class DeleteCourseRun(AbstractRequest):
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        response = self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        RESPONSE_CACHE.invalidate(*self._stale_endpoints)
+
+        return response
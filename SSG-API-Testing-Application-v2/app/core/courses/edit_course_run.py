@@ -9,6 +9,7 @@ from app.core.models.course_runs import EditRunInfo
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod, OptionalSelector
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.cache_utils import RESPONSE_CACHE
 
 
 class EditCourseRun(AbstractRequest):
@@ -19,6 +20,7 @@ class EditCourseRun(AbstractRequest):
     def __init__(self, runId: str, include_expired: OptionalSelector, runinfo: EditRunInfo):
         super().__init__()
         self.req: HTTPRequestBuilder = None
+        self._stale_endpoints: list[str] = []
         self._prepare(runId, include_expired, runinfo)
 
     def __repr__(self):
@@ -54,6 +56,10 @@ class EditCourseRun(AbstractRequest):
 
         self.req = self.req.with_body(runinfo.payload())
 
+        # cached views of the course run and its sessions are stale once the course run is edited
+        self._stale_endpoints = [f"{st.session_state['url'].value}/courses/courseRuns/id/{runId}",
+                                 f"{st.session_state['url'].value}/courses/runs/{runId}/sessions"]
+
     def execute(self, encryption_key, cert_pem, key_pem) -> requests.Response:
         """
         Executes the HTTP request and returns the response object.
@@ -61,4 +67,7 @@ class EditCourseRun(AbstractRequest):
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        response = self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        RESPONSE_CACHE.invalidate(*self._stale_endpoints)
+
+        return response
@@ -2,14 +2,30 @@
 Contains class used for viewing course sessions.
 """
 
+import json
+
 import requests
 import streamlit as st
 
+from app.utils.batch_utils import BatchExecutor, BatchResult
 from app.utils.http_utils import HTTPRequestBuilder
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod, Month, OptionalSelector
 
-from typing import Optional
+from typing import Callable, NamedTuple, Optional
+
+
+class SessionRange(NamedTuple):
+    """Sessions of a course run across a range of months"""
+
+    # sessions of every month, without duplicates, ordered by their start date and time
+    sessions: list[dict]
+
+    # every month of the range, in MMYYYY format
+    months: list[str]
+
+    # reason why the sessions of a month could not be retrieved, keyed by the month in MMYYYY format
+    failed: dict[str, str]
 
 
 class ViewCourseSessions(AbstractRequest):
@@ -17,6 +33,9 @@ class ViewCourseSessions(AbstractRequest):
 
     _TYPE: HttpMethod = HttpMethod.GET
 
+    # maximum number of months that can be retrieved with a single call to fetch_range()
+    MAX_MONTHS: int = 36
+
     def __init__(self, runId: str, crn: str, session_month: Optional[Month], session_year: Optional[int],
                  include_expired: OptionalSelector):
         super().__init__()
@@ -53,12 +72,8 @@ class ViewCourseSessions(AbstractRequest):
             .with_param("courseReferenceNumber", crn)
 
         if session_month is not None and session_year is not None:
-            if session_month.value[0] < 10:
-                self.req = self.req.with_param(
-                    "sessionMonth", f"0{session_month.value[0]}{session_year}")
-            else:
-                self.req = self.req.with_param(
-                    "sessionMonth", f"{session_month.value[0]}{session_year}")
+            self.req = self.req.with_param("sessionMonth", ViewCourseSessions.session_month(session_month,
+                                                                                            session_year))
 
         match include_expired:
             case OptionalSelector.YES:
@@ -75,3 +90,115 @@ class ViewCourseSessions(AbstractRequest):
         """
 
         return self.req.get(cert_pem, key_pem)
+
+    @staticmethod
+    def session_month(month: Month, year: int) -> str:
+        """
+        Formats a month in the MMYYYY format expected by the sessionMonth parameter.
+
+        :param month: Month
+        :param year: Year
+        :return: Month in MMYYYY format
+        """
+
+        return f"{month.value[0]:02d}{year}"
+
+    @staticmethod
+    def months(start_month: Month, start_year: int, end_month: Month, end_year: int) -> list[tuple[Month, int]]:
+        """
+        Lists every month from the start month to the end month, inclusive.
+
+        :param start_month: First month of the range
+        :param start_year: Year of the first month of the range
+        :param end_month: Last month of the range
+        :param end_year: Year of the last month of the range
+        :return: List of the month and year of every month of the range
+        """
+
+        start = start_year * 12 + start_month.value[0] - 1
+        end = end_year * 12 + end_month.value[0] - 1
+
+        if end < start:
+            raise ValueError("End month must not be before the start month!")
+
+        if end - start + 1 > ViewCourseSessions.MAX_MONTHS:
+            raise ValueError(f"Range must not span more than {ViewCourseSessions.MAX_MONTHS} months!")
+
+        by_number = {month.value[0]: month for month in Month}
+        return [(by_number[index % 12 + 1], index // 12) for index in range(start, end + 1)]
+
+    @staticmethod
+    def _sessions(result: BatchResult) -> list[dict]:
+        """
+        Extracts the sessions from the response of a single month.
+
+        :param result: Successful BatchResult of the request of the month
+        :return: List of sessions
+        """
+
+        data = result.response.json().get("data")
+        sessions = data.get("sessions") if isinstance(data, dict) else data
+
+        return [session for session in sessions if isinstance(session, dict)] if isinstance(sessions, list) else []
+
+    @staticmethod
+    def fetch_range(runId: str, crn: str, start_month: Month, start_year: int, end_month: Month, end_year: int,
+                    include_expired: OptionalSelector, cert_pem: str, key_pem: str, executor: BatchExecutor = None,
+                    request_factory: Callable[..., AbstractRequest] = None) -> SessionRange:
+        """
+        Retrieves the sessions of a course run across a range of months, sending the request of every month
+        concurrently, and merging their sessions.
+
+        The request of every month is a GET request of its own, so the response of every month is cached
+        independently. Extending a range which was retrieved a short while ago only sends the requests of the months
+        which were not part of the earlier range.
+
+        :param runId: Run ID
+        :param crn: CRN
+        :param start_month: First month of the range
+        :param start_year: Year of the first month of the range
+        :param end_month: Last month of the range
+        :param end_year: Year of the last month of the range
+        :param include_expired: Indicate whether to retrieve expired courses or not
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param executor: BatchExecutor used to send the requests. If not specified,
+                         BatchExecutor.adaptive() is used
+        :param request_factory: Function which creates the request of a month, given the same arguments as
+                                ViewCourseSessions. If not specified, ViewCourseSessions is used
+        :return: SessionRange containing the sessions of every month which could be retrieved
+        """
+
+        months = ViewCourseSessions.months(start_month, start_year, end_month, end_year)
+        executor = executor if executor is not None else BatchExecutor.adaptive()
+        factory = request_factory if request_factory is not None else ViewCourseSessions
+
+        reqs = [factory(runId, crn, month, year, include_expired) for month, year in months]
+        labels = [ViewCourseSessions.session_month(month, year) for month, year in months]
+        by_month: dict[int, list[dict]] = {}
+        failed: dict[str, str] = {}
+
+        for result in executor.run(reqs, cert_pem, key_pem):
+            if result.error is not None:
+                failed[labels[result.index]] = str(result.error)
+            elif not result.ok:
+                failed[labels[result.index]] = f"HTTP {result.status_code}"
+            else:
+                try:
+                    by_month[result.index] = ViewCourseSessions._sessions(result)
+                except (ValueError, AttributeError) as ex:
+                    failed[labels[result.index]] = f"Invalid response: {ex}"
+
+        # a session spanning the end of a month may be returned for both months
+        merged: dict[str, dict] = {}
+
+        for index in sorted(by_month):
+            for session in by_month[index]:
+                key = session.get("id") if isinstance(session.get("id"), str) \
+                    else json.dumps(session, sort_keys=True, default=str)
+                merged.setdefault(key, session)
+
+        sessions = sorted(merged.values(), key=lambda x: (str(x.get("startDate") or ""),
+                                                          str(x.get("startTime") or "")))
+
+        return SessionRange(sessions, labels, {label: failed[label] for label in labels if label in failed})
@@ -6,6 +6,7 @@ from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.models.credit import CancelClaimsInfo
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.cache_utils import RESPONSE_CACHE
 
 
 class CancelClaims(AbstractRequest):
@@ -44,4 +45,9 @@ class CancelClaims(AbstractRequest):
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        response = self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+
+        # cached views of the record served by this endpoint are now stale
+        RESPONSE_CACHE.invalidate(self.req.endpoint)
+
+        return response
@@ -6,6 +6,7 @@ from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.models.credit import UploadDocumentInfo
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.cache_utils import RESPONSE_CACHE
 
 
 class UploadDocument(AbstractRequest):
@@ -16,6 +17,7 @@ class UploadDocument(AbstractRequest):
     def __init__(self, claimId: str, upload_doc: UploadDocumentInfo):
         super().__init__()
         self.req: HTTPRequestBuilder = None
+        self._stale_endpoints: list[str] = []
         self._prepare(claimId, upload_doc)
 
     def __repr__(self):
@@ -38,6 +40,9 @@ class UploadDocument(AbstractRequest):
             .with_header("accept", "application/json") \
             .with_body(upload_doc.payload())
 
+        # cached views of the claim are stale once its supporting documents are updated
+        self._stale_endpoints = [f"{st.session_state['url'].value}/skillsFutureCredits/claims/{claimId}"]
+
     def execute(self, encryption_key, cert_pem, key_pem) -> requests.Response:
         """
         Executes the HTTP request and returns the response object.
@@ -45,4 +50,7 @@ class UploadDocument(AbstractRequest):
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        response = self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        RESPONSE_CACHE.invalidate(*self._stale_endpoints)
+
+        return response
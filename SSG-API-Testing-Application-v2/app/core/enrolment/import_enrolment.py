@@ -0,0 +1,330 @@
+import datetime
+import json
+
+from typing import Any, BinaryIO, Callable, Iterator, TextIO
+
+from app.core.abc.abstract import AbstractRequest
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.constants import IdTypeSummary
+from app.core.enrolment.create_enrolment import CreateEnrolment
+from app.core.mirror.local_store import LocalStore
+from app.core.models.enrolment import CreateEnrolmentInfo
+from app.utils.batch_utils import BatchExecutor, BatchResult
+from app.utils.job_utils import JobJournal, ResumableJob
+from app.utils.roster_utils import read_roster, RosterResultWriter
+from app.utils.verify import BulkValidators
+
+
+class EnrolmentImporter:
+    """
+    Class used for creating enrolments in bulk from a roster of trainees in a CSV or Excel file.
+
+    The roster is streamed one chunk of rows at a time: each chunk is mapped onto CreateEnrolmentInfo objects,
+    validated, and submitted through CreateEnrolment on a BatchExecutor, while the outcome of every row is written to
+    the result file as soon as it is known. Only a bounded number of rows are ever held in memory, regardless of the
+    size of the roster.
+
+    Rows which enrol a trainee on a course run that an earlier row already enrols them on are rejected without being
+    submitted, as are rows for trainees who already hold an enrolment on the course run in the local store, if one
+    is given. Only rows for the training partner whose records are held in the store are checked against it.
+
+    An import can be given a JobJournal, so that an import which is interrupted can be run again over the same roster
+    without creating the enrolments which already went through a second time.
+    """
+
+    # default mapping of the columns of the roster to the properties of CreateEnrolmentInfo
+    COLUMNS: dict[str, str] = {
+        "courseRunId": "course_run_id",
+        "courseReferenceNumber": "course_referenceNumber",
+        "traineeId": "trainee_id",
+        "traineeIdType": "trainee_idType",
+        "traineeFullName": "trainee_fullName",
+        "traineeDateOfBirth": "trainee_dateOfBirth",
+        "traineeEmailAddress": "trainee_emailAddress",
+        "traineeAreaCode": "trainee_contactNumber_areaCode",
+        "traineeCountryCode": "trainee_contactNumber_countryCode",
+        "traineePhoneNumber": "trainee_contactNumber_phoneNumber",
+        "enrolmentDate": "trainee_enrolmentDate",
+        "sponsorshipType": "trainee_sponsorshipType",
+        "discountAmount": "trainee_fees_discountAmount",
+        "collectionStatus": "trainee_fees_collectionStatus",
+        "employerUen": "employer_uen",
+        "employerFullName": "employer_fullName",
+        "employerEmailAddress": "employer_emailAddress",
+        "employerAreaCode": "employer_areaCode",
+        "employerCountryCode": "employer_countryCode",
+        "employerPhoneNumber": "employer_phoneNumber",
+        "trainingPartnerCode": "trainingPartner_code",
+        "trainingPartnerUen": "trainingPartner_uen",
+    }
+
+    # properties of CreateEnrolmentInfo which hold dates and numbers, as every other property holds a string
+    DATE_FIELDS: frozenset[str] = frozenset({"trainee_dateOfBirth", "trainee_enrolmentDate"})
+    NUMBER_FIELDS: frozenset[str] = frozenset({"trainee_fees_discountAmount"})
+
+    # identification types whose IDs carry an NRIC check digit
+    CHECKED_ID_TYPES: frozenset[IdTypeSummary] = frozenset({IdTypeSummary.NRIC, IdTypeSummary.FIN})
+
+    # default number of rows read and validated together
+    CHUNK_SIZE: int = 500
+
+    def __init__(self, columns: dict[str, str] = None, executor: BatchExecutor = None, chunk_size: int = CHUNK_SIZE,
+                 request_factory: Callable[[CreateEnrolmentInfo], AbstractRequest] = CreateEnrolment,
+                 store: LocalStore = None):
+        """
+        Initialises the importer.
+
+        :param columns: Mapping of the columns of the roster to the properties of CreateEnrolmentInfo. If not
+                        specified, COLUMNS is used
+        :param executor: BatchExecutor used to submit the enrolments. If not specified, BatchExecutor.adaptive()
+                         is used
+        :param chunk_size: Number of rows read and validated together
+        :param request_factory: Function which creates the request that submits an enrolment
+        :param store: LocalStore of the endpoint and training partner the enrolments are created against, used to
+                      check for existing enrolments. If not specified, rows are only checked against the other rows
+                      of the roster
+        """
+
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("Chunk size must be a positive integer!")
+
+        self.columns = columns if columns is not None else EnrolmentImporter.COLUMNS
+
+        unknown = [field for field in self.columns.values()
+                   if not isinstance(getattr(CreateEnrolmentInfo, field, None), property)]
+
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown enrolment fields: {', '.join(unknown)}!")
+
+        self.executor = executor if executor is not None else BatchExecutor.adaptive()
+        self.chunk_size = chunk_size
+        self.request_factory = request_factory
+        self.store = store
+
+    @staticmethod
+    def _convert(field: str, value: Any) -> Any:
+        """
+        Converts the value of a cell into the type expected by a property of CreateEnrolmentInfo.
+
+        :param field: Name of the property
+        :param value: Value of the cell, which may be a string from a CSV file, or a number or datetime from an Excel
+                      workbook
+        :return: Converted value
+        """
+
+        if field in EnrolmentImporter.DATE_FIELDS:
+            if isinstance(value, datetime.datetime):
+                return value.date()
+
+            if isinstance(value, datetime.date):
+                return value
+
+            try:
+                return datetime.date.fromisoformat(str(value))
+            except ValueError:
+                raise ValueError(f"{value} is not a date in the format YYYY-MM-DD!")
+
+        if field in EnrolmentImporter.NUMBER_FIELDS:
+            if isinstance(value, (int, float)):
+                return value
+
+            try:
+                return float(value)
+            except ValueError:
+                raise ValueError(f"{value} is not a number!")
+
+        # Excel stores numeric-looking cells such as phone numbers as numbers
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+
+        return value if isinstance(value, str) else str(value)
+
+    def build(self, row: dict[str, Any]) -> CreateEnrolmentInfo:
+        """
+        Maps a row of the roster onto a CreateEnrolmentInfo object. Empty cells are left unset.
+
+        :param row: Row of the roster, mapping column names to cell values
+        :return: CreateEnrolmentInfo object
+        """
+
+        info = CreateEnrolmentInfo()
+
+        for column, field in self.columns.items():
+            value = row.get(column)
+
+            if value is not None:
+                setattr(info, field, EnrolmentImporter._convert(field, value))
+
+        return info
+
+    def _validate(self, chunk: list[tuple[int, CreateEnrolmentInfo]], seen: set[tuple[str, str]]) \
+            -> list[list[str]]:
+        """
+        Validates a chunk of enrolments, checking the check digits of the trainee IDs of the whole chunk at once
+        before applying the checks of CreateEnrolmentInfo.validate() to each enrolment, and then checking for
+        duplicate enrolments.
+
+        :param chunk: List of line numbers and CreateEnrolmentInfo objects
+        :param seen: Set of the trainee IDs and course run IDs of the enrolments which passed validation so far, which
+                     is updated with the enrolments of the chunk that pass validation
+        :return: List of errors found in each enrolment
+        """
+
+        infos = [info for _, info in chunk]
+        ids = BulkValidators.validate_nric([info.trainee_id if info.trainee_idType in
+                                            EnrolmentImporter.CHECKED_ID_TYPES else None for info in infos])
+        pairs = [(info.trainee_id, info.course_run_id) for info in infos]
+
+        # enrolments which override the UEN of the session with another training partner are not held in the store
+        mirrored = [self.store is not None and None not in pair and info.trainingPartner_uen in (None, self.store.uen)
+                    for pair, info in zip(pairs, infos)]
+        existing = self.store.active_enrolments(pair for pair, checked in zip(pairs, mirrored) if checked) \
+            if self.store is not None else {}
+        results = []
+
+        for index, info in enumerate(infos):
+            errors, _ = info.validate()
+
+            if ids.errors[index] not in ("", BulkValidators.NOT_STRING):
+                errors.append(f"Trainee ID is not a valid {info.trainee_idType.value}!")
+
+            if mirrored[index] and pairs[index] in existing:
+                errors.append(f"Trainee already has enrolment {existing[pairs[index]]} on course run "
+                              f"{info.course_run_id}!")
+            elif pairs[index] in seen:
+                errors.append(f"Trainee is already enrolled on course run {info.course_run_id} by an earlier row!")
+
+            if len(errors) == 0:
+                seen.add(pairs[index])
+
+            results.append(errors)
+
+        return results
+
+    @staticmethod
+    def key(line: int, info: CreateEnrolmentInfo) -> str:
+        """
+        Returns the key identifying a row of the roster within a journal, which changes if the row is edited or moved.
+
+        :param line: Line number of the row
+        :param info: CreateEnrolmentInfo object built from the row
+        :return: Key of the row
+        """
+
+        return f"{line}:{info.trainee_id}:{info.course_run_id or info.course_referenceNumber}"
+
+    def _requests(self, rows: Iterator[tuple[int, dict[str, Any]]], writer: RosterResultWriter,
+                  lines: dict[str, int]) -> Iterator[tuple[str, AbstractRequest]]:
+        """
+        Lazily turns the rows of the roster into requests, one chunk at a time. Rows which cannot be submitted are
+        written to the result file straight away.
+
+        :param rows: Iterator of the line number and the row of every row of the roster
+        :param writer: RosterResultWriter to write rows which cannot be submitted to
+        :param lines: Dictionary which is filled with the line number of every request yielded, keyed by the key of
+                      the row
+        :return: Iterator of the key of the row and the request of every row which can be submitted
+        """
+
+        exhausted = False
+        seen: set[tuple[str, str]] = set()
+
+        while not exhausted:
+            chunk = []
+
+            while len(chunk) < self.chunk_size:
+                try:
+                    line, row = next(rows)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                try:
+                    chunk.append((line, self.build(row)))
+                except ValueError as ex:
+                    writer.failure(line, str(ex))
+
+            if len(chunk) == 0:
+                continue
+
+            for (line, info), errors in zip(chunk, self._validate(chunk, seen)):
+                if len(errors) > 0:
+                    writer.failure(line, " ".join(errors))
+                    continue
+
+                key = EnrolmentImporter.key(line, info)
+                lines[key] = line
+                yield key, self.request_factory(info)
+
+    @staticmethod
+    def _outcome(result: BatchResult, encryption_key: str) -> tuple[str | None, str | None]:
+        """
+        Extracts the enrolment reference number, or the reason for the failure, from the result of a request.
+
+        :param result: BatchResult of the request
+        :param encryption_key: Encryption key used to decrypt the response
+        :return: Tuple of the enrolment reference number and the error, one of which is None
+        """
+
+        if result.error is not None:
+            return None, f"{type(result.error).__name__}: {result.error}"
+
+        response = result.response
+
+        if not result.ok:
+            try:
+                error = Cryptography.decrypt(encryption_key, json.loads(response.text)["error"]).decode("utf-8")
+            except Exception:
+                error = response.text
+
+            return None, f"HTTP {response.status_code}: {error}"
+
+        try:
+            data = json.loads(Cryptography.decrypt(encryption_key, response.text).decode("utf-8"))
+        except Exception:
+            # the mock API endpoints do not encrypt their responses
+            try:
+                data = response.json()
+            except ValueError:
+                return None, None
+
+        try:
+            return data["data"]["enrolment"]["referenceNumber"], None
+        except (KeyError, TypeError):
+            return None, None
+
+    def run(self, source: str | BinaryIO | TextIO, destination: str | TextIO, encryption_key: str, cert_pem: str,
+            key_pem: str, sheet: str = None, journal: JobJournal = None) -> dict[str, int]:
+        """
+        Creates an enrolment for every row of a roster, and writes the outcome of every row to the result file.
+
+        :param source: Path to the roster, or a file-like object such as a file uploaded through Streamlit
+        :param destination: Path to the result file, or a text file-like object
+        :param encryption_key: Encryption key used to encrypt the requests and decrypt the responses
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param sheet: Name of the worksheet to read, if the roster is an Excel workbook
+        :param journal: JobJournal to record the state of every row in. Rows which the journal shows were created by
+                        an earlier run are not submitted again
+        :return: Dictionary containing the number of rows which succeeded and failed
+        """
+
+        lines: dict[str, int] = {}
+
+        def describe(result: BatchResult) -> str | None:
+            reference, error = EnrolmentImporter._outcome(result, encryption_key)
+            return reference if result.ok else error
+
+        with RosterResultWriter(destination) as writer:
+            items = self._requests(read_roster(source, sheet=sheet), writer, lines)
+            job = ResumableJob(journal, self.executor)
+
+            for outcome in job.run(items, describe, encryption_key, cert_pem, key_pem):
+                line = lines.pop(outcome.key)
+
+                if outcome.state == JobJournal.CONFIRMED:
+                    writer.success(line, outcome.detail)
+                else:
+                    writer.failure(line, outcome.detail)
+
+            return {"succeeded": writer.succeeded, "failed": writer.failed}
@@ -1,3 +1,5 @@
+import copy
+
 import requests
 import streamlit as st
 
@@ -5,6 +7,8 @@ from app.core.constants import HttpMethod
 from app.core.models.enrolment import SearchEnrolmentInfo
 from app.core.abc.abstract import AbstractRequest
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.pagination_utils import decrypt_page, PageIterator
+from app.utils.retry_utils import idempotent
 
 
 class SearchEnrolment(AbstractRequest):
@@ -12,6 +16,9 @@ class SearchEnrolment(AbstractRequest):
 
     _TYPE: HttpMethod = HttpMethod.POST
 
+    # largest number of records the API returns in a page
+    MAX_PAGE_SIZE: int = 100
+
     def __init__(self, enrolment_info: SearchEnrolmentInfo):
         super().__init__()
         self.req: HTTPRequestBuilder = None
@@ -42,7 +49,43 @@ class SearchEnrolment(AbstractRequest):
         """
         Executes the HTTP request and returns the response object.
 
+        Searching does not modify any records, so the request is retried on transient failures.
+
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        return self.req.post_encrypted(encryption_key, cert_pem, key_pem, retry_if=idempotent)
+
+    @staticmethod
+    def iterate(enrolment_info: SearchEnrolmentInfo, encryption_key: str, cert_pem: str, key_pem: str,
+                page_size: int = MAX_PAGE_SIZE, max_workers: int = PageIterator.MAX_WORKERS) -> PageIterator[dict]:
+        """
+        Searches for enrolment records across every page of results, starting from the page set in enrolment_info.
+
+        The next page is fetched while the current page is being consumed, and once the total number of records is
+        known, up to max_workers pages are fetched in parallel. Iteration stops fetching pages as soon as the caller
+        stops consuming records.
+
+        :param enrolment_info: SearchEnrolmentInfo object containing the search criteria. It is not modified
+        :param encryption_key: Encryption key used to encrypt the requests and decrypt the responses
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param page_size: Number of records to fetch in each page
+        :param max_workers: Number of pages fetched in parallel once the total number of records is known
+        :return: PageIterator which yields the decrypted enrolment records
+        """
+
+        if not isinstance(page_size, int) or not 1 <= page_size <= SearchEnrolment.MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be an integer between 1 and {SearchEnrolment.MAX_PAGE_SIZE}!")
+
+        criteria = copy.copy(enrolment_info)
+        criteria.page_size = page_size
+
+        def prepare(page: int) -> SearchEnrolment:
+            criteria.page = page
+            return SearchEnrolment(criteria)
+
+        def send(request: SearchEnrolment) -> tuple[list[dict], int | None]:
+            return decrypt_page(request.execute(encryption_key, cert_pem, key_pem), encryption_key)
+
+        return PageIterator(prepare, send, page_size, first_page=enrolment_info.page or 0, max_workers=max_workers)
@@ -5,6 +5,7 @@ from app.core.constants import HttpMethod
 from app.core.models.enrolment import UpdateEnrolmentFeeCollectionInfo
 from app.core.abc.abstract import AbstractRequest
 from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.cache_utils import RESPONSE_CACHE
 
 
 class UpdateEnrolmentFeeCollection(AbstractRequest):
@@ -16,6 +17,7 @@ class UpdateEnrolmentFeeCollection(AbstractRequest):
                  update_enrolment_fee_collection_info: UpdateEnrolmentFeeCollectionInfo):
         super().__init__()
         self.req: HTTPRequestBuilder = None
+        self._stale_endpoints: list[str] = []
         self._prepare(enrolment_reference_num,
                       update_enrolment_fee_collection_info)
 
@@ -42,6 +44,9 @@ class UpdateEnrolmentFeeCollection(AbstractRequest):
             .with_header("Content-Type", "application/json") \
             .with_body(update_enrolment_fee_collection_info.payload())
 
+        # cached views of the enrolment record are stale once its fee collection status is updated
+        self._stale_endpoints = [f"{st.session_state['url'].value}/tpg/enrolments/details/{enrolment_reference_num}"]
+
     def execute(self, encryption_key, cert_pem, key_pem) -> requests.Response:
         """
         Executes the HTTP request and returns the response object.
@@ -49,4 +54,7 @@ class UpdateEnrolmentFeeCollection(AbstractRequest):
         :return: requests.Response object
         """
 
-        return self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        response = self.req.post_encrypted(encryption_key, cert_pem, key_pem)
+        RESPONSE_CACHE.invalidate(*self._stale_endpoints)
+
+        return response
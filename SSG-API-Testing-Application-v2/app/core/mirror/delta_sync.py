@@ -0,0 +1,190 @@
+"""
+This file contains the classes used for syncing enrolment and assessment records from the SSG APIs into the local
+store, fetching only the records which changed since the previous sync.
+"""
+
+import copy
+import datetime
+import enum
+import json
+
+from typing import Any, Callable, Iterable, NamedTuple
+
+from app.core.abc.abstract import AbstractRequestInfo
+from app.core.assessments.search_assessment import SearchAssessment
+from app.core.constants import EnrolmentSortField, SortField, SortOrder
+from app.core.enrolment.search_enrolment import SearchEnrolment
+from app.core.mirror.local_store import LocalStore, MirroredTable
+from app.core.models.assessments import SearchAssessmentInfo
+from app.core.models.enrolment import SearchEnrolmentInfo
+from app.utils.pagination_utils import PageIterator
+
+
+class SyncResult(NamedTuple):
+    """Outcome of syncing a table of the local store"""
+
+    table: str
+    since: datetime.date | None
+    until: datetime.date
+    fetched: int
+    upserted: int
+
+
+class DeltaSync:
+    """
+    Class used for keeping the local store in sync with the SSG APIs.
+
+    Every sync searches for the records last updated between the high-water mark left by the previous sync with the
+    same search criteria, against the same API endpoint and training partner as the store, and today, sorted by their
+    last update, and upserts every page of results into the local store as it arrives. The high-water mark only moves
+    forward once every page has been stored, so an interrupted sync is simply repeated the next time round. As the
+    APIs only filter by date, the day of the high-water mark is fetched again by the next sync, which is harmless as
+    upserts are idempotent.
+    """
+
+    # properties of the search criteria which are set by the sync itself, and do not tell syncs apart
+    SYNC_PROPERTIES: frozenset[str] = frozenset({"lastUpdateDateFrom", "lastUpdateDateTo", "sortBy_field",
+                                                 "sortBy_order", "page", "page_size", "pageSize"})
+
+    def __init__(self, store: LocalStore, page_size: int = SearchEnrolment.MAX_PAGE_SIZE,
+                 max_workers: int = PageIterator.MAX_WORKERS,
+                 search_enrolments: Callable[..., PageIterator[dict]] = SearchEnrolment.iterate,
+                 search_assessments: Callable[..., PageIterator[dict]] = SearchAssessment.iterate):
+        """
+        Initialises the sync engine.
+
+        :param store: LocalStore to sync the records into
+        :param page_size: Number of records fetched in each page
+        :param max_workers: Number of pages fetched in parallel
+        :param search_enrolments: Function which searches for enrolments across every page of results
+        :param search_assessments: Function which searches for assessments across every page of results
+        """
+
+        if not isinstance(store, LocalStore):
+            raise ValueError("Store must be a LocalStore!")
+
+        self.store = store
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.search_enrolments = search_enrolments
+        self.search_assessments = search_assessments
+
+    @staticmethod
+    def scope(criteria: AbstractRequestInfo, endpoint: str = None, uen: str = None) -> str:
+        """
+        Describes the search criteria which a sync is made with, ignoring the properties set by the sync itself, and
+        the API endpoint and training partner it is made against, so that syncs with different criteria, endpoints
+        or training partners keep their own high-water marks.
+
+        :param criteria: Search criteria
+        :param endpoint: URL of the API endpoint searched
+        :param uen: UEN of the training partner searched for
+        :return: JSON string of the endpoint, the UEN and the values of the properties of the criteria
+        """
+
+        def plain(value: Any) -> Any:
+            if isinstance(value, enum.Enum):
+                return plain(value.value)
+
+            if isinstance(value, (datetime.date, datetime.datetime)):
+                return value.isoformat()
+
+            if isinstance(value, tuple):
+                return [plain(item) for item in value]
+
+            return value
+
+        values = {}
+
+        for name in dir(type(criteria)):
+            if name in DeltaSync.SYNC_PROPERTIES or not isinstance(getattr(type(criteria), name), property):
+                continue
+
+            value = getattr(criteria, name)
+
+            if value is not None:
+                values[name] = plain(value)
+
+        return json.dumps({"endpoint": endpoint, "uen": uen, "criteria": values}, sort_keys=True, default=str)
+
+    def _sync(self, table: MirroredTable, criteria: AbstractRequestInfo, search: Callable[..., PageIterator[dict]],
+              sort_field: enum.Enum, encryption_key: str, cert_pem: str, key_pem: str,
+              until: datetime.date | None) -> SyncResult:
+        """
+        Syncs the records of a table which were updated since the previous sync with the same criteria.
+
+        :param table: Table of the local store to sync
+        :param criteria: Search criteria
+        :param search: Function which searches across every page of results
+        :param sort_field: Field to sort the results by their last update
+        :param encryption_key: Encryption key used to encrypt the requests and decrypt the responses
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param until: Last date of updates to fetch. If not specified, today is used
+        :return: SyncResult
+        """
+
+        until = until if until is not None else datetime.date.today()
+        scope = DeltaSync.scope(criteria, self.store.endpoint, self.store.uen)
+
+        # the first sync starts from the date set in the criteria, if any
+        since = self.store.high_water_mark(table, scope) or criteria.lastUpdateDateFrom
+
+        if since is not None and since > until:
+            raise ValueError("The local store has already been synced past the date requested!")
+
+        query = copy.copy(criteria)
+        query.lastUpdateDateTo = until
+        query.sortBy_field = sort_field
+        query.sortBy_order = SortOrder.ASCENDING
+        query.page = 0
+
+        if since is not None:
+            query.lastUpdateDateFrom = since
+
+        fetched = 0
+        upserted = 0
+        pages: Iterable[list[dict]] = search(query, encryption_key, cert_pem, key_pem, page_size=self.page_size,
+                                             max_workers=self.max_workers).pages()
+
+        for page in pages:
+            fetched += len(page)
+            upserted += self.store.upsert(table, page)
+
+        self.store.set_high_water_mark(table, until, scope)
+
+        return SyncResult(table.name, since, until, fetched, upserted)
+
+    def sync_enrolments(self, criteria: SearchEnrolmentInfo, encryption_key: str, cert_pem: str, key_pem: str,
+                        until: datetime.date = None) -> SyncResult:
+        """
+        Syncs the enrolments which were updated since the previous sync with the same criteria.
+
+        :param criteria: SearchEnrolmentInfo object containing the search criteria, such as the training partner. It
+                         is not modified
+        :param encryption_key: Encryption key used to encrypt the requests and decrypt the responses
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param until: Last date of updates to fetch. If not specified, today is used
+        :return: SyncResult
+        """
+
+        return self._sync(LocalStore.ENROLMENTS, criteria, self.search_enrolments, EnrolmentSortField.UPDATED_ON,
+                          encryption_key, cert_pem, key_pem, until)
+
+    def sync_assessments(self, criteria: SearchAssessmentInfo, encryption_key: str, cert_pem: str, key_pem: str,
+                         until: datetime.date = None) -> SyncResult:
+        """
+        Syncs the assessments which were updated since the previous sync with the same criteria.
+
+        :param criteria: SearchAssessmentInfo object containing the search criteria, such as the training partner.
+                         It is not modified
+        :param encryption_key: Encryption key used to encrypt the requests and decrypt the responses
+        :param cert_pem: Path to the certificate
+        :param key_pem: Path to the private key
+        :param until: Last date of updates to fetch. If not specified, today is used
+        :return: SyncResult
+        """
+
+        return self._sync(LocalStore.ASSESSMENTS, criteria, self.search_assessments, SortField.UPDATED_ON,
+                          encryption_key, cert_pem, key_pem, until)
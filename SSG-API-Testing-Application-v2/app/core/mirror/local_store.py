@@ -0,0 +1,367 @@
+"""
+This file contains the classes used for keeping a local SQLite mirror of the records returned by the SSG APIs.
+"""
+
+import datetime
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from typing import Any, Iterable, NamedTuple
+
+from app.utils.export_utils import RecordFlattener
+
+
+class MirroredTable(NamedTuple):
+    """Describes a table of the local store, and the fields of the records that are mirrored into its columns"""
+
+    name: str
+
+    # mapping of the columns of the table to the dotted paths of the fields they hold, where the first column is the
+    # primary key of the table
+    columns: dict[str, str]
+
+    # groups of columns which are indexed together, where a lookup by the leading columns of a group uses the index
+    indexes: tuple[tuple[str, ...], ...] = ()
+
+    @property
+    def key(self) -> str:
+        """Returns the name of the primary key column"""
+
+        return next(iter(self.columns))
+
+
+class LocalStore:
+    """
+    Local SQLite mirror of enrolment and assessment records.
+
+    Every record is stored in full as JSON, alongside the fields which are commonly searched on, which are copied
+    into their own columns. Records are upserted in bulk, one transaction per batch, and an upsert never replaces a
+    record with an older version of itself.
+
+    The store can be shared between threads, as every access to the connection is serialised.
+    """
+
+    ENROLMENTS: MirroredTable = MirroredTable("enrolments", {
+        "reference_number": "referenceNumber",
+        "course_run_id": "course.run.id",
+        "course_reference_number": "course.referenceNumber",
+        "trainee_id": "trainee.id",
+        "status": "status",
+        "updated_on": "updatedOn",
+    }, (("trainee_id", "course_run_id"), ("course_run_id",), ("course_reference_number",)))
+
+    ASSESSMENTS: MirroredTable = MirroredTable("assessments", {
+        "reference_number": "referenceNumber",
+        "course_run_id": "course.run.id",
+        "course_reference_number": "course.referenceNumber",
+        "trainee_id": "trainee.id",
+        "enrolment_reference_number": "enrolment.referenceNumber",
+        "skill_code": "skillCode",
+        "updated_on": "updatedOn",
+    }, (("trainee_id", "course_run_id"), ("course_run_id",), ("course_reference_number",),
+        ("enrolment_reference_number",), ("skill_code",)))
+
+    # every table held in the store
+    TABLES: tuple[MirroredTable, ...] = (ENROLMENTS, ASSESSMENTS)
+
+    # statuses of enrolments which no longer hold a place on their course run, in lower case
+    INACTIVE_STATUSES: frozenset[str] = frozenset({"cancelled"})
+
+    # name of the environment variable which overrides the directory holding the stores shared by the application
+    ENV_NAME_DIRECTORY: str = "SSG_LOCAL_STORE_DIR"
+
+    def __init__(self, path: str = ":memory:", endpoint: str = None, uen: str = None):
+        """
+        Opens the store, creating its tables if they do not exist yet.
+
+        :param path: Path to the SQLite database file, or ":memory:" for a store which is not persisted
+        :param endpoint: URL of the API endpoint which the records of the store are fetched from
+        :param uen: UEN of the training partner which the records of the store are fetched for
+        """
+
+        if not isinstance(path, str) or len(path) == 0:
+            raise ValueError("Path to the local store must be a non-empty string!")
+
+        self.path = path
+        self.endpoint = endpoint
+        self.uen = uen
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._flatteners = {table.name: RecordFlattener(table.columns.values()) for table in LocalStore.TABLES}
+
+        with self._lock, self._connection:
+            if path != ":memory:":
+                # readers are not blocked by a sync in progress, and commits do not wait on every page being fsynced
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+
+            for table in LocalStore.TABLES:
+                columns = ", ".join(f"{column} TEXT" for column in table.columns if column != table.key)
+                self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table.name} ("
+                                         f"{table.key} TEXT PRIMARY KEY, {columns}, record TEXT NOT NULL)")
+
+                for index in table.indexes:
+                    self._connection.execute(f"CREATE INDEX IF NOT EXISTS {table.name}_by_{'_'.join(index)} "
+                                             f"ON {table.name} ({', '.join(index)})")
+
+            self._connection.execute("CREATE TABLE IF NOT EXISTS sync_state ("
+                                     "name TEXT NOT NULL, scope TEXT NOT NULL, high_water_mark TEXT NOT NULL, "
+                                     "synced_at TEXT NOT NULL, PRIMARY KEY (name, scope))")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _table(table: MirroredTable) -> MirroredTable:
+        """
+        Checks that a table belongs to the store.
+
+        :param table: Table of the store
+        :return: The table itself
+        """
+
+        if table not in LocalStore.TABLES:
+            raise ValueError("Table is not part of the local store!")
+
+        return table
+
+    def upsert(self, table: MirroredTable, records: Iterable[dict]) -> int:
+        """
+        Inserts or updates a batch of records within a single transaction. Records without a reference number are
+        skipped, and records which are older than the copy already in the store are ignored.
+
+        :param table: Table to upsert the records into
+        :param records: Records as returned by the search APIs
+        :return: Number of records inserted or updated
+        """
+
+        table = LocalStore._table(table)
+        flattener = self._flatteners[table.name]
+        rows = []
+
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+
+            row = flattener.row(record)
+
+            if row[0] is None:
+                continue
+
+            rows.append((*(None if value is None else str(value) for value in row), json.dumps(record)))
+
+        if len(rows) == 0:
+            return 0
+
+        columns = [*table.columns, "record"]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != table.key)
+        statement = (f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                     f"ON CONFLICT ({table.key}) DO UPDATE SET {updates} "
+                     f"WHERE excluded.updated_on IS NULL OR {table.name}.updated_on IS NULL "
+                     f"OR excluded.updated_on >= {table.name}.updated_on")
+
+        with self._lock, self._connection:
+            return self._connection.executemany(statement, rows).rowcount
+
+    def get(self, table: MirroredTable, reference_number: str) -> dict | None:
+        """
+        Returns a record by its reference number.
+
+        :param table: Table to read the record from
+        :param reference_number: Reference number of the record
+        :return: The record, or None if it is not in the store
+        """
+
+        table = LocalStore._table(table)
+
+        with self._lock:
+            row = self._connection.execute(f"SELECT record FROM {table.name} WHERE {table.key} = ?",
+                                           (reference_number,)).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def find(self, table: MirroredTable, limit: int = None, **criteria: Any) -> list[dict]:
+        """
+        Returns the records whose columns match every criterion, such as
+        find(LocalStore.ASSESSMENTS, trainee_id="S1234567D", skill_code="TGS-MKG-234222"). Lookups are answered from
+        the indexes of the table where the criteria allow it.
+
+        :param table: Table to read the records from
+        :param limit: Maximum number of records to return. If not specified, every matching record is returned
+        :param criteria: Values of the columns to match, keyed by the name of the column
+        :return: List of matching records, most recently updated first
+        """
+
+        table = LocalStore._table(table)
+
+        if len(criteria) == 0:
+            raise ValueError("At least one criterion must be specified!")
+
+        unknown = [column for column in criteria if column not in table.columns]
+
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown columns for {table.name}: {', '.join(unknown)}!")
+
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            raise ValueError("Limit must be a positive integer!")
+
+        where = " AND ".join(f"{column} = ?" for column in criteria)
+        statement = f"SELECT record FROM {table.name} WHERE {where} ORDER BY updated_on DESC"
+        parameters = [None if value is None else str(value) for value in criteria.values()]
+
+        if limit is not None:
+            statement += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(statement, parameters).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def active_enrolments(self, pairs: Iterable[tuple[str, str]]) -> dict[tuple[str, str], str]:
+        """
+        Looks up the enrolments which trainees hold on course runs, ignoring cancelled enrolments.
+
+        :param pairs: Pairs of trainee IDs and course run IDs to look up
+        :return: Dictionary mapping every pair which has an active enrolment to its enrolment reference number
+        """
+
+        inactive = ", ".join("?" * len(LocalStore.INACTIVE_STATUSES))
+        statement = (f"SELECT reference_number FROM {LocalStore.ENROLMENTS.name} "
+                     f"WHERE trainee_id = ? AND course_run_id = ? AND LOWER(COALESCE(status, '')) NOT IN ({inactive}) "
+                     f"ORDER BY updated_on DESC LIMIT 1")
+        found = {}
+
+        # every pair is a point lookup on the (trainee_id, course_run_id) index, made under one hold of the lock
+        with self._lock:
+            for trainee_id, course_run_id in pairs:
+                row = self._connection.execute(statement, (trainee_id, course_run_id,
+                                                           *LocalStore.INACTIVE_STATUSES)).fetchone()
+
+                if row is not None:
+                    found[(trainee_id, course_run_id)] = row[0]
+
+        return found
+
+    def active_enrolment(self, trainee_id: str, course_run_id: str) -> str | None:
+        """
+        Checks whether a trainee already has an active enrolment on a course run.
+
+        :param trainee_id: ID of the trainee
+        :param course_run_id: ID of the course run
+        :return: Enrolment reference number of the active enrolment, or None if there is none
+        """
+
+        return self.active_enrolments([(trainee_id, course_run_id)]).get((trainee_id, course_run_id))
+
+    def count(self, table: MirroredTable) -> int:
+        """
+        Returns the number of records held in a table.
+
+        :param table: Table of the store
+        :return: Number of records
+        """
+
+        table = LocalStore._table(table)
+
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {table.name}").fetchone()[0]
+
+    def synced_at(self, table: MirroredTable) -> datetime.datetime | None:
+        """
+        Returns the time of the most recent sync of a table, across every set of search criteria.
+
+        :param table: Table of the store
+        :return: Time of the most recent sync, or None if the table has never been synced
+        """
+
+        table = LocalStore._table(table)
+
+        with self._lock:
+            row = self._connection.execute("SELECT MAX(synced_at) FROM sync_state WHERE name = ?",
+                                           (table.name,)).fetchone()
+
+        return datetime.datetime.fromisoformat(row[0]) if row[0] is not None else None
+
+    def high_water_mark(self, table: MirroredTable, scope: str = "") -> datetime.date | None:
+        """
+        Returns the date up to which the records of a table have been synced.
+
+        :param table: Table of the store
+        :param scope: Search criteria which the records were synced with, as every set of criteria is synced
+                      separately
+        :return: Date of the last completed sync, or None if the table has never been synced with the criteria
+        """
+
+        table = LocalStore._table(table)
+
+        with self._lock:
+            row = self._connection.execute("SELECT high_water_mark FROM sync_state WHERE name = ? AND scope = ?",
+                                           (table.name, scope)).fetchone()
+
+        return datetime.date.fromisoformat(row[0]) if row is not None else None
+
+    def set_high_water_mark(self, table: MirroredTable, mark: datetime.date, scope: str = "") -> None:
+        """
+        Records the date up to which the records of a table have been synced.
+
+        :param table: Table of the store
+        :param mark: Date of the completed sync
+        :param scope: Search criteria which the records were synced with
+        """
+
+        table = LocalStore._table(table)
+
+        if not isinstance(mark, datetime.date):
+            raise ValueError("High-water mark must be a date!")
+
+        with self._lock, self._connection:
+            self._connection.execute("INSERT INTO sync_state (name, scope, high_water_mark, synced_at) "
+                                     "VALUES (?, ?, ?, ?) ON CONFLICT (name, scope) DO UPDATE SET "
+                                     "high_water_mark = excluded.high_water_mark, synced_at = excluded.synced_at",
+                                     (table.name, scope, mark.isoformat(),
+                                      datetime.datetime.now(datetime.timezone.utc).isoformat()))
+
+    @staticmethod
+    def path_for(endpoint: str | None, uen: str | None) -> str:
+        """
+        Returns the path of the store holding the records fetched from an API endpoint for a training partner, so
+        that records of different environments and training partners are never mixed.
+
+        :param endpoint: URL of the API endpoint
+        :param uen: UEN of the training partner
+        :return: Path to the store, within the directory set in the environment variable named by
+                 ENV_NAME_DIRECTORY, or the temporary directory if it is not set
+        """
+
+        directory = os.environ.get(LocalStore.ENV_NAME_DIRECTORY) or tempfile.gettempdir()
+        owner = json.dumps([endpoint, uen])
+        return os.path.join(directory, f"ssg-local-store-{hashlib.sha256(owner.encode()).hexdigest()[:16]}.sqlite3")
+
+    def close(self) -> None:
+        """Closes the connection to the store."""
+
+        with self._lock:
+            self._connection.close()
+
+
+@functools.cache
+def shared_store(endpoint: str | None, uen: str | None) -> LocalStore:
+    """
+    Returns the store shared by the pages of the application for the records fetched from an API endpoint for a
+    training partner, opening it on first use.
+
+    :param endpoint: URL of the API endpoint
+    :param uen: UEN of the training partner
+    :return: LocalStore kept at LocalStore.path_for(endpoint, uen)
+    """
+
+    return LocalStore(LocalStore.path_for(endpoint, uen), endpoint, uen)
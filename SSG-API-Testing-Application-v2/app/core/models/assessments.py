@@ -8,7 +8,7 @@ import streamlit as st
 import datetime
 from typing import Optional, Annotated
 
-from app.core.abc.abstract import AbstractRequestInfo
+from app.core.abc.abstract import AbstractRequestInfo, memoized
 from app.core.constants import (Grade, IdTypeSummary, Results, AssessmentUpdateVoidActions,
                                 SortField, SortOrder)
 from app.utils.verify import Validators
@@ -18,6 +18,13 @@ from app.utils.json_utils import remove_null_fields
 class CreateAssessmentInfo(AbstractRequestInfo):
     """Encapsulates information about the creation of an assessment record"""
 
+    __slots__ = ("_grade", "_score", "_course_runId", "_course_referenceNumber", "_result", "_trainee_id",
+                 "_trainee_idType", "_trainee_fullName", "_skillCode", "_assessmentDate", "_trainingPartner_code",
+                 "_trainingPartner_uen", "_conferringInstitute_code")
+
+    # keys of the session state which the payload depends on
+    SESSION_FIELDS: tuple[str, ...] = ("uen",)
+
     def __init__(self):
         self._grade: Optional[Grade] = None
         self._score: Annotated[Optional[int], "Max length of 3"] = None
@@ -59,6 +66,9 @@ class CreateAssessmentInfo(AbstractRequestInfo):
             and self._conferringInstitute_code == other._conferringInstitute_code
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
     @property
     def grade(self):
         return self._grade
@@ -211,6 +221,7 @@ class CreateAssessmentInfo(AbstractRequestInfo):
 
         self._conferringInstitute_code = conferringInstitute_code
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -246,6 +257,7 @@ class CreateAssessmentInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -293,6 +305,8 @@ class CreateAssessmentInfo(AbstractRequestInfo):
 class UpdateVoidAssessmentInfo(CreateAssessmentInfo):
     """Encapsulates information about the updating or voiding of an assessment record"""
 
+    __slots__ = ("_action",)
+
     def __init__(self):
         super().__init__()
         self._action: AssessmentUpdateVoidActions = None
@@ -312,6 +326,9 @@ class UpdateVoidAssessmentInfo(CreateAssessmentInfo):
             and self._action == other._action
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
     @property
     def action(self):
         return self._action
@@ -382,6 +399,7 @@ class UpdateVoidAssessmentInfo(CreateAssessmentInfo):
     def trainee_idType(self, idType: IdTypeSummary):
         raise NotImplementedError("This method is not supported!")
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -398,6 +416,7 @@ class UpdateVoidAssessmentInfo(CreateAssessmentInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -435,6 +454,9 @@ class UpdateVoidAssessmentInfo(CreateAssessmentInfo):
 class SearchAssessmentInfo(AbstractRequestInfo):
     """Encapsulates information about the searching for an assessment record"""
 
+    # keys of the session state which the payload depends on
+    SESSION_FIELDS: tuple[str, ...] = ("uen",)
+
     def __init__(self):
         self._lastUpdateDateTo: Annotated[Optional[datetime.date], "Format is YYYY-MM-DD"] = None
         self._lastUpdateDateFrom: Annotated[Optional[datetime.date], "Format is YYYY-MM-DD"] = None
@@ -625,6 +647,7 @@ class SearchAssessmentInfo(AbstractRequestInfo):
 
         self._trainingPartner_uen = uen
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -669,6 +692,7 @@ class SearchAssessmentInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
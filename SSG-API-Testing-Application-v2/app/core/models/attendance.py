@@ -8,7 +8,7 @@ import streamlit as st
 from typing import Optional, Annotated
 
 from app.core.constants import SurveyLanguage, Attendance, IdType
-from app.utils.json_utils import remove_null_fields
+from app.utils.json_utils import PayloadSerializer
 from app.core.abc.abstract import AbstractRequestInfo
 from app.utils.verify import Validators
 
@@ -16,8 +16,49 @@ from app.utils.verify import Validators
 class UploadAttendanceInfo(AbstractRequestInfo):
     """Encapsulates all information regarding a course session attendance"""
 
+    __slots__ = ("_sessionId", "_status_code", "_trainee_id", "_trainee_name", "_trainee_email", "_trainee_id_type",
+                 "_contactNumber_mobile", "_contactNumber_areacode", "_contactNumber_countryCode", "_numberOfHours",
+                 "_surveyLanguage_code", "_referenceNumber", "_corppassId")
+
     EXCLUSION_LIST: tuple[str] = ("areaCode", )
 
+    # shape of the payload, compiled once as attendance is uploaded in bulk
+    # we can exclude the areaCode field and allow it to be null, as documented in the API reference
+    _SERIALIZER: PayloadSerializer = PayloadSerializer({
+        "uen": lambda self: st.session_state["uen"] if "uen" in st.session_state else None,
+        "course": {
+            "sessionID": "_sessionId",
+            "attendance": {
+                "status": {
+                    "code": lambda self: self._status_code.value[0] if self._status_code is not None else None
+                },
+                "trainee": {
+                    "id": "_trainee_id",
+                    "name": "_trainee_name",
+                    "email": "_trainee_email",
+                    "idType": {
+                        "code": lambda self: (self._trainee_id_type.value[0]
+                                              if self._trainee_id_type is not None else None)
+                    },
+                    "contactNumber": {
+                        "mobile": "_contactNumber_mobile",
+                        "areaCode": "_contactNumber_areacode",
+                        "countryCode": "_contactNumber_countryCode",
+                    },
+                    "numberOfHours": lambda self: (round(self._numberOfHours, 2)
+                                                   if self._numberOfHours is not None else None),
+                    "surveyLanguage": {
+                        "code": lambda self: (self._surveyLanguage_code.value[0]
+                                              if self._surveyLanguage_code is not None
+                                              else None),
+                    }
+                }
+            },
+            "referenceNumber": "_referenceNumber"
+        },
+        "corppassId": "_corppassId"
+    }, exclude=EXCLUSION_LIST)
+
     def __init__(self):
         self._sessionId: str = None
         self._status_code: Attendance = None
@@ -59,6 +100,9 @@ class UploadAttendanceInfo(AbstractRequestInfo):
             and self._corppassId == other._corppassId
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
     @property
     def sessionId(self):
         return self._sessionId
@@ -254,43 +298,7 @@ class UploadAttendanceInfo(AbstractRequestInfo):
                 raise AttributeError("There are some required fields that are missing! Use validate() to find the "
                                      "missing fields!")
 
-        pl = {
-            "uen": st.session_state["uen"] if "uen" in st.session_state else None,
-            "course": {
-                "sessionID": self._sessionId,
-                "attendance": {
-                    "status": {
-                        "code": self._status_code.value[0] if self._status_code is not None else None
-                    },
-                    "trainee": {
-                        "id": self._trainee_id,
-                        "name": self._trainee_name,
-                        "email": self._trainee_email,
-                        "idType": {
-                            "code": self._trainee_id_type.value[0] if self._trainee_id_type is not None else None
-                        },
-                        "contactNumber": {
-                            "mobile": self._contactNumber_mobile,
-                            "areaCode": self._contactNumber_areacode,
-                            "countryCode": self._contactNumber_countryCode,
-                        },
-                        "numberOfHours": round(self._numberOfHours, 2) if self._numberOfHours is not None else None,
-                        "surveyLanguage": {
-                            "code": (self._surveyLanguage_code.value[0]
-                                     if self._surveyLanguage_code is not None
-                                     else None),
-                        }
-                    }
-                },
-                "referenceNumber": self._referenceNumber
-            },
-            "corppassId": self._corppassId
-        }
-
-        # we can exclude the areaCode field and allow it to be null, as documented in the API reference
-        pl = remove_null_fields(pl, exclude=UploadAttendanceInfo.EXCLUSION_LIST)
-
         if as_json_str:
-            return json.dumps(pl)
+            return UploadAttendanceInfo._SERIALIZER.json(self)
 
-        return pl
+        return UploadAttendanceInfo._SERIALIZER.dict(self)
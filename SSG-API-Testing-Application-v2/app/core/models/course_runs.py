@@ -10,7 +10,7 @@ import streamlit as st
 from typing import Optional, Literal, Annotated
 
 from streamlit.runtime.uploaded_file_manager import UploadedFile
-from app.core.abc.abstract import AbstractRequestInfo
+from app.core.abc.abstract import AbstractRequestInfo, memoized
 from app.core.constants import (Vacancy, ModeOfTraining, IdType, Salutations,
                                 Role, OptionalSelector, TrainerType)
 from app.utils.json_utils import remove_null_fields
@@ -25,6 +25,8 @@ class LinkedSSECEQA(AbstractRequestInfo):
     classification/classification-of-lea-eqa-and-fos-ssec-2020.ashx.
     """
 
+    __slots__ = ("_description", "_ssecEQA")
+
     VALID_SSECEQA_MAPPINGS = {
         '0': 'NO FORMAL QUALIFICATION / PRE-PRIMARY / LOWER PRIMARY',
         '01': 'Never attended school',
@@ -126,6 +128,9 @@ class LinkedSSECEQA(AbstractRequestInfo):
             and self._ssecEQA == other._ssecEQA
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
     @property
     def description(self):
         return self._description
@@ -148,6 +153,7 @@ class LinkedSSECEQA(AbstractRequestInfo):
 
         self._ssecEQA = ssecEQA
 
+    @memoized
     def validate(self) -> None | tuple[list[str], list[str]]:
         errors, warnings = [], []
 
@@ -165,6 +171,7 @@ class LinkedSSECEQA(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -192,6 +199,10 @@ class LinkedSSECEQA(AbstractRequestInfo):
 class RunSessionEditInfo(AbstractRequestInfo):
     """Encapsulates all information regarding a course run's sessions"""
 
+    __slots__ = ("_sessionId", "_startDate", "_endDate", "_startTime", "_endTime", "_modeOfTraining", "_venue_block",
+                 "_venue_street", "_venue_floor", "_venue_unit", "_venue_building", "_venue_postalCode", "_venue_room",
+                 "_venue_wheelChairAccess", "_venue_primaryVenue")
+
     def __init__(self):
         self._sessionId: Annotated[Optional[str], "string($varchar(300))"] = None
         self._startDate: Annotated[Optional[datetime.date], "Formatted as YYYYMMDD or YYYY-MM-DD"] = None
@@ -237,6 +248,9 @@ class RunSessionEditInfo(AbstractRequestInfo):
             and self._venue_primaryVenue == other._venue_primaryVenue
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
     @property
     def session_id(self):
         return self._sessionId
@@ -411,6 +425,7 @@ class RunSessionEditInfo(AbstractRequestInfo):
 
         self._venue_primaryVenue = primaryVenue
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -448,6 +463,7 @@ class RunSessionEditInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -515,6 +531,8 @@ class RunSessionEditInfo(AbstractRequestInfo):
 class RunSessionAddInfo(RunSessionEditInfo):
     """Encapsulates all information regarding adding a session to a course run"""
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -540,6 +558,10 @@ class RunSessionAddInfo(RunSessionEditInfo):
             and self._venue_primaryVenue == other._venue_primaryVenue
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -589,6 +611,7 @@ class RunSessionAddInfo(RunSessionEditInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False):
         pl = super().payload(verify=verify, as_json_str=False)
         del pl["action"]
@@ -606,6 +629,10 @@ class RunSessionAddInfo(RunSessionEditInfo):
 class RunTrainerEditInfo(AbstractRequestInfo):
     """Encapsulates all information regarding a trainer in a course run"""
 
+    __slots__ = ("_trainerType_code", "_trainerType_description", "_indexNumber", "_id", "_name", "_email", "_idNumber",
+                 "_idType_code", "_idType_description", "_roles", "_inTrainingProviderProfile", "_domainAreaOfPractice",
+                 "_experience", "_linkedInURL", "_salutationId", "_photo_name", "_photo_content", "_linkedSsecEQAs")
+
     def __init__(self):
         self._trainerType_code: Annotated[Literal["1", "2"], "string($varchar(1))"] = None
         self._trainerType_description: Annotated[str, "string($varchar(128))"] = None
@@ -663,6 +690,9 @@ class RunTrainerEditInfo(AbstractRequestInfo):
             )
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
     @property
     def trainer_type_code(self):
         return self._trainerType_code
@@ -860,6 +890,7 @@ class RunTrainerEditInfo(AbstractRequestInfo):
 
         # the object is converted to a dict as the object itself is not JSON-serializable
         self._linkedSsecEQAs.append(linkedSsecEQA.payload(verify=False))
+        self._changed()
 
     @property
     def linkedSsecEQAs(self):
@@ -877,6 +908,7 @@ class RunTrainerEditInfo(AbstractRequestInfo):
         # the object is converted to a dict as the object itself is not JSON-serializable
         self._linkedSsecEQAs = list(map(lambda x: x.payload(verify=False), linkedSsecEQAs))
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -913,6 +945,7 @@ class RunTrainerEditInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -973,6 +1006,8 @@ class RunTrainerEditInfo(AbstractRequestInfo):
 
 
 class RunTrainerAddInfo(RunTrainerEditInfo):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -1007,6 +1042,10 @@ class RunTrainerAddInfo(RunTrainerEditInfo):
             )
         )
 
+    def __hash__(self):
+        return super().__hash__()
+
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -1075,6 +1114,9 @@ class RunTrainerAddInfo(RunTrainerEditInfo):
 class EditRunInfo(AbstractRequestInfo):
     """Encapsulates all information regarding the editing of a course run"""
 
+    # keys of the session state which the payload depends on
+    SESSION_FIELDS: tuple[str, ...] = ("uen",)
+
     def __init__(self):
         self._crid: str = None
         self._sequenceNumber: Optional[int] = None
@@ -1491,6 +1533,7 @@ class EditRunInfo(AbstractRequestInfo):
             raise ValueError("Invalid session")
 
         self._sessions.append(session)
+        self._changed(session)
 
     @property
     def linked_course_run_trainers(self):
@@ -1508,7 +1551,9 @@ class EditRunInfo(AbstractRequestInfo):
             raise ValueError("Invalid course run trainer information")
 
         self._linkCourseRunTrainer.append(linkCourseRunTrainer)
+        self._changed(linkCourseRunTrainer)
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -1608,6 +1653,7 @@ class EditRunInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -1934,6 +1980,7 @@ class DeleteRunInfo(EditRunInfo):
     def add_linkCourseRunTrainer(self, linkCourseRunTrainer: RunTrainerEditInfo) -> None:
         raise NotImplementedError("This method is not supported!")
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -1943,6 +1990,7 @@ class DeleteRunInfo(EditRunInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -2335,6 +2383,7 @@ class AddRunIndividualInfo(EditRunInfo):
             raise ValueError("Invalid session")
 
         self._sessions.append(session)
+        self._changed(session)
 
     @property
     def linked_course_run_trainers(self):
@@ -2352,7 +2401,9 @@ class AddRunIndividualInfo(EditRunInfo):
             raise ValueError("Invalid course run trainer information")
 
         self._linkCourseRunTrainer.append(linkCourseRunTrainer)
+        self._changed(linkCourseRunTrainer)
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -2444,6 +2495,7 @@ class AddRunIndividualInfo(EditRunInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -2533,6 +2585,7 @@ class AddRunInfo(EditRunInfo):
             raise TypeError("Invalid individual run info")
 
         self._runs.append(run)
+        self._changed(run)
 
     @property
     def runs(self):
@@ -2786,6 +2839,7 @@ class AddRunInfo(EditRunInfo):
     def add_linkCourseRunTrainer(self, linkCourseRunTrainer: RunTrainerEditInfo) -> None:
         raise NotImplementedError("This method is not supported!")
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -2804,6 +2858,7 @@ class AddRunInfo(EditRunInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -4,7 +4,7 @@ import base64
 
 from typing import Optional, Sequence, Annotated
 
-from app.core.abc.abstract import AbstractRequestInfo
+from app.core.abc.abstract import AbstractRequestInfo, memoized
 from app.core.constants import CancelClaimsCode, PermittedFileUploadType
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 from app.utils.json_utils import remove_null_fields
@@ -45,6 +45,7 @@ class EncryptPayloadInfo(AbstractRequestInfo):
             and self._additionalInformation == other._additionalInformation
         )
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         warnings = []
         errors = []
@@ -73,6 +74,7 @@ class EncryptPayloadInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -222,6 +224,7 @@ class DecryptPayloadInfo(AbstractRequestInfo):
 
         return self._encrypted_request == other._encrypted_request
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -231,6 +234,7 @@ class DecryptPayloadInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -288,6 +292,7 @@ class DocumentInfo(AbstractRequestInfo):
             and self._attachmentByte == other._attachmentByte
         )
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -312,6 +317,7 @@ class DocumentInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -430,6 +436,7 @@ class UploadDocumentInfo(AbstractRequestInfo):
             and all(map(lambda x: x[0] == x[1], zip(self._documents, other._documents)))
         )
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -448,6 +455,7 @@ class UploadDocumentInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -495,6 +503,7 @@ class UploadDocumentInfo(AbstractRequestInfo):
             raise ValueError("Document must be a DocumentInfo!")
 
         self._documents.append(document)
+        self._changed(document)
 
 
 class CancelClaimsInfo(AbstractRequestInfo):
@@ -517,6 +526,7 @@ class CancelClaimsInfo(AbstractRequestInfo):
             and self._claimCancelCode == other._claimCancelCode
         )
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         warnings = []
         errors = []
@@ -529,6 +539,7 @@ class CancelClaimsInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -4,17 +4,80 @@ import streamlit as st
 
 from typing import Optional, Union, Annotated
 
-from app.core.abc.abstract import AbstractRequestInfo
+from app.core.abc.abstract import AbstractRequestInfo, memoized
 from app.core.constants import (CollectionStatus, CancellableCollectionStatus, IdTypeSummary,
                                 SponsorshipType, EnrolmentSortField, SortOrder,
                                 EnrolmentCourseStatus)
-from app.utils.json_utils import remove_null_fields
+from app.utils.json_utils import remove_null_fields, PayloadSerializer
 from app.utils.verify import Validators
 
 
 class CreateEnrolmentInfo(AbstractRequestInfo):
     """Class to encapsulate all information regarding the creation of an enrolment record for a trainee"""
 
+    __slots__ = ("_course_run_id", "_course_referenceNumber", "_trainee_id", "_trainee_fees_discountAmount",
+                 "_trainee_fees_collectionStatus", "_trainee_idType_type", "_trainee_employer_uen",
+                 "_trainee_employer_contact_fullName", "_trainee_employer_contact_emailAddress",
+                 "_trainee_employer_contact_contactNumber_areaCode",
+                 "_trainee_employer_contact_contactNumber_countryCode",
+                 "_trainee_employer_contact_contactNumber_phoneNumber", "_trainee_fullName", "_trainee_dateOfBirth",
+                 "_trainee_emailAddress", "_trainee_contactNumber_areaCode", "_trainee_contactNumber_countryCode",
+                 "_trainee_contactNumber_phoneNumber", "_trainee_enrolmentDate", "_trainee_sponsorshipType",
+                 "_trainingPartner_code", "_trainingPartner_uen")
+
+    # shape of the payload, compiled once as enrolments are created in bulk
+    _SERIALIZER: PayloadSerializer = PayloadSerializer({
+        "enrolment": {
+            "course": {
+                "run": {
+                    "id": "_course_run_id"
+                },
+                "referenceNumber": "_course_referenceNumber"
+            },
+            "trainee": {
+                "id": "_trainee_id",
+                "fees": {
+                    "discountAmount": "_trainee_fees_discountAmount",
+                    "collectionStatus": lambda self: (self._trainee_fees_collectionStatus.value if
+                                                      self._trainee_fees_collectionStatus is not None else None)
+                },
+                "idType": {
+                    "type": lambda self: (self._trainee_idType_type.value
+                                          if self._trainee_idType_type is not None else None)
+                },
+                "employer": {
+                    "uen": "_trainee_employer_uen",
+                    "contact": {
+                        "fullName": "_trainee_employer_contact_fullName",
+                        "emailAddress": "_trainee_employer_contact_emailAddress",
+                        "contactNumber": {
+                            "areaCode": "_trainee_employer_contact_contactNumber_areaCode",
+                            "countryCode": "_trainee_employer_contact_contactNumber_countryCode",
+                            "phoneNumber": "_trainee_employer_contact_contactNumber_phoneNumber",
+                        }
+                    }
+                },
+                "fullName": "_trainee_fullName",
+                "dateOfBirth": lambda self: (self._trainee_dateOfBirth.strftime("%Y-%m-%d")
+                                             if self._trainee_dateOfBirth is not None else None),
+                "emailAddress": "_trainee_emailAddress",
+                "contactNumber": {
+                    "areaCode": "_trainee_contactNumber_areaCode",
+                    "countryCode": "_trainee_contactNumber_countryCode",
+                    "phoneNumber": "_trainee_contactNumber_phoneNumber"
+                },
+                "enrolmentDate": lambda self: (self._trainee_enrolmentDate.strftime("%Y-%m-%d")
+                                               if self._trainee_enrolmentDate is not None else None),
+                "sponsorshipType": lambda self: (self._trainee_sponsorshipType.value if
+                                                 self._trainee_sponsorshipType is not None else None),
+            },
+            "trainingPartner": {
+                "uen": "_trainingPartner_uen",
+                "code": "_trainingPartner_code"
+            }
+        }
+    })
+
     def __init__(self):
         self._course_run_id: Annotated[Optional[str], "Max length of 20"] = None
         self._course_referenceNumber: Annotated[str, "Max length of 100"] = None
@@ -45,6 +108,16 @@ class CreateEnrolmentInfo(AbstractRequestInfo):
     def __str__(self):
         return self.__repr__()
 
+    def __eq__(self, other):
+        # subclasses build different requests from the same fields, so they are never equal to one another
+        if type(other) is not type(self):
+            return False
+
+        return self._fields() == other._fields()
+
+    def __hash__(self):
+        return super().__hash__()
+
     @property
     def course_run_id(self):
         return self._course_run_id
@@ -442,65 +515,10 @@ class CreateEnrolmentInfo(AbstractRequestInfo):
                 raise AttributeError("There are some required fields that are missing! Use payload() to find the "
                                      "missing fields!")
 
-        pl = {
-            "enrolment": {
-                "course": {
-                    "run": {
-                        "id": self._course_run_id
-                    },
-                    "referenceNumber": self._course_referenceNumber
-                },
-                "trainee": {
-                    "id": self._trainee_id,
-                    "fees": {
-                        "discountAmount": self._trainee_fees_discountAmount,
-                        "collectionStatus": (self._trainee_fees_collectionStatus.value if
-                                             self._trainee_fees_collectionStatus is not None else None)
-                    },
-                    "idType": {
-                        "type": self._trainee_idType_type.value if self._trainee_idType_type is not None else None
-                    },
-                    "employer": {
-                        "uen": self._trainee_employer_uen,
-                        "contact": {
-                            "fullName": self._trainee_employer_contact_fullName,
-                            "emailAddress": self._trainee_employer_contact_emailAddress,
-                            "contactNumber": {
-                                "areaCode": self._trainee_employer_contact_contactNumber_areaCode,
-                                "countryCode": self._trainee_employer_contact_contactNumber_countryCode,
-                                "phoneNumber": self._trainee_employer_contact_contactNumber_phoneNumber,
-                            }
-                        }
-                    },
-                    "fullName": self._trainee_fullName,
-                    "dateOfBirth": (self._trainee_dateOfBirth.strftime("%Y-%m-%d")
-                                    if self._trainee_dateOfBirth is not None else None),
-                    "emailAddress": self._trainee_emailAddress,
-                    "contactNumber": {
-                        "areaCode": self._trainee_contactNumber_areaCode,
-                        "countryCode": self._trainee_contactNumber_countryCode,
-                        "phoneNumber": self._trainee_contactNumber_phoneNumber
-                    },
-                    "enrolmentDate": (self._trainee_enrolmentDate.strftime("%Y-%m-%d")
-                                      if self._trainee_enrolmentDate is not None else None),
-                    "sponsorshipType": (self._trainee_sponsorshipType.value if
-                                        self._trainee_sponsorshipType is not None else None),
-                },
-                "trainingPartner": {
-                    "uen": (self._trainingPartner_uen
-                            if ("uen" not in st.session_state or st.session_state["uen"] is None)
-                            else self._trainingPartner_uen),
-                    "code": self._trainingPartner_code
-                }
-            }
-        }
-
-        pl = remove_null_fields(pl)
-
         if as_json_str:
-            return json.dumps(pl)
+            return CreateEnrolmentInfo._SERIALIZER.json(self)
 
-        return pl
+        return CreateEnrolmentInfo._SERIALIZER.dict(self)
 
     def has_overridden_uen(self) -> bool:
         return self._trainingPartner_uen is not None and len(self._trainingPartner_uen) > 0
@@ -509,6 +527,8 @@ class CreateEnrolmentInfo(AbstractRequestInfo):
 class UpdateEnrolmentInfo(CreateEnrolmentInfo):
     """Class that encapsulates all information needed to update an enrolment record"""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
@@ -735,6 +755,7 @@ class UpdateEnrolmentInfo(CreateEnrolmentInfo):
     def trainingPartner_uen(self, uen: str):
         raise NotImplementedError("This method is not supported!")
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -823,6 +844,7 @@ class UpdateEnrolmentInfo(CreateEnrolmentInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -878,6 +900,8 @@ class UpdateEnrolmentInfo(CreateEnrolmentInfo):
 class CancelEnrolmentInfo(UpdateEnrolmentInfo):
     """Contains information related to the cancelling of an enrolment"""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
@@ -887,6 +911,7 @@ class CancelEnrolmentInfo(UpdateEnrolmentInfo):
     def __str__(self):
         return self.__repr__()
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors, warnings = [], []
 
@@ -895,6 +920,7 @@ class CancelEnrolmentInfo(UpdateEnrolmentInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         pl = {
             "enrolment": {
@@ -1017,6 +1043,9 @@ class CancelEnrolmentInfo(UpdateEnrolmentInfo):
 class SearchEnrolmentInfo(AbstractRequestInfo):
     """Contains information related to the query of an enrolment"""
 
+    # keys of the session state which the payload depends on
+    SESSION_FIELDS: tuple[str, ...] = ("uen",)
+
     def __init__(self):
         self._lastUpdateDateTo: Annotated[Optional[datetime.date], "Formatted as YYYY-MM-DD"] = None
         self._lastUpdateDateFrom: Annotated[Optional[datetime.date], "Formatted as YYYY-MM-DD"] = None
@@ -1247,6 +1276,7 @@ class SearchEnrolmentInfo(AbstractRequestInfo):
 
         self._parameters_page_size = page_size
 
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -1273,6 +1303,7 @@ class SearchEnrolmentInfo(AbstractRequestInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
@@ -1344,6 +1375,9 @@ class SearchEnrolmentInfo(AbstractRequestInfo):
 class UpdateEnrolmentFeeCollectionInfo(UpdateEnrolmentInfo):
     """Contains information about the updating of enrolment fee collection"""
 
+    __slots__ = ("_trainee_fees_feeCollectionStatus",)
+
+    @memoized
     def validate(self) -> tuple[list[str], list[str]]:
         errors = []
         warnings = []
@@ -1353,6 +1387,7 @@ class UpdateEnrolmentFeeCollectionInfo(UpdateEnrolmentInfo):
 
         return errors, warnings
 
+    @memoized
     def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
         if verify:
             err, _ = self.validate()
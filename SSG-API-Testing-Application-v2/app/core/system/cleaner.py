@@ -15,6 +15,9 @@ SCHEDULER = BackgroundScheduler()
 # this ID is used to uniquely identify the cleanup process on the system
 UNIQUE_JOB_ID = "ssg"
 
+# suffixes of the temporary files removed, which hold key files and the results of bulk imports
+TEMP_SUFFIXES = (".pem", "-enrolments.csv")
+
 
 def start_schedule():
     """
@@ -38,11 +41,11 @@ def start_schedule():
 
 
 def _clean_temp():
-    """Iterates through the temporary file directory and removes any temporary key files"""
+    """Iterates through the temporary file directory and removes any temporary key files and import results"""
 
     temp_dir = tempfile.gettempdir()
     for filename in os.listdir(temp_dir):
-        if filename.endswith(".pem"):
+        if filename.endswith(TEMP_SUFFIXES):
             try:
                 os.remove(os.path.join(temp_dir, filename))
                 logging.log(logging.INFO, f"Removed temporary file: {filename}")
@@ -10,7 +10,7 @@ There are 4 main processes:
     - This tab allows you to edit or delete your existing course runs.
 4. View Course Sessions
     - This tab allows you to enter a Course Reference ID and a corresponding Course Run ID to retrieve
-      course session information from the API
+      course session information from the API, either for a single month or for a range of months
 
 It is important to note that optional fields are always hidden behind a Streamlit checkbox to allow the backend
 functions to clean up the request body and send requests that contains only non-null fields.
@@ -1451,6 +1451,7 @@ with sessions:
                          key="view-sessions-course-run-id")
 
     month_value, year_value = None, None
+    end_month_value, end_year_value = None, None
 
     if st.checkbox("Specify Month and Year to retrieve?", key="specify-view-sessions-month-year"):
         month, year = st.columns(2)
@@ -1466,6 +1467,23 @@ with sessions:
                                        help="The year of the sessions to retrieve",
                                        key="view-sessions-year")
 
+        if st.checkbox("Retrieve a range of months?", key="specify-view-sessions-range",
+                       help="The sessions of every month from the month above to the end month below are retrieved "
+                            "concurrently and merged. Months retrieved a short while ago are not retrieved again, "
+                            "so extending a range only retrieves the new months."):
+            end_month, end_year = st.columns(2)
+            end_month_value = end_month.selectbox(label="Select End Month value",
+                                                  options=Month,
+                                                  format_func=str,
+                                                  help="The last month of the sessions to retrieve",
+                                                  key="view-sessions-end-month")
+            end_year_value = end_year.number_input(label="Select End Year value",
+                                                   min_value=1900,
+                                                   max_value=9999,
+                                                   value=datetime.now().year,
+                                                   help="The year of the last month of the sessions to retrieve",
+                                                   key="view-sessions-end-year")
+
     st.divider()
     st.subheader("Send Request")
     st.markdown("Click the `Send` button below to send the request to the API!")
@@ -1495,6 +1513,27 @@ with sessions:
                 "There are no default secrets set, please try to "
                 "refetch them via the config button in the side bar.", icon="🚨")
 
+        elif end_month_value is not None and end_year_value is not None:
+            try:
+                with st.spinner("Retrieving course sessions..."):
+                    session_range = ViewCourseSessions.fetch_range(runs, crn, month_value, year_value,
+                                                                   end_month_value, end_year_value,
+                                                                   include_expired, Secrets.get_cert(),
+                                                                   Secrets.get_private_key())
+            except ValueError as ex:
+                LOGGER.error(f"Unable to retrieve course sessions! Error: {ex}")
+                st.error(f"Unable to retrieve course sessions! {ex}", icon="🚨")
+            else:
+                LOGGER.info(f"Retrieved {len(session_range.sessions)} sessions across "
+                            f"{len(session_range.months)} months")
+                st.success(f"{len(session_range.sessions)} sessions retrieved across {len(session_range.months)} "
+                           "months!", icon="✅")
+
+                for failed_month, reason in session_range.failed.items():
+                    st.warning(f"Unable to retrieve the sessions of {failed_month}! {reason}", icon="⚠️")
+
+                st.dataframe(session_range.sessions)
+
         else:
             request, response = st.tabs(["Request", "Response"])
             vcs = ViewCourseSessions(
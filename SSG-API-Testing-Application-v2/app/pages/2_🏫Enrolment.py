@@ -24,25 +24,35 @@ from app.core.testdata import TestData  # noqa: E402
 
 from app.utils.verify import Validators
 import datetime
+import os
 
+import requests
 import streamlit as st
 
+from tempfile import NamedTemporaryFile
+
 from app.core.models.enrolment import (CreateEnrolmentInfo, UpdateEnrolmentInfo,
                                        CancelEnrolmentInfo, UpdateEnrolmentFeeCollectionInfo,
                                        SearchEnrolmentInfo)
 from app.core.enrolment.create_enrolment import CreateEnrolment
+from app.core.enrolment.import_enrolment import EnrolmentImporter
 from app.core.enrolment.view_enrolment import ViewEnrolment
 from app.core.enrolment.update_enrolment import UpdateEnrolment
 from app.core.enrolment.cancel_enrolment import CancelEnrolment
 from app.core.enrolment.search_enrolment import SearchEnrolment
 from app.core.enrolment.update_enrolment_fee_collection import UpdateEnrolmentFeeCollection
+from app.core.mirror.delta_sync import DeltaSync
+from app.core.mirror.local_store import LocalStore
 from app.core.constants import (IdTypeSummary, CollectionStatus, CancellableCollectionStatus,
                                 SponsorshipType, EnrolmentSortField, SortOrder,
                                 EnrolmentCourseStatus)
 from app.core.system.logger import Logger
+from app.utils.export_utils import export_formats
 from app.utils.http_utils import handle_request, handle_response
+from app.utils.job_utils import JobJournal
 from app.utils.streamlit_utils import (init, display_config, validation_error_handler,
-                                       does_not_have_url)
+                                       does_not_have_url, export_search_results, display_local_record,
+                                       warn_if_enrolled, mirror_store)
 
 
 init()
@@ -285,6 +295,8 @@ with create:
                                                           help="Code for the training partner conducting the "
                                                                "course for which the trainee is enrolled",
                                                           key="enrolment-training-partner-code")
+
+    warn_if_enrolled(create_enrolment.trainee_id, create_enrolment.course_run_id, create_enrolment.trainingPartner_uen)
     st.divider()
     st.subheader("Preview Request Body")
     with st.expander("Request Body"):
@@ -331,6 +343,61 @@ with create:
                                                        Secrets.get_private_key()),
                                     Secrets.get_encryption_key())
 
+    st.divider()
+    st.subheader("Bulk Import")
+    st.markdown("Upload a CSV or Excel roster to create an enrolment for every trainee in it. Each column of the "
+                "roster should be named after one of the fields below, and the outcome of every row is written to a "
+                "result file that you can download once the import completes. Rows for trainees who are already "
+                "enrolled on the course run, according to the roster itself or the local mirror, are not submitted. "
+                "If an import is interrupted, importing the same roster again resumes it without creating the "
+                "enrolments which already went through a second time.")
+    st.code(", ".join(EnrolmentImporter.COLUMNS), language="text")
+    roster = st.file_uploader(label="Roster", type=["csv", "xlsx"], key="enrolment-bulk-roster")
+
+    if st.button("Import", key="enrolment-bulk-button", type="primary", disabled=roster is None):
+        LOGGER.info("Attempting to import enrolments from roster...")
+
+        if does_not_have_url():
+            LOGGER.error("Missing Endpoint URL!")
+            st.error("Missing Endpoint URL! Navigate to the Home page to set up the URL!", icon="🚨")
+        elif not st.session_state["secret_fetched"]:
+            LOGGER.error("There are no default secrets loaded!")
+            st.error("There are no default secrets set, please try to refetch them via the config button in the "
+                     "side bar.", icon="🚨")
+        else:
+            results = NamedTemporaryFile(mode="w", suffix="-enrolments.csv", delete=False, encoding="utf-8",
+                                         newline="")
+
+            try:
+                with st.spinner("Importing enrolments..."):
+                    try:
+                        importer = EnrolmentImporter(store=mirror_store())
+
+                        with JobJournal(JobJournal.path_for("enrolment-import", roster.getvalue())) as journal:
+                            summary = importer.run(roster, results, Secrets.get_encryption_key(),
+                                                   Secrets.get_cert(), Secrets.get_private_key(), journal=journal)
+                            counts = journal.counts()
+
+                            # the journal is only kept while some enrolments may still have to be resumed
+                            if counts[JobJournal.PENDING] == 0 and counts[JobJournal.SENT] == 0:
+                                journal.discard()
+                    except (ImportError, ValueError, requests.RequestException) as ex:
+                        LOGGER.error(f"Unable to import roster! Error: {ex}")
+                        st.error(f"Unable to import roster! {ex}", icon="🚨")
+                        summary = None
+                    finally:
+                        results.close()
+
+                if summary is not None:
+                    LOGGER.info(f"Imported roster: {summary}")
+                    st.success(f"{summary['succeeded']} enrolments created, {summary['failed']} rows failed!")
+
+                    with open(results.name, "rb") as file:
+                        st.download_button("Download Results", file, file_name="enrolment-results.csv",
+                                           mime="text/csv", key="enrolment-bulk-results")
+            finally:
+                os.remove(results.name)
+
 
 with update:
     st.header("Update Enrolment")
@@ -793,6 +860,75 @@ with search:
                                                        Secrets.get_private_key()),
                                     Secrets.get_encryption_key())
 
+    st.subheader("Export All Results")
+    st.markdown("Fetch every page of results matching the search above, starting from the page specified, and "
+                "export the enrolment records to a file. Exporting to Parquet is only offered if `pyarrow` is "
+                "installed.")
+    search_export_format = st.radio("Export Format", options=export_formats(), horizontal=True,
+                                    key="search-export-format")
+
+    if st.button("Export", key="search-export-button"):
+        LOGGER.info("Attempting to export results from Search Enrolment API...")
+
+        if does_not_have_url():
+            LOGGER.error("Missing Endpoint URL!")
+            st.error("Missing Endpoint URL! Navigate to the Home page to set up the URL!", icon="🚨")
+        elif st.session_state["uen"] is None and not search_enrolment.has_overridden_uen():
+            st.error("Make sure to fill in your UEN via the **Home page** or via the **Specify Training Partner UEN**"
+                     " before proceeding!", icon="🚨")
+        elif not st.session_state["secret_fetched"]:
+            LOGGER.error("There are no default secrets loaded!")
+            st.error("There are no default secrets set, please try to refetch them via the config button in the "
+                     "side bar.", icon="🚨")
+        else:
+            errors, warnings = search_enrolment.validate()
+
+            if validation_error_handler(errors, warnings):
+                export_search_results(lambda: SearchEnrolment.iterate(search_enrolment,
+                                                                      Secrets.get_encryption_key(),
+                                                                      Secrets.get_cert(),
+                                                                      Secrets.get_private_key()).pages(),
+                                      search_export_format, "enrolments", "search-export-download")
+
+    st.subheader("Sync Local Mirror")
+    st.markdown("Fetch the enrolment records matching the search above which were updated since the last sync, and "
+                "store them in the local mirror, which is used to check for existing enrolments before new ones are "
+                "created. The dates, sorting and page specified above are ignored.")
+    store = mirror_store(search_enrolment.trainingPartner_uen)
+    st.caption(f"{store.count(LocalStore.ENROLMENTS)} enrolments in the local mirror")
+
+    if st.button("Sync", key="search-sync-button"):
+        LOGGER.info("Attempting to sync enrolments into the local mirror...")
+
+        if does_not_have_url():
+            LOGGER.error("Missing Endpoint URL!")
+            st.error("Missing Endpoint URL! Navigate to the Home page to set up the URL!", icon="🚨")
+        elif st.session_state["uen"] is None and not search_enrolment.has_overridden_uen():
+            st.error("Make sure to fill in your UEN via the **Home page** or via the **Specify Training Partner UEN**"
+                     " before proceeding!", icon="🚨")
+        elif not st.session_state["secret_fetched"]:
+            LOGGER.error("There are no default secrets loaded!")
+            st.error("There are no default secrets set, please try to refetch them via the config button in the "
+                     "side bar.", icon="🚨")
+        else:
+            errors, warnings = search_enrolment.validate()
+
+            if validation_error_handler(errors, warnings):
+                with st.spinner("Syncing enrolments..."):
+                    try:
+                        result = DeltaSync(store).sync_enrolments(search_enrolment,
+                                                                  Secrets.get_encryption_key(),
+                                                                  Secrets.get_cert(),
+                                                                  Secrets.get_private_key())
+                    except Exception as ex:
+                        LOGGER.error(f"Unable to sync enrolments! Error: {ex}")
+                        st.error(f"Unable to sync enrolments! {ex}", icon="🚨")
+                    else:
+                        LOGGER.info(f"Synced enrolments: {result}")
+                        st.success(f"{result.fetched} enrolments updated since "
+                                   f"{result.since if result.since is not None else 'the beginning'} were fetched, "
+                                   f"and {result.upserted} were stored!")
+
 
 with view:
     st.info("""Although the documentation states that your *request payloads* needs to be **encrypted**,
@@ -808,6 +944,7 @@ with view:
                             value=TestData.ENROLMENT_ID.value,
                             help="SSG-generated unique reference number for the enrolment record",
                             key="view-enrolment-reference-number")
+    display_local_record(LocalStore.ENROLMENTS, ref_num)
 
     st.divider()
     st.subheader("Send Request")
@@ -8,14 +8,19 @@ There are 2 main processes:
       the course session attendance of a particular course run and session.
 2. Upload Course Session Attendance
     - This tab allows you to upload information regarding the attendance of a trainee for a particular course run
-      and course session to record their attendance.
+      and course session to record their attendance, or to upload the attendance of every trainee for every
+      session of a course run at once from an attendance matrix.
 
 It is important to note that optional fields are always hidden behind a Streamlit checkbox to allow the backend
 functions to clean up the request body and send requests that contains only non-null fields.
 """
 
+import io
+
+import requests
 import streamlit as st
 
+from app.core.attendance.bulk_upload_attendance import BulkAttendanceUpload
 from app.core.attendance.course_session_attendance import CourseSessionAttendance
 from app.core.attendance.upload_course_session_attendance import (
     UploadCourseSessionAttendance)
@@ -24,6 +29,7 @@ from app.core.models.attendance import UploadAttendanceInfo
 from app.core.system.logger import Logger
 
 from app.utils.http_utils import handle_response, handle_request
+from app.utils.job_utils import JobJournal
 from app.utils.streamlit_utils import init, display_config, \
     validation_error_handler, does_not_have_url
 from app.utils.verify import Validators
@@ -291,3 +297,56 @@ with upload:
                     handle_response(lambda: uca.execute(Secrets.get_encryption_key(),
                                                         Secrets.get_cert(),
                                                         Secrets.get_private_key()))
+
+    st.divider()
+    st.subheader("Bulk Upload")
+    st.markdown("Upload a CSV or Excel attendance matrix to upload the attendance of every trainee for every session "
+                "of the course run above at once. Each row describes a trainee using the columns below, and every "
+                "other column is a session ID whose cells hold the attendance status of the trainee for that "
+                "session (e.g. `1` or `Confirmed`). Empty cells are skipped. If an upload is interrupted, uploading "
+                "the same matrix again resumes it without uploading the cells which already went through a second "
+                "time.")
+    st.code(", ".join(BulkAttendanceUpload.TRAINEE_COLUMNS), language="text")
+    matrix = st.file_uploader(label="Attendance Matrix", type=["csv", "xlsx"], key="attendance-bulk-matrix")
+
+    if st.button("Upload All", key="attendance-bulk-button", type="primary", disabled=matrix is None):
+        LOGGER.info("Attempting to upload attendance matrix...")
+
+        if does_not_have_url():
+            LOGGER.error("Missing Endpoint URL!")
+            st.error("Missing Endpoint URL! Navigate to the Home page to set up the URL!", icon="🚨")
+        elif not st.session_state["uen"]:
+            LOGGER.error("Missing UEN, request aborted!")
+            st.error("Make sure to fill in your **UEN** before proceeding!", icon="🚨")
+        elif not st.session_state["secret_fetched"]:
+            LOGGER.error("There are no default secrets loaded!")
+            st.error("There are no default secrets set, please try to refetch them via the config button in the "
+                     "side bar.", icon="🚨")
+        else:
+            try:
+                upload = BulkAttendanceUpload(runs, uploadAttendance.referenceNumber, uploadAttendance.corppassId)
+                path = JobJournal.path_for("attendance-upload", runs.encode() + matrix.getvalue())
+
+                with st.spinner("Uploading attendance..."), JobJournal(path) as journal:
+                    report = upload.run(matrix, Secrets.get_encryption_key(), Secrets.get_cert(),
+                                        Secrets.get_private_key(), journal=journal)
+                    counts = journal.counts()
+
+                    # the journal is only kept while some attendance records may still have to be resumed
+                    if counts[JobJournal.PENDING] == 0 and counts[JobJournal.SENT] == 0:
+                        journal.discard()
+            except (ImportError, ValueError, requests.RequestException) as ex:
+                LOGGER.error(f"Unable to upload attendance matrix! Error: {ex}")
+                st.error(f"Unable to upload attendance matrix! {ex}", icon="🚨")
+            else:
+                summary = report.summary()
+                LOGGER.info(f"Uploaded attendance matrix: {summary}")
+                st.success(f"{summary['UPLOADED']} attendance records uploaded, {summary['FAILED']} rejected, "
+                           f"{summary['INVALID']} invalid and {summary['SKIPPED']} empty cells skipped!")
+                st.subheader("Reconciliation Report")
+                st.dataframe(report.rows())
+
+                output = io.StringIO()
+                report.to_csv(output)
+                st.download_button("Download Report", output.getvalue(), file_name="attendance-reconciliation.csv",
+                                   mime="text/csv", key="attendance-bulk-report")
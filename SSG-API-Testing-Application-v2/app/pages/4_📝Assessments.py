@@ -28,10 +28,14 @@ from app.core.constants import (Grade, Results, IdTypeSummary, AssessmentUpdateV
                                 SortField, SortOrder)
 from app.core.models.assessments import CreateAssessmentInfo, UpdateVoidAssessmentInfo, \
     SearchAssessmentInfo
+from app.core.mirror.delta_sync import DeltaSync
+from app.core.mirror.local_store import LocalStore
 from app.core.system.logger import Logger
+from app.utils.export_utils import export_formats
 from app.utils.http_utils import handle_response, handle_request
 from app.utils.streamlit_utils import init, display_config, \
-    validation_error_handler, does_not_have_url
+    validation_error_handler, does_not_have_url, export_search_results, display_local_record, warn_if_not_enrolled, \
+    mirror_store
 from app.utils.verify import Validators
 
 import app.core.system.secrets as Secrets
@@ -123,6 +127,9 @@ with create:
             and not Validators.verify_nric(create_assessment_info.trainee_id):
         st.warning("**ID Number** may not be valid!", icon="⚠️")
 
+    warn_if_not_enrolled(create_assessment_info.trainee_id, create_assessment_info.course_runId,
+                         create_assessment_info.trainingPartner_uen)
+
     create_assessment_info.trainee_fullName = st.text_input(label="\\* Enter the Trainee Full Name "
                                                             f"(Sample data: {TestData.TRAINEE_NAME.value})",
                                                             value=TestData.TRAINEE_NAME.value,
@@ -491,6 +498,69 @@ with find:
                                                        Secrets.get_private_key()),
                                     Secrets.get_encryption_key())
 
+    st.subheader("Export All Results")
+    st.markdown("Fetch every page of results matching the search above, starting from the page specified, and "
+                "export the assessment records to a file. Exporting to Parquet is only offered if `pyarrow` is "
+                "installed.")
+    search_export_format = st.radio("Export Format", options=export_formats(), horizontal=True,
+                                    key="search-export-format")
+
+    if st.button("Export", key="search-export-button"):
+        LOGGER.info("Attempting to export results from Search Assessment API...")
+
+        if does_not_have_url():
+            LOGGER.error("Missing Endpoint URL!")
+            st.error("Missing Endpoint URL! Navigate to the Home page to set up the URL!", icon="🚨")
+        elif not st.session_state["secret_fetched"]:
+            LOGGER.error("There are no default secrets loaded!")
+            st.error("There are no default secrets set, please try to refetch them via the config button in the "
+                     "side bar.", icon="🚨")
+        else:
+            errors, warnings = search_assessment.validate()
+
+            if validation_error_handler(errors, warnings):
+                export_search_results(lambda: SearchAssessment.iterate(search_assessment,
+                                                                       Secrets.get_encryption_key(),
+                                                                       Secrets.get_cert(),
+                                                                       Secrets.get_private_key()).pages(),
+                                      search_export_format, "assessments", "search-export-download")
+
+    st.subheader("Sync Local Mirror")
+    st.markdown("Fetch the assessment records matching the search above which were updated since the last sync, and "
+                "store them in the local mirror, so that they can be looked up without calling the API. The dates, "
+                "sorting and page specified above are ignored.")
+    store = mirror_store(search_assessment.trainingPartner_uen)
+    st.caption(f"{store.count(LocalStore.ASSESSMENTS)} assessments in the local mirror")
+
+    if st.button("Sync", key="search-sync-button"):
+        LOGGER.info("Attempting to sync assessments into the local mirror...")
+
+        if does_not_have_url():
+            LOGGER.error("Missing Endpoint URL!")
+            st.error("Missing Endpoint URL! Navigate to the Home page to set up the URL!", icon="🚨")
+        elif not st.session_state["secret_fetched"]:
+            LOGGER.error("There are no default secrets loaded!")
+            st.error("There are no default secrets set, please try to refetch them via the config button in the "
+                     "side bar.", icon="🚨")
+        else:
+            errors, warnings = search_assessment.validate()
+
+            if validation_error_handler(errors, warnings):
+                with st.spinner("Syncing assessments..."):
+                    try:
+                        result = DeltaSync(store).sync_assessments(search_assessment,
+                                                                   Secrets.get_encryption_key(),
+                                                                   Secrets.get_cert(),
+                                                                   Secrets.get_private_key())
+                    except Exception as ex:
+                        LOGGER.error(f"Unable to sync assessments! Error: {ex}")
+                        st.error(f"Unable to sync assessments! {ex}", icon="🚨")
+                    else:
+                        LOGGER.info(f"Synced assessments: {result}")
+                        st.success(f"{result.fetched} assessments updated since "
+                                   f"{result.since if result.since is not None else 'the beginning'} were fetched, "
+                                   f"and {result.upserted} were stored!")
+
 with view:
     st.header("View Assessment")
     st.markdown(
@@ -502,6 +572,7 @@ with view:
                         max_chars=100,
                         help="Assessment reference number",
                         key="view-assessment-reference-number")
+    display_local_record(LocalStore.ASSESSMENTS, arn)
 
     st.divider()
     st.subheader("Send Request")
@@ -1,7 +1,10 @@
+import asyncio
+import copy
+import json
 import unittest
 import requests
 
-from app.core.abc.abstract import AbstractRequest, AbstractRequestInfo
+from app.core.abc.abstract import AbstractRequest, AbstractRequestInfo, memoized
 
 
 class TestAbstract(unittest.TestCase):
@@ -46,6 +49,35 @@ class TestAbstract(unittest.TestCase):
         except Exception as ex:
             self.fail(ex)
 
+    def test_execute_async(self):
+        """Tests to ensure that execute_async() awaits the result of execute() with the same arguments."""
+
+        class ConcreteRequest(AbstractRequest):
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def __repr__(self):
+                pass
+
+            def __str__(self):
+                pass
+
+            def _prepare(self, *args, **kwargs):
+                pass
+
+            def execute(self, cert_pem, key_pem) -> requests.Response:
+                response = requests.Response()
+                response.status_code = 200
+                response._content = f"{cert_pem},{key_pem}".encode()
+                return response
+
+        async def run_all():
+            return await asyncio.gather(*[ConcreteRequest().execute_async(f"cert{i}", key_pem="key")
+                                          for i in range(5)])
+
+        responses = asyncio.run(run_all())
+        self.assertEqual([r.text for r in responses], [f"cert{i},key" for i in range(5)])
+
     def test_concrete_abstract_request_info(self):
         """Tests to ensure that concrete instances of AbstractRequestInfo can be initialised."""
 
@@ -69,3 +101,106 @@ class TestAbstract(unittest.TestCase):
             ConcreteRequestInfo()
         except Exception as ex:
             self.fail(ex)
+
+    def test_memoized(self):
+        """Tests to ensure that memoized methods are only recomputed after a field of the model changes."""
+
+        calls = []
+
+        class ConcreteRequestInfo(AbstractRequestInfo):
+            __slots__ = ("_name", "_children")
+
+            def __init__(self, name: str):
+                self._name = name
+                self._children = []
+
+            def __repr__(self):
+                return self.payload(verify=False, as_json_str=True)
+
+            def __str__(self):
+                return self.__repr__()
+
+            @memoized
+            def validate(self) -> tuple[list[str], list[str]]:
+                calls.append(self._name)
+                return ([] if self._name else ["No name!"]), []
+
+            @memoized
+            def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
+                if verify:
+                    self.validate()
+
+                calls.append(f"payload {self._name}")
+                pl = {"name": self._name, "children": [child.payload(verify=False) for child in self._children]}
+                return json.dumps(pl) if as_json_str else pl
+
+            def add_child(self, child):
+                self._children.append(child)
+                self._changed(child)
+
+        parent, child = ConcreteRequestInfo("parent"), ConcreteRequestInfo("child")
+        parent.add_child(child)
+
+        parent.validate()[0].append("modified by the caller")
+        parent.payload()
+        self.assertEqual(parent.validate(), ([], []))
+        self.assertEqual(parent.payload(), parent.payload())
+
+        # payload dictionaries are rebuilt on every call, so they are never shared with the caller
+        parent.payload()["name"] = "modified by the caller"
+        self.assertEqual(parent.payload()["name"], "parent")
+        self.assertEqual(calls.count("parent"), 1)
+
+        # JSON strings are reused until a field changes
+        calls.clear()
+        self.assertEqual(repr(parent), '{"name": "parent", "children": [{"name": "child", "children": []}]}')
+        self.assertEqual(repr(parent), '{"name": "parent", "children": [{"name": "child", "children": []}]}')
+        self.assertEqual(calls, ["payload parent", "payload child"])
+
+        # changing a field is tracked by the setter
+        parent._name = ""
+        self.assertEqual(parent.validate(), (["No name!"], []))
+        self.assertEqual(parent.payload(verify=False)["name"], "")
+
+        # changing a nested model invalidates the memoized payload of its parent, however deeply it is nested
+        grandchild = ConcreteRequestInfo("grandchild")
+        child.add_child(grandchild)
+        self.assertIn('"grandchild"', repr(parent))
+        grandchild._name = "renamed"
+        self.assertIn('"renamed"', repr(parent))
+
+        # models assigned to a field are tracked as well
+        parent._children = [ConcreteRequestInfo("replaced")]
+        self.assertIn('"replaced"', repr(parent))
+        parent._children[0]._name = "changed"
+        self.assertIn('"changed"', repr(parent))
+
+        # memoization does not change the fields of the model
+        self.assertEqual(vars(grandchild), {"_name": "renamed", "_children": []})
+
+        # copies of a model do not share its memo, nor report changes to its parents
+        duplicate = copy.deepcopy(grandchild)
+        self.assertEqual(repr(duplicate), repr(grandchild))
+        self.assertIsNot(getattr(duplicate, "_memo", None), getattr(grandchild, "_memo", None))
+        before = repr(parent)
+        duplicate._name = "copied"
+        calls.clear()
+        self.assertEqual(repr(parent), before)
+        self.assertEqual(calls, [])
+
+        # models without memoized methods do not pay for tracking changes
+        class UntrackedRequestInfo(AbstractRequestInfo):
+            def __repr__(self):
+                return self.payload(as_json_str=True)
+
+            def __str__(self):
+                return self.__repr__()
+
+            def validate(self) -> tuple[list[str], list[str]]:
+                return [], []
+
+            def payload(self, verify: bool = True, as_json_str: bool = False) -> dict | str:
+                return "{}" if as_json_str else {}
+
+        self.assertIsNot(ConcreteRequestInfo.__setattr__, object.__setattr__)
+        self.assertIs(UntrackedRequestInfo.__setattr__, object.__setattr__)
@@ -0,0 +1,191 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import requests
+
+from streamlit.testing.v1 import AppTest
+
+from app.core.abc.abstract import AbstractRequest
+from app.core.attendance.bulk_upload_attendance import AttendanceRecord, BulkAttendanceUpload
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.constants import Attendance, IdType
+from app.core.models.attendance import UploadAttendanceInfo
+from app.utils.batch_utils import BatchExecutor
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.job_utils import JobJournal
+
+KEY = "lBzq4y040AY0m4I2AUGJcxhjcY6Ykl0nHqOMGlN95bg="
+
+
+class _MockUpload(AbstractRequest):
+    """Request which accepts every attendance, except those of session S3"""
+
+    lock = threading.Lock()
+    uploaded = []
+
+    def __init__(self, run_id: str, info: UploadAttendanceInfo):
+        self.req = HTTPRequestBuilder().with_endpoint(f"https://api.example.com/courses/runs/{run_id}")
+        self.info = info
+
+    def __repr__(self):
+        return self.info.sessionId
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _prepare(self, *args, **kwargs):
+        pass
+
+    def execute(self, encryption_key, cert_pem, key_pem) -> requests.Response:
+        with _MockUpload.lock:
+            _MockUpload.uploaded.append((self.info.trainee_id, self.info.sessionId, self.info.status_code))
+
+        response = requests.Response()
+        response.status_code = 400 if self.info.sessionId == "S3" else 200
+        error = Cryptography.encrypt(encryption_key, "Session has ended").decode()
+        response._content = json.dumps({"error": error}).encode()
+
+        return response
+
+
+def _upload_script():
+    """Page script which uploads an attendance matrix through the real UploadCourseSessionAttendance request"""
+
+    import io
+
+    import streamlit as st
+
+    from app.core.attendance.bulk_upload_attendance import BulkAttendanceUpload
+    from app.test.core.attendance.test_bulk_upload_attendance import KEY, TestBulkUploadAttendance
+    from app.utils.batch_utils import BatchExecutor
+    from app.utils.streamlit_utils import init
+
+    init()
+    st.session_state["cert_pem"] = "cert.pem"
+    st.session_state["key_pem"] = "key.pem"
+
+    upload = BulkAttendanceUpload("1000", "TGS-1", "S1234567D", executor=BatchExecutor(max_workers=4))
+    report = upload.run(io.StringIO(TestBulkUploadAttendance.MATRIX), KEY, "cert.pem", "key.pem")
+    st.session_state["summary"] = report.summary()
+
+
+class TestBulkUploadAttendance(unittest.TestCase):
+    """
+    Tests the BulkAttendanceUpload class.
+    """
+
+    MATRIX = ("traineeId,traineeName,traineeEmail,traineeIdType,countryCode,S1,S2,S3\n"
+              "S1234567D,Alice,alice@example.com,SP,65,1,Unconfirmed,1\n"
+              "T9031775F,Bob,bob@example.com,SB,65,,confirmed,1\n"
+              "F3875860T,Carol,carol@example.com,XX,65,1,1,1\n"
+              "G3327819K,Dave,not an email,FP,65,9,1,\n")
+
+    def setUp(self):
+        _MockUpload.uploaded = []
+
+    def _upload(self) -> BulkAttendanceUpload:
+        return BulkAttendanceUpload("1000", "TGS-1", "S1234567D", executor=BatchExecutor(max_workers=4),
+                                    request_factory=_MockUpload)
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            BulkAttendanceUpload("", "TGS-1", "S1234567D")
+
+        with self.assertRaises(ValueError):
+            BulkAttendanceUpload("1000", None, "S1234567D")
+
+        with self.assertRaises(ValueError):
+            BulkAttendanceUpload("1000", "TGS-1", "")
+
+        with self.assertRaises(ValueError):
+            self._upload().run(123, KEY, "cert.pem", "key.pem")
+
+    def test_run(self):
+        report = self._upload().run(io.StringIO(TestBulkUploadAttendance.MATRIX), KEY, "cert.pem", "key.pem")
+
+        self.assertEqual(len(report), 12)
+        self.assertEqual(report.summary(), {"PENDING": 0, "UPLOADED": 3, "FAILED": 2, "INVALID": 5, "SKIPPED": 2})
+        self.assertEqual([(record.trainee_id, record.session_id) for record in report.records][:3],
+                         [("S1234567D", "S1"), ("S1234567D", "S2"), ("S1234567D", "S3")])
+        self.assertEqual(sorted(_MockUpload.uploaded),
+                         [("S1234567D", "S1", Attendance.CONFIRMED), ("S1234567D", "S2", Attendance.UNCONFIRMED),
+                          ("S1234567D", "S3", Attendance.CONFIRMED), ("T9031775F", "S2", Attendance.CONFIRMED),
+                          ("T9031775F", "S3", Attendance.CONFIRMED)])
+        self.assertEqual(report.by_session()["S3"], {"FAILED": 2, "INVALID": 1, "SKIPPED": 1})
+
+        failed = [record for record in report.records if record.outcome == AttendanceRecord.FAILED]
+        self.assertEqual(failed[0].error, "HTTP 400: Session has ended")
+
+        invalid = {(record.trainee_id, record.session_id): record.error for record in report.records
+                   if record.outcome == AttendanceRecord.INVALID}
+        self.assertIn("not a valid IdType", invalid[("F3875860T", "S1")])
+        self.assertIn("not a valid Attendance", invalid[("G3327819K", "S1")])
+        self.assertIn("Trainee Email specified is not of the correct format!", invalid[("G3327819K", "S2")])
+        self.assertEqual(len(report.discrepancies()), 7)
+
+        output = io.StringIO()
+        report.to_csv(output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "line,traineeId,sessionId,status,outcome,error")
+        self.assertEqual(lines[1], "2,S1234567D,S1,Confirmed,UPLOADED,")
+
+    def test_run_resumes_from_journal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "attendance.jsonl")
+
+            with JobJournal(path) as journal:
+                self._upload().run(io.StringIO(TestBulkUploadAttendance.MATRIX), KEY, "cert.pem", "key.pem",
+                                   journal=journal)
+
+            self.assertEqual(len(_MockUpload.uploaded), 5)
+            _MockUpload.uploaded = []
+
+            # only the uploads which were rejected are sent again
+            with JobJournal(path) as journal:
+                report = self._upload().run(io.StringIO(TestBulkUploadAttendance.MATRIX), KEY, "cert.pem",
+                                            "key.pem", journal=journal)
+
+        self.assertEqual(sorted(_MockUpload.uploaded),
+                         [("S1234567D", "S3", Attendance.CONFIRMED), ("T9031775F", "S3", Attendance.CONFIRMED)])
+        self.assertEqual(report.summary(), {"PENDING": 0, "UPLOADED": 3, "FAILED": 2, "INVALID": 5, "SKIPPED": 2})
+
+    def test_run_upload_course_session_attendance(self):
+        def respond(method, url, **kwargs):
+            payload = json.loads(Cryptography.decrypt(KEY, kwargs["json"]).decode("utf-8"))
+
+            response = requests.Response()
+            response.status_code = 400 if payload["course"]["sessionID"] == "S3" else 202
+            response._content = b"{}"
+            return response
+
+        session = MagicMock()
+        session.request.side_effect = respond
+
+        # the requests are sent on worker threads, which must see the session state of the page
+        with patch("app.utils.http_utils.SESSION_POOL.get", return_value=session):
+            app = AppTest.from_function(_upload_script).run(timeout=30)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertEqual(app.session_state["summary"],
+                         {"PENDING": 0, "UPLOADED": 3, "FAILED": 2, "INVALID": 5, "SKIPPED": 2})
+        self.assertEqual(session.request.call_count, 5)
+        self.assertTrue(all(call.args[1].endswith("/courses/runs/1000/sessions/attendance")
+                            for call in session.request.call_args_list))
+
+    def test_run_dataframe(self):
+        frame = pd.read_csv(io.StringIO(TestBulkUploadAttendance.MATRIX), dtype={"countryCode": float})
+        report = self._upload().run(frame, KEY, "cert.pem", "key.pem")
+
+        self.assertEqual(report.summary(), {"PENDING": 0, "UPLOADED": 3, "FAILED": 2, "INVALID": 5, "SKIPPED": 2})
+
+        uploaded = self._upload().run([{"traineeId": "S1234567D", "traineeName": "Alice", "mobile": 91234567,
+                                        "countryCode": "65", "traineeIdType": IdType.SINGAPORE_PINK.value[1],
+                                        "S1": "1"}], KEY, "cert.pem", "key.pem")
+        self.assertEqual(uploaded.summary()["UPLOADED"], 1)
@@ -1,6 +1,8 @@
+import base64
+import io
 import unittest
 
-from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.cipher.encrypt_decrypt import CIPHERTEXT_CACHE, CiphertextCache, CipherResult, Cryptography
 
 
 class TestEncryptDecrypt(unittest.TestCase):
@@ -31,3 +33,151 @@ class TestEncryptDecrypt(unittest.TestCase):
         decrypted = Cryptography.decrypt(self.KEY, encrypted)
 
         self.assertEqual(plaintext, decrypted)
+
+    def test_cipher_cached(self):
+        self.assertIs(Cryptography.cipher(self.KEY), Cryptography.cipher(self.KEY))
+
+        # every context created from the cached cipher is independent
+        self.assertEqual(Cryptography.encrypt(self.KEY, "Hello, World!"),
+                         Cryptography.encrypt(self.KEY, "Hello, World!"))
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            Cryptography.cipher("not a key!")
+
+        with self.assertRaises(ValueError):
+            # valid base64, but only 64 bits long
+            Cryptography.encrypt("AAAAAAAAAAA=", "Hello, World!")
+
+        with self.assertRaises(ValueError):
+            Cryptography.decrypt(None, "FqhnvlhHlHszFIi0AVhqzQ==")
+
+    def test_key_whitespace(self):
+        # keys copied from a file often carry surrounding whitespace or a trailing line break
+        for key in (f" {self.KEY} ", f"{self.KEY}\n", f"{self.KEY[:20]}\n{self.KEY[20:]}", self.KEY.encode() + b"\r\n"):
+            self.assertEqual(Cryptography.encrypt(key, "Hello, World!"), b'FqhnvlhHlHszFIi0AVhqzQ==')
+
+    def test_key_sizes(self):
+        plaintext = b"Hello, World!"
+
+        for size in Cryptography.KEY_SIZES:
+            key = base64.b64encode(bytes(range(size))).decode()
+            self.assertEqual(Cryptography.decrypt(key, Cryptography.encrypt(key, plaintext)), plaintext)
+
+        # each key size selects a different variant of AES, so the ciphertexts differ
+        self.assertEqual(len({Cryptography.encrypt(base64.b64encode(bytes(size)).decode(), plaintext)
+                              for size in Cryptography.KEY_SIZES}), 3)
+
+    def test_encrypt_stream(self):
+        plaintext = bytes(range(256)) * 1000
+        expected = Cryptography.encrypt(self.KEY, plaintext)
+
+        for chunk_size in (1, 7, 16, 4096):
+            encrypted = b"".join(Cryptography.encrypt_stream(self.KEY, io.BytesIO(plaintext), chunk_size=chunk_size))
+            self.assertEqual(expected, encrypted)
+
+        self.assertEqual(b"".join(Cryptography.encrypt_stream(self.KEY, ["Hello, ", "World!"])),
+                         b'FqhnvlhHlHszFIi0AVhqzQ==')
+        self.assertEqual(b"".join(Cryptography.encrypt_stream(self.KEY, [])), Cryptography.encrypt(self.KEY, b""))
+
+    def test_decrypt_stream(self):
+        plaintext = bytes(range(256)) * 1000
+        encrypted = Cryptography.encrypt(self.KEY, plaintext).decode()
+
+        for chunk_size in (1, 5, 4096):
+            decrypted = b"".join(Cryptography.decrypt_stream(self.KEY, io.StringIO(encrypted), chunk_size=chunk_size))
+            self.assertEqual(plaintext, decrypted)
+
+        # line breaks within the ciphertext are ignored
+        wrapped = io.StringIO("\n".join(encrypted[i:i + 76] for i in range(0, len(encrypted), 76)))
+        self.assertEqual(plaintext, b"".join(Cryptography.decrypt_stream(self.KEY, wrapped)))
+
+        with self.assertRaises(ValueError):
+            list(Cryptography.decrypt_stream(self.KEY, [b"FqhnvlhHlHszFIi0AVhqzQ="]))
+
+    def test_stream_chunk_size(self):
+        with self.assertRaises(ValueError):
+            list(Cryptography.encrypt_stream(self.KEY, io.BytesIO(b"Hello"), chunk_size=0))
+
+    def test_encrypt_many(self):
+        plaintexts = [f"Message {i}" for i in range(50)]
+        results = Cryptography.encrypt_many(self.KEY, plaintexts, return_bytes=False, max_workers=4)
+
+        self.assertEqual([r.index for r in results], list(range(50)))
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual([r.value for r in results],
+                         [Cryptography.encrypt(self.KEY, p, return_bytes=False) for p in plaintexts])
+        self.assertEqual(Cryptography.encrypt_many(self.KEY, []), [])
+
+        with self.assertRaises(ValueError):
+            Cryptography.encrypt_many("not a key!", plaintexts)
+
+        with self.assertRaises(ValueError):
+            Cryptography.encrypt_many(self.KEY, plaintexts, max_workers=0)
+
+    def test_decrypt_many(self):
+        ciphertexts = [Cryptography.encrypt(self.KEY, f"Message {i}") for i in range(10)]
+        ciphertexts[3] = "not base64!"
+        ciphertexts[7] = b"FqhnvlhHlHszFIi0AVhqzA=="
+        results = Cryptography.decrypt_many(self.KEY, iter(ciphertexts), return_bytes=False)
+
+        self.assertEqual(len(results), 10)
+
+        for result in results:
+            self.assertIsInstance(result, CipherResult)
+
+            if result.index in (3, 7):
+                self.assertFalse(result.ok)
+                self.assertIsInstance(result.error, ValueError)
+                self.assertIsNone(result.value)
+            else:
+                self.assertEqual(result.value, f"Message {result.index}")
+
+    def test_decrypt_many_processes(self):
+        ciphertexts = [Cryptography.encrypt(self.KEY, f"Message {i}") for i in range(20)]
+        ciphertexts.append(b"FqhnvlhHlHszFIi0AVhqzA==")
+        results = Cryptography.decrypt_many(self.KEY, ciphertexts, max_workers=2, use_processes=True)
+
+        self.assertEqual([r.value for r in results[:20]], [f"Message {i}".encode() for i in range(20)])
+        self.assertIsInstance(results[20].error, ValueError)
+
+    def test_ciphertext_cache(self):
+        CIPHERTEXT_CACHE.clear()
+        hits = CIPHERTEXT_CACHE.hits
+
+        first = Cryptography.encrypt(self.KEY, "Hello, World!")
+        second = Cryptography.encrypt(self.KEY, b"Hello, World!", return_bytes=False)
+        self.assertEqual(first, b'FqhnvlhHlHszFIi0AVhqzQ==')
+        self.assertEqual(second, 'FqhnvlhHlHszFIi0AVhqzQ==')
+        self.assertEqual(CIPHERTEXT_CACHE.hits, hits + 1)
+
+        # a rotated key never receives the ciphertext of the old key
+        rotated = "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA="
+        self.assertNotEqual(Cryptography.encrypt(rotated, "Hello, World!"), first)
+        self.assertEqual(Cryptography.decrypt(rotated, Cryptography.encrypt(rotated, "Hello, World!")),
+                         b"Hello, World!")
+
+    def test_ciphertext_cache_limits(self):
+        calls = []
+
+        def encrypt(key, plaintext):
+            calls.append(plaintext)
+            return Cryptography._encrypt(key, plaintext)
+
+        cache = CiphertextCache(max_entries=2, max_item_bytes=8)
+        cache.encrypt(self.KEY, b"a", encrypt)
+        cache.encrypt(self.KEY, b"b", encrypt)
+        cache.encrypt(self.KEY, b"c", encrypt)
+        self.assertEqual(len(cache), 2)
+
+        # the least recently used entry is evicted
+        cache.encrypt(self.KEY, b"a", encrypt)
+        self.assertEqual(calls, [b"a", b"b", b"c", b"a"])
+
+        # large plaintexts are never cached
+        cache.encrypt(self.KEY, b"123456789", encrypt)
+        cache.encrypt(self.KEY, b"123456789", encrypt)
+        self.assertEqual(calls[-2:], [b"123456789", b"123456789"])
+
+        with self.assertRaises(ValueError):
+            CiphertextCache(max_entries=-1)
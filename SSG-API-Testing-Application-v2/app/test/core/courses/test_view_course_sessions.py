@@ -0,0 +1,113 @@
+import json
+import unittest
+
+from unittest.mock import patch
+
+import requests
+
+from app.core.constants import HttpMethod, Month, OptionalSelector
+from app.core.courses.view_course_sessions import ViewCourseSessions
+from app.utils.batch_utils import BatchExecutor
+from app.utils.cache_utils import RESPONSE_CACHE
+from app.utils.http_utils import HTTPRequestBuilder
+
+
+class _MockViewCourseSessions(ViewCourseSessions):
+    """Request which does not rely on the Streamlit session state for the endpoint and UEN"""
+
+    def _prepare(self, runId, crn, session_month, session_year, include_expired):
+        self.req = HTTPRequestBuilder() \
+            .with_endpoint(f"https://api.example.com/courses/runs/{runId}/sessions") \
+            .with_param("courseReferenceNumber", crn) \
+            .with_param("sessionMonth", ViewCourseSessions.session_month(session_month, session_year))
+
+
+def _session(session_id: str, start_date: str) -> dict:
+    return {"id": session_id, "startDate": start_date, "startTime": "09:00", "endDate": start_date,
+            "endTime": "17:00"}
+
+
+class TestViewCourseSessions(unittest.TestCase):
+    """
+    Tests the ViewCourseSessions class.
+    """
+
+    # sessions returned for every month, the last session of January spans the end of the month
+    SESSIONS = {
+        "012024": [_session("S2", "20240115"), _session("S1", "20240102"), _session("S3", "20240131")],
+        "022024": [_session("S3", "20240131"), _session("S4", "20240205")],
+        "032024": [],
+        "042024": [_session("S5", "20240401")],
+    }
+
+    def setUp(self):
+        RESPONSE_CACHE.clear()
+        self.sent = []
+
+    def tearDown(self):
+        RESPONSE_CACHE.clear()
+
+    def _send(self, builder: HTTPRequestBuilder, method: HttpMethod, cert_pem, key_pem, **kwargs):
+        month = builder.params["sessionMonth"]
+        self.sent.append(month)
+
+        response = requests.Response()
+
+        if month == "052024":
+            response.status_code = 500
+            response._content = b"{}"
+        else:
+            response.status_code = 200
+            response._content = json.dumps({"data": {"sessions": TestViewCourseSessions.SESSIONS.get(month, [])},
+                                            "status": 200}).encode()
+
+        return response
+
+    def _fetch(self, start: tuple[Month, int], end: tuple[Month, int]):
+        with patch.object(HTTPRequestBuilder, "_send", autospec=True, side_effect=self._send):
+            return ViewCourseSessions.fetch_range("10026", "TGS-0026008-ES", *start, *end, OptionalSelector.NIL,
+                                                  "cert.pem", "key.pem", executor=BatchExecutor(max_workers=4),
+                                                  request_factory=_MockViewCourseSessions)
+
+    def test_session_month(self):
+        self.assertEqual(ViewCourseSessions.session_month(Month.JAN, 2024), "012024")
+        self.assertEqual(ViewCourseSessions.session_month(Month.DEC, 2024), "122024")
+
+    def test_months(self):
+        self.assertEqual(ViewCourseSessions.months(Month.NOV, 2023, Month.FEB, 2024),
+                         [(Month.NOV, 2023), (Month.DEC, 2023), (Month.JAN, 2024), (Month.FEB, 2024)])
+        self.assertEqual(ViewCourseSessions.months(Month.MAR, 2024, Month.MAR, 2024), [(Month.MAR, 2024)])
+
+        with self.assertRaises(ValueError):
+            ViewCourseSessions.months(Month.FEB, 2024, Month.JAN, 2024)
+
+        with self.assertRaises(ValueError):
+            ViewCourseSessions.months(Month.JAN, 2020, Month.JAN, 2024)
+
+    def test_fetch_range(self):
+        result = self._fetch((Month.JAN, 2024), (Month.MAR, 2024))
+
+        self.assertEqual(sorted(self.sent), ["012024", "022024", "032024"])
+        self.assertEqual(result.months, ["012024", "022024", "032024"])
+        self.assertEqual([session["id"] for session in result.sessions], ["S1", "S2", "S3", "S4"])
+        self.assertEqual(result.failed, {})
+
+    def test_fetch_range_extended(self):
+        self._fetch((Month.JAN, 2024), (Month.FEB, 2024))
+        self.sent = []
+
+        # only the months which were not retrieved before are sent
+        result = self._fetch((Month.JAN, 2024), (Month.MAY, 2024))
+
+        self.assertEqual(sorted(self.sent), ["032024", "042024", "052024"])
+        self.assertEqual([session["id"] for session in result.sessions], ["S1", "S2", "S3", "S4", "S5"])
+        self.assertEqual(result.failed, {"052024": "HTTP 500"})
+
+        # failed months are not cached
+        self.sent = []
+        self._fetch((Month.APR, 2024), (Month.MAY, 2024))
+        self.assertEqual(self.sent, ["052024"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from streamlit.testing.v1 import AppTest
+
+from app.core.abc.abstract import AbstractRequest
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.core.constants import IdTypeSummary
+from app.core.enrolment.import_enrolment import EnrolmentImporter
+from app.core.mirror.local_store import LocalStore
+from app.core.models.enrolment import CreateEnrolmentInfo
+from app.utils.batch_utils import BatchExecutor
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.job_utils import JobJournal, ResumableJob
+
+KEY = "lBzq4y040AY0m4I2AUGJcxhjcY6Ykl0nHqOMGlN95bg="
+
+
+class _MockCreateEnrolment(AbstractRequest):
+    """Request which responds with an encrypted enrolment reference number, or an error for rejected trainees"""
+
+    lock = threading.Lock()
+    submitted = []
+
+    def __init__(self, enrolment_info: CreateEnrolmentInfo):
+        self.req = HTTPRequestBuilder().with_endpoint("https://api.example.com/tpg/enrolments")
+        self.info = enrolment_info
+
+    def __repr__(self):
+        return self.info.trainee_id
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _prepare(self, *args, **kwargs):
+        pass
+
+    def execute(self, encryption_key, cert_pem, key_pem) -> requests.Response:
+        with _MockCreateEnrolment.lock:
+            _MockCreateEnrolment.submitted.append(self.info.trainee_id)
+
+        response = requests.Response()
+
+        if self.info.trainee_fullName == "Rejected":
+            response.status_code = 400
+            error = Cryptography.encrypt(encryption_key, "Trainee is already enrolled").decode()
+            response._content = json.dumps({"error": error}).encode()
+        else:
+            response.status_code = 200
+            data = {"data": {"enrolment": {"referenceNumber": f"ENR-{self.info.trainee_id}"}}}
+            response._content = Cryptography.encrypt(encryption_key, json.dumps(data))
+
+        return response
+
+
+def _import_script():
+    """Page script which imports a roster through the real CreateEnrolment request"""
+
+    import io
+
+    import streamlit as st
+
+    from app.core.enrolment.import_enrolment import EnrolmentImporter
+    from app.test.core.enrolment.test_import_enrolment import KEY, TestImportEnrolment
+    from app.utils.batch_utils import BatchExecutor
+    from app.utils.streamlit_utils import init
+
+    init()
+    st.session_state["cert_pem"] = "cert.pem"
+    st.session_state["key_pem"] = "key.pem"
+
+    rows = [TestImportEnrolment._row(nric) for nric in ("S1234567D", "T9031775F", "F3875860T")]
+    output = io.StringIO()
+    st.session_state["summary"] = EnrolmentImporter(executor=BatchExecutor(max_workers=2)).run(
+        io.StringIO("\n".join([TestImportEnrolment.HEADER] + rows)), output, KEY, "cert.pem", "key.pem")
+    st.session_state["output"] = output.getvalue()
+
+
+class TestImportEnrolment(unittest.TestCase):
+    """
+    Tests the EnrolmentImporter class.
+    """
+
+    HEADER = "courseReferenceNumber,traineeId,traineeIdType,traineeFullName,traineeDateOfBirth," \
+             "traineeEmailAddress,traineePhoneNumber,trainingPartnerCode"
+
+    def setUp(self):
+        _MockCreateEnrolment.submitted = []
+
+    @staticmethod
+    def _row(nric: str, name: str = "Trainee", dob: str = "2000-01-01", email: str = "a@b.com") -> str:
+        return f"TGS-1,{nric},NRIC,{name},{dob},{email},91234567,TP-1"
+
+    def test_build(self):
+        importer = EnrolmentImporter(request_factory=_MockCreateEnrolment)
+        info = importer.build({"traineeId": "S1234567D", "traineeIdType": "NRIC",
+                               "traineeDateOfBirth": datetime.datetime(2000, 1, 1), "discountAmount": "12.5",
+                               "traineePhoneNumber": 91234567.0, "unmapped": "ignored"})
+
+        self.assertEqual(info.trainee_id, "S1234567D")
+        self.assertEqual(info.trainee_idType, IdTypeSummary.NRIC)
+        self.assertEqual(info.trainee_dateOfBirth, datetime.date(2000, 1, 1))
+        self.assertEqual(info.trainee_fees_discountAmount, 12.5)
+        self.assertEqual(info.trainee_contactNumber_phoneNumber, "91234567")
+
+        with self.assertRaises(ValueError):
+            importer.build({"traineeDateOfBirth": "01/01/2000"})
+
+        with self.assertRaises(ValueError):
+            EnrolmentImporter(columns={"traineeId": "not_a_field"})
+
+        with self.assertRaises(ValueError):
+            EnrolmentImporter(chunk_size=0)
+
+    def test_run(self):
+        rows = [TestImportEnrolment._row("S1234567D"),
+                TestImportEnrolment._row("S1234567A"),
+                TestImportEnrolment._row("S7654321A", dob="not a date"),
+                TestImportEnrolment._row("T9031775F", email=""),
+                TestImportEnrolment._row("G3327819K", name="Rejected"),
+                TestImportEnrolment._row("F3875860T")]
+        roster = io.BytesIO("\n".join([TestImportEnrolment.HEADER] + rows).encode("utf-8"))
+        output = io.StringIO()
+
+        importer = EnrolmentImporter(executor=BatchExecutor(max_workers=2), chunk_size=2,
+                                     request_factory=_MockCreateEnrolment)
+        summary = importer.run(roster, output, KEY, "cert.pem", "key.pem")
+
+        self.assertEqual(summary, {"succeeded": 2, "failed": 4})
+        self.assertEqual(sorted(_MockCreateEnrolment.submitted), ["F3875860T", "G3327819K", "S1234567D"])
+
+        results = {int(line.split(",")[0]): line for line in output.getvalue().splitlines()[1:]}
+
+        self.assertEqual(sorted(results), [2, 3, 4, 5, 6, 7])
+        self.assertEqual(results[2], "2,SUCCESS,ENR-S1234567D,")
+        self.assertIn("Trainee ID is not a valid NRIC!", results[3])
+        self.assertIn("is not a date", results[4])
+        self.assertIn("No valid Trainee Email Address specified!", results[5])
+        self.assertIn("HTTP 400: Trainee is already enrolled", results[6])
+        self.assertEqual(results[7], "7,SUCCESS,ENR-F3875860T,")
+
+    def test_run_create_enrolment(self):
+        def respond(method, url, **kwargs):
+            payload = json.loads(Cryptography.decrypt(KEY, kwargs["json"]).decode("utf-8"))
+            data = {"data": {"enrolment": {"referenceNumber": f"ENR-{payload['enrolment']['trainee']['id']}"}}}
+
+            response = requests.Response()
+            response.status_code = 200
+            response._content = Cryptography.encrypt(KEY, json.dumps(data))
+            return response
+
+        session = MagicMock()
+        session.request.side_effect = respond
+
+        # the requests are sent on worker threads, which must see the session state of the page
+        with patch("app.utils.http_utils.SESSION_POOL.get", return_value=session):
+            app = AppTest.from_function(_import_script).run(timeout=30)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertEqual(app.session_state["summary"], {"succeeded": 3, "failed": 0})
+        self.assertEqual(session.request.call_count, 3)
+        self.assertTrue(all(call.args[1].endswith("/tpg/enrolments") for call in session.request.call_args_list))
+
+        results = sorted(app.session_state["output"].splitlines()[1:])
+        self.assertEqual(results, ["2,SUCCESS,ENR-S1234567D,", "3,SUCCESS,ENR-T9031775F,",
+                                   "4,SUCCESS,ENR-F3875860T,"])
+
+    def test_run_resumes_from_journal(self):
+        rows = [TestImportEnrolment._row(nric) for nric in ("S1234567D", "T9031775F", "F3875860T")]
+        roster = "\n".join([TestImportEnrolment.HEADER] + rows)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "import.jsonl")
+
+            # the import was interrupted after the first row was created, while the second row was in flight
+            with JobJournal(path) as journal:
+                journal.record("2:S1234567D:TGS-1", JobJournal.CONFIRMED, "ENR-S1234567D")
+                journal.record("3:T9031775F:TGS-1", JobJournal.SENT)
+
+            output = io.StringIO()
+
+            with JobJournal(path) as journal:
+                summary = EnrolmentImporter(request_factory=_MockCreateEnrolment).run(
+                    io.StringIO(roster), output, KEY, "cert.pem", "key.pem", journal=journal)
+
+                self.assertEqual(journal.state("4:F3875860T:TGS-1"), JobJournal.CONFIRMED)
+
+        self.assertEqual(_MockCreateEnrolment.submitted, ["F3875860T"])
+        self.assertEqual(summary, {"succeeded": 2, "failed": 1})
+
+        results = {int(line.split(",")[0]): line for line in output.getvalue().splitlines()[1:]}
+
+        self.assertEqual(results[2], "2,SUCCESS,ENR-S1234567D,")
+        self.assertIn(ResumableJob.IN_DOUBT, results[3])
+        self.assertEqual(results[4], "4,SUCCESS,ENR-F3875860T,")
+
+    def test_run_skips_duplicates(self):
+        rows = [f"10026,{TestImportEnrolment._row(nric)}" for nric in
+                ("S1234567D", "F3875860T", "F3875860T", "T9031775F", "G3327819K")]
+        roster = io.StringIO("\n".join([f"courseRunId,{TestImportEnrolment.HEADER}"] + rows))
+        output = io.StringIO()
+
+        with LocalStore() as store:
+            store.upsert(LocalStore.ENROLMENTS, [
+                {"referenceNumber": "ENR-1", "status": "Confirmed", "course": {"run": {"id": "10026"}},
+                 "trainee": {"id": "S1234567D"}},
+                {"referenceNumber": "ENR-2", "status": "Cancelled", "course": {"run": {"id": "10026"}},
+                 "trainee": {"id": "T9031775F"}},
+                {"referenceNumber": "ENR-3", "status": "Confirmed", "course": {"run": {"id": "10027"}},
+                 "trainee": {"id": "G3327819K"}},
+            ])
+
+            importer = EnrolmentImporter(chunk_size=2, request_factory=_MockCreateEnrolment, store=store)
+            summary = importer.run(roster, output, KEY, "cert.pem", "key.pem")
+
+        self.assertEqual(summary, {"succeeded": 3, "failed": 2})
+        self.assertEqual(sorted(_MockCreateEnrolment.submitted), ["F3875860T", "G3327819K", "T9031775F"])
+
+        results = {int(line.split(",")[0]): line for line in output.getvalue().splitlines()[1:]}
+
+        self.assertIn("Trainee already has enrolment ENR-1 on course run 10026!", results[2])
+        self.assertEqual(results[3], "3,SUCCESS,ENR-F3875860T,")
+        self.assertIn("Trainee is already enrolled on course run 10026 by an earlier row!", results[4])
+        self.assertEqual(results[5], "5,SUCCESS,ENR-T9031775F,")
+
+    def test_run_checks_store_of_training_partner(self):
+        header = f"courseRunId,trainingPartnerUen,{TestImportEnrolment.HEADER}"
+        rows = [f"10026,199900650G,{TestImportEnrolment._row('S1234567D')}",
+                f"10026,201000372W,{TestImportEnrolment._row('F3875860T')}"]
+        roster = io.StringIO("\n".join([header] + rows))
+        output = io.StringIO()
+
+        with LocalStore(endpoint="https://uat-api.ssg-wsg.sg", uen="199900650G") as store:
+            store.upsert(LocalStore.ENROLMENTS, [
+                {"referenceNumber": "ENR-1", "status": "Confirmed", "course": {"run": {"id": "10026"}},
+                 "trainee": {"id": "S1234567D"}},
+                {"referenceNumber": "ENR-2", "status": "Confirmed", "course": {"run": {"id": "10026"}},
+                 "trainee": {"id": "F3875860T"}},
+            ])
+
+            importer = EnrolmentImporter(request_factory=_MockCreateEnrolment, store=store)
+            summary = importer.run(roster, output, KEY, "cert.pem", "key.pem")
+
+        # the enrolments of another training partner are not held in the store, so they are not checked against it
+        self.assertEqual(summary, {"succeeded": 1, "failed": 1})
+        self.assertEqual(_MockCreateEnrolment.submitted, ["F3875860T"])
+        self.assertIn("Trainee already has enrolment ENR-1 on course run 10026!", output.getvalue())
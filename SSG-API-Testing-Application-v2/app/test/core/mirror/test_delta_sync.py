@@ -0,0 +1,165 @@
+import datetime
+import unittest
+
+from app.core.constants import EnrolmentSortField, SortField, SortOrder
+from app.core.mirror.delta_sync import DeltaSync
+from app.core.mirror.local_store import LocalStore
+from app.core.models.assessments import SearchAssessmentInfo
+from app.core.models.enrolment import SearchEnrolmentInfo
+from app.utils.pagination_utils import PageIterator
+
+
+class _FakeSearch:
+    """Serves the records updated within the date range of the criteria, recording the criteria of every search"""
+
+    def __init__(self, records: list[dict]):
+        self.records = records
+        self.searches = []
+
+    def __call__(self, criteria, encryption_key, cert_pem, key_pem, page_size, max_workers) -> PageIterator[dict]:
+        self.searches.append(criteria)
+        since = criteria.lastUpdateDateFrom
+        until = criteria.lastUpdateDateTo
+        matches = [record for record in self.records
+                   if (since is None or record["updated"] >= since) and record["updated"] <= until]
+
+        def prepare(page: int) -> int:
+            return page
+
+        def send(page: int) -> tuple[list[dict], int]:
+            page_records = matches[page * page_size:(page + 1) * page_size]
+            return [{"referenceNumber": record["reference"], "updatedOn": record["updated"].isoformat()}
+                    for record in page_records], len(matches)
+
+        return PageIterator(prepare, send, page_size, max_workers=max_workers)
+
+
+def _record(reference: str, updated: datetime.date) -> dict:
+    return {"reference": reference, "updated": updated}
+
+
+class TestDeltaSync(unittest.TestCase):
+    """
+    Tests the DeltaSync class.
+    """
+
+    def setUp(self):
+        self.store = LocalStore()
+        self.enrolments = _FakeSearch([_record(f"ENR-{i}", datetime.date(2024, 1, 1) + datetime.timedelta(days=i))
+                                       for i in range(25)])
+        self.assessments = _FakeSearch([_record("ASM-1", datetime.date(2024, 1, 5))])
+        self.sync = DeltaSync(self.store, page_size=10, search_enrolments=self.enrolments,
+                              search_assessments=self.assessments)
+        self.criteria = SearchEnrolmentInfo()
+        self.criteria.trainingPartner_code = "T01GB0001"
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            DeltaSync(None)
+
+    def test_sync_enrolments(self):
+        result = self.sync.sync_enrolments(self.criteria, "key", "cert", "key", until=datetime.date(2024, 1, 10))
+
+        self.assertIsNone(result.since)
+        self.assertEqual(result.until, datetime.date(2024, 1, 10))
+        self.assertEqual((result.fetched, result.upserted), (10, 10))
+        self.assertEqual(self.store.count(LocalStore.ENROLMENTS), 10)
+
+        query = self.enrolments.searches[0]
+        self.assertIsNot(query, self.criteria)
+        self.assertEqual(query.trainingPartner_code, "T01GB0001")
+        self.assertEqual(query.sortBy_field, EnrolmentSortField.UPDATED_ON)
+        self.assertEqual(query.sortBy_order, SortOrder.ASCENDING)
+        self.assertIsNone(self.criteria.lastUpdateDateTo)
+
+        # only the records updated since the high-water mark are fetched, including the day of the mark itself
+        result = self.sync.sync_enrolments(self.criteria, "key", "cert", "key", until=datetime.date(2024, 1, 25))
+
+        self.assertEqual(result.since, datetime.date(2024, 1, 10))
+        self.assertEqual(result.fetched, 16)
+        self.assertEqual(result.upserted, 16)
+        self.assertEqual(self.store.count(LocalStore.ENROLMENTS), 25)
+        self.assertEqual(self.enrolments.searches[1].lastUpdateDateFrom, datetime.date(2024, 1, 10))
+        self.assertEqual(self.store.high_water_mark(LocalStore.ENROLMENTS, DeltaSync.scope(self.criteria)),
+                         datetime.date(2024, 1, 25))
+
+        with self.assertRaises(ValueError):
+            self.sync.sync_enrolments(self.criteria, "key", "cert", "key", until=datetime.date(2024, 1, 1))
+
+    def test_sync_starts_from_criteria(self):
+        self.criteria.lastUpdateDateFrom = datetime.date(2024, 1, 20)
+        result = self.sync.sync_enrolments(self.criteria, "key", "cert", "key", until=datetime.date(2024, 2, 1))
+
+        self.assertEqual(result.since, datetime.date(2024, 1, 20))
+        self.assertEqual(result.fetched, 6)
+
+    def test_scopes(self):
+        self.sync.sync_enrolments(self.criteria, "key", "cert", "key", until=datetime.date(2024, 1, 10))
+
+        # the dates, sorting and paging set by the sync do not tell syncs apart, but other criteria do
+        same = SearchEnrolmentInfo()
+        same.trainingPartner_code = "T01GB0001"
+        same.page = 3
+        same.lastUpdateDateTo = datetime.date(2024, 1, 1)
+        self.assertEqual(DeltaSync.scope(same), DeltaSync.scope(self.criteria))
+
+        other = SearchEnrolmentInfo()
+        other.trainingPartner_code = "T01GB0001"
+        other.course_run_id = "10026"
+        self.assertNotEqual(DeltaSync.scope(other), DeltaSync.scope(self.criteria))
+
+        result = self.sync.sync_enrolments(other, "key", "cert", "key", until=datetime.date(2024, 1, 10))
+        self.assertIsNone(result.since)
+
+    def test_scopes_by_endpoint_and_uen(self):
+        uat = DeltaSync.scope(self.criteria, "https://uat-api.ssg-wsg.sg", "T01GB0001")
+
+        self.assertNotEqual(DeltaSync.scope(self.criteria, "https://api.ssg-wsg.sg", "T01GB0001"), uat)
+        self.assertNotEqual(DeltaSync.scope(self.criteria, "https://uat-api.ssg-wsg.sg", "T02GB0002"), uat)
+
+        # the high-water mark of a sync against one endpoint does not move the mark of another
+        with LocalStore(endpoint="https://uat-api.ssg-wsg.sg", uen="T01GB0001") as store:
+            DeltaSync(store, search_enrolments=self.enrolments).sync_enrolments(self.criteria, "key", "cert", "key",
+                                                                                until=datetime.date(2024, 1, 10))
+
+            self.assertEqual(store.high_water_mark(LocalStore.ENROLMENTS, uat), datetime.date(2024, 1, 10))
+            self.assertIsNone(store.high_water_mark(LocalStore.ENROLMENTS, DeltaSync.scope(self.criteria)))
+            self.assertIsNone(store.high_water_mark(LocalStore.ENROLMENTS,
+                                                    DeltaSync.scope(self.criteria, "https://api.ssg-wsg.sg",
+                                                                    "T01GB0001")))
+
+    def test_interrupted_sync(self):
+        def failing(*args, **kwargs):
+            def send(page: int) -> tuple[list[dict], int]:
+                if page > 0:
+                    raise ConnectionError("Connection reset!")
+
+                return [{"referenceNumber": "ENR-0", "updatedOn": "2024-01-01"}], 20
+
+            return PageIterator(lambda page: page, send, 1)
+
+        sync = DeltaSync(self.store, search_enrolments=failing)
+
+        with self.assertRaises(ConnectionError):
+            sync.sync_enrolments(self.criteria, "key", "cert", "key", until=datetime.date(2024, 1, 10))
+
+        # the pages stored before the failure are kept, but the high-water mark does not move
+        self.assertEqual(self.store.count(LocalStore.ENROLMENTS), 1)
+        self.assertIsNone(self.store.high_water_mark(LocalStore.ENROLMENTS, DeltaSync.scope(self.criteria)))
+
+    def test_sync_assessments(self):
+        criteria = SearchAssessmentInfo()
+        criteria.trainingPartner_code = "T01GB0001"
+        result = self.sync.sync_assessments(criteria, "key", "cert", "key", until=datetime.date(2024, 1, 10))
+
+        self.assertEqual((result.table, result.fetched, result.upserted), ("assessments", 1, 1))
+        self.assertEqual(self.assessments.searches[0].sortBy_field, SortField.UPDATED_ON)
+        self.assertEqual(self.store.get(LocalStore.ASSESSMENTS, "ASM-1")["updatedOn"], "2024-01-05")
+        self.assertEqual(self.store.count(LocalStore.ENROLMENTS), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from app.core.mirror.local_store import LocalStore, MirroredTable, shared_store
+
+
+def _enrolment(reference: str, trainee: str = "S1234567D", updated: str = "2024-01-01 10:00:00",
+               status: str = "Confirmed") -> dict:
+    return {
+        "referenceNumber": reference,
+        "status": status,
+        "course": {"run": {"id": "10026"}, "referenceNumber": "TGS-0026008-ES"},
+        "trainee": {"id": trainee, "fullName": "Jon Chua"},
+        "updatedOn": updated,
+    }
+
+
+class TestLocalStore(unittest.TestCase):
+    """
+    Tests the LocalStore class.
+    """
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            LocalStore("")
+
+        with self.assertRaises(ValueError):
+            LocalStore(None)
+
+    def test_upsert(self):
+        with LocalStore() as store:
+            self.assertEqual(store.upsert(LocalStore.ENROLMENTS, [_enrolment("ENR-1"), _enrolment("ENR-2")]), 2)
+            self.assertEqual(store.count(LocalStore.ENROLMENTS), 2)
+            self.assertEqual(store.count(LocalStore.ASSESSMENTS), 0)
+            self.assertEqual(store.get(LocalStore.ENROLMENTS, "ENR-1"), _enrolment("ENR-1"))
+            self.assertIsNone(store.get(LocalStore.ENROLMENTS, "ENR-3"))
+            self.assertIsNone(store.get(LocalStore.ASSESSMENTS, "ENR-1"))
+
+            # newer versions replace the record, while older versions are ignored
+            newer = _enrolment("ENR-1", updated="2024-02-01 10:00:00", status="Cancelled")
+            self.assertEqual(store.upsert(LocalStore.ENROLMENTS, [newer]), 1)
+            self.assertEqual(store.get(LocalStore.ENROLMENTS, "ENR-1"), newer)
+            self.assertEqual(store.upsert(LocalStore.ENROLMENTS, [_enrolment("ENR-1")]), 0)
+            self.assertEqual(store.get(LocalStore.ENROLMENTS, "ENR-1"), newer)
+            self.assertEqual(store.count(LocalStore.ENROLMENTS), 2)
+
+    def test_upsert_skips_invalid_records(self):
+        with LocalStore() as store:
+            self.assertEqual(store.upsert(LocalStore.ENROLMENTS, []), 0)
+            self.assertEqual(store.upsert(LocalStore.ENROLMENTS, [{"status": "Confirmed"}, "ENR-1", None]), 0)
+            self.assertEqual(store.count(LocalStore.ENROLMENTS), 0)
+
+            with self.assertRaises(ValueError):
+                store.upsert(MirroredTable("trainees", {"id": "id"}), [{"id": "1"}])
+
+    def test_indexes(self):
+        with LocalStore() as store:
+            indexes = {row[0] for row in store._connection.execute("SELECT name FROM sqlite_master "
+                                                                   "WHERE type = 'index'")}
+
+            for table in LocalStore.TABLES:
+                for index in table.indexes:
+                    self.assertIn(f"{table.name}_by_{'_'.join(index)}", indexes)
+
+            plan = store._connection.execute("EXPLAIN QUERY PLAN SELECT record FROM enrolments "
+                                             "WHERE trainee_id = ? AND course_run_id = ?", ("a", "b")).fetchall()
+            self.assertIn("enrolments_by_trainee_id_course_run_id", str(plan))
+
+    def test_find(self):
+        with LocalStore() as store:
+            store.upsert(LocalStore.ENROLMENTS, [
+                _enrolment("ENR-1", updated="2024-01-01 10:00:00"),
+                _enrolment("ENR-2", updated="2024-01-03 10:00:00"),
+                _enrolment("ENR-3", trainee="T9031775F", updated="2024-01-02 10:00:00"),
+            ])
+            store.upsert(LocalStore.ASSESSMENTS, [{"referenceNumber": "ASM-1", "skillCode": "TGS-MKG-234222",
+                                                   "trainee": {"id": "S1234567D"},
+                                                   "enrolment": {"referenceNumber": "ENR-1"}}])
+
+            found = store.find(LocalStore.ENROLMENTS, trainee_id="S1234567D", course_run_id="10026")
+            self.assertEqual([record["referenceNumber"] for record in found], ["ENR-2", "ENR-1"])
+            self.assertEqual(len(store.find(LocalStore.ENROLMENTS, course_reference_number="TGS-0026008-ES")), 3)
+            self.assertEqual(len(store.find(LocalStore.ENROLMENTS, course_run_id="10026", limit=1)), 1)
+            self.assertEqual(store.find(LocalStore.ENROLMENTS, course_run_id="10027"), [])
+            self.assertEqual(store.find(LocalStore.ASSESSMENTS, skill_code="TGS-MKG-234222")[0]["referenceNumber"],
+                             "ASM-1")
+            self.assertEqual(len(store.find(LocalStore.ASSESSMENTS, enrolment_reference_number="ENR-1")), 1)
+
+            with self.assertRaises(ValueError):
+                store.find(LocalStore.ENROLMENTS)
+
+            with self.assertRaises(ValueError):
+                store.find(LocalStore.ENROLMENTS, skill_code="TGS-MKG-234222")
+
+            with self.assertRaises(ValueError):
+                store.find(LocalStore.ENROLMENTS, trainee_id="S1234567D", limit=0)
+
+    def test_active_enrolments(self):
+        with LocalStore() as store:
+            store.upsert(LocalStore.ENROLMENTS, [
+                _enrolment("ENR-1"),
+                _enrolment("ENR-2", trainee="T9031775F", status="Cancelled"),
+                _enrolment("ENR-3", trainee="G3327819K", status=None),
+            ])
+
+            self.assertEqual(store.active_enrolments([("S1234567D", "10026"), ("T9031775F", "10026"),
+                                                      ("G3327819K", "10026"), ("S1234567D", "10027")]),
+                             {("S1234567D", "10026"): "ENR-1", ("G3327819K", "10026"): "ENR-3"})
+            self.assertEqual(store.active_enrolment("S1234567D", "10026"), "ENR-1")
+            self.assertIsNone(store.active_enrolment("T9031775F", "10026"))
+
+    def test_synced_at(self):
+        with LocalStore() as store:
+            self.assertIsNone(store.synced_at(LocalStore.ENROLMENTS))
+
+            store.set_high_water_mark(LocalStore.ENROLMENTS, datetime.date(2024, 1, 1))
+            self.assertIsInstance(store.synced_at(LocalStore.ENROLMENTS), datetime.datetime)
+            self.assertIsNone(store.synced_at(LocalStore.ASSESSMENTS))
+
+    def test_high_water_mark(self):
+        with LocalStore() as store:
+            self.assertIsNone(store.high_water_mark(LocalStore.ENROLMENTS))
+
+            store.set_high_water_mark(LocalStore.ENROLMENTS, datetime.date(2024, 1, 1))
+            store.set_high_water_mark(LocalStore.ENROLMENTS, datetime.date(2024, 3, 1), scope="other")
+            self.assertEqual(store.high_water_mark(LocalStore.ENROLMENTS), datetime.date(2024, 1, 1))
+            self.assertEqual(store.high_water_mark(LocalStore.ENROLMENTS, "other"), datetime.date(2024, 3, 1))
+            self.assertIsNone(store.high_water_mark(LocalStore.ASSESSMENTS))
+
+            store.set_high_water_mark(LocalStore.ENROLMENTS, datetime.date(2024, 2, 1))
+            self.assertEqual(store.high_water_mark(LocalStore.ENROLMENTS), datetime.date(2024, 2, 1))
+
+            with self.assertRaises(ValueError):
+                store.set_high_water_mark(LocalStore.ENROLMENTS, "2024-02-01")
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.sqlite3")
+
+            with LocalStore(path) as store:
+                store.upsert(LocalStore.ENROLMENTS, [_enrolment("ENR-1")])
+                store.set_high_water_mark(LocalStore.ENROLMENTS, datetime.date(2024, 1, 1))
+
+            with LocalStore(path) as store:
+                self.assertEqual(store.get(LocalStore.ENROLMENTS, "ENR-1"), _enrolment("ENR-1"))
+                self.assertEqual(store.high_water_mark(LocalStore.ENROLMENTS), datetime.date(2024, 1, 1))
+
+    def test_path_for(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.dict(os.environ, {LocalStore.ENV_NAME_DIRECTORY: directory}):
+            uat = LocalStore.path_for("https://uat-api.ssg-wsg.sg", "T01GB0001")
+
+            self.assertEqual(os.path.dirname(uat), directory)
+            self.assertEqual(LocalStore.path_for("https://uat-api.ssg-wsg.sg", "T01GB0001"), uat)
+
+            # every endpoint and training partner has a store of its own
+            self.assertNotEqual(LocalStore.path_for("https://api.ssg-wsg.sg", "T01GB0001"), uat)
+            self.assertNotEqual(LocalStore.path_for("https://uat-api.ssg-wsg.sg", "T02GB0002"), uat)
+            self.assertNotEqual(LocalStore.path_for("https://uat-api.ssg-wsg.sg", None), uat)
+
+    def test_shared_store(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.dict(os.environ, {LocalStore.ENV_NAME_DIRECTORY: directory}):
+            uat = shared_store("https://uat-api.ssg-wsg.sg", "T01GB0001")
+            prod = shared_store("https://api.ssg-wsg.sg", "T01GB0001")
+
+            try:
+                self.assertIs(shared_store("https://uat-api.ssg-wsg.sg", "T01GB0001"), uat)
+                self.assertEqual((uat.endpoint, uat.uen), ("https://uat-api.ssg-wsg.sg", "T01GB0001"))
+
+                uat.upsert(LocalStore.ENROLMENTS, [_enrolment("ENR-1")])
+                self.assertIsNone(prod.get(LocalStore.ENROLMENTS, "ENR-1"))
+                self.assertIsNone(prod.active_enrolment("S1234567D", "10026"))
+            finally:
+                uat.close()
+                prod.close()
+                shared_store.cache_clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 Contains test cases for CreateAssAssessmentInfo, UpdateVoidAssessmentInfo, and SearchAssessmentInfo.
 """
 
+import copy
 import unittest
 from datetime import date
 
@@ -222,6 +223,20 @@ class TestAssessmentInfo(unittest.TestCase):
         self.assertEqual(TestAssessmentInfo.CREATE_ASSESSMENT_THREE,
                          TestAssessmentInfo.CREATE_ASSESSMENT_THREE)
 
+    def test_CreateAssessmentInfo_hash(self):
+        """
+        Test that equal CreateAssessmentInfo instances hash equally, so that they can be deduplicated with sets.
+        """
+
+        duplicate = copy.copy(TestAssessmentInfo.CREATE_ASSESSMENT_TWO)
+
+        self.assertEqual(hash(duplicate), hash(TestAssessmentInfo.CREATE_ASSESSMENT_TWO))
+        self.assertEqual(len({TestAssessmentInfo.CREATE_ASSESSMENT_TWO, duplicate,
+                              TestAssessmentInfo.CREATE_ASSESSMENT_THREE}), 2)
+
+        with self.assertRaises(AttributeError):
+            duplicate.undeclared = None
+
     def test_UpdateVoidAssessmentInfo_equality(self):
         """
         Test the equality of the UpdateVoidAssessmentInfo instances.
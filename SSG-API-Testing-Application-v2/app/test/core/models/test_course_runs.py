@@ -7,7 +7,9 @@ https://stackoverflow.com/questions/45984018/python-unit-test-to-check-if-object
 
 import base64
 import datetime
+import json
 import os
+import copy
 import unittest
 
 from streamlit.proto.Common_pb2 import FileURLs as FileURLsProto
@@ -709,6 +711,19 @@ class TestCourseRunsModels(unittest.TestCase):
             msg="Equality method for RunTrainerAddInfo is faulty"
         )
 
+    def test_RunTrainerEditInfo_hash(self):
+        trainer = TestCourseRunsModels.RUN_TRAINER_EDIT_INFO_TWO
+        duplicate = copy.copy(trainer)
+
+        # equal trainers hash equally, even if they hold lists of linked SSEC EQAs
+        self.assertEqual(trainer, duplicate)
+        self.assertEqual(hash(trainer), hash(duplicate))
+        self.assertEqual(len({trainer, duplicate, TestCourseRunsModels.RUN_TRAINER_EDIT_INFO_THREE}), 2)
+
+        # fields are held in slots, so undeclared attributes cannot be set
+        with self.assertRaises(AttributeError):
+            trainer.undeclared = None
+
     def test_EditRunInfo_equality(self):
         # test if the attributes are equal
         self.assertEqual(vars(TestCourseRunsModels.EDIT_RUN_INFO_ONE),
@@ -2040,6 +2055,18 @@ class TestCourseRunsModels(unittest.TestCase):
         self.assertEqual(TestCourseRunsModels.RUN_SESSION_ADD_INFO_TWO._venue_primaryVenue, OptionalSelector.NO)
         self.assertEqual(TestCourseRunsModels.RUN_SESSION_ADD_INFO_THREE._venue_primaryVenue, OptionalSelector.NIL)
 
+    def test_RunSessionAddInfo_payload_repeated(self):
+        session = RunSessionAddInfo()
+        session.session_id = "Session 1"
+
+        # dropping the fields of the parent payload must not modify the memoized payload of the parent class
+        first = session.payload(verify=False)
+        self.assertNotIn("action", first)
+        self.assertNotIn("sessionId", first)
+        self.assertEqual(json.loads(repr(session)), first)
+        self.assertEqual(session.payload(verify=False), first)
+        self.assertIn("action", RunSessionEditInfo.payload(session, verify=False))
+
     # RunTrainerEditInfo tests
     def test_RunTrainerEditInfo_validate(self):
         e1, _ = TestCourseRunsModels.RUN_TRAINER_EDIT_INFO_ONE.validate()
@@ -2,6 +2,7 @@
 This file contains test cases for the different Enrolment model classes.
 """
 
+import copy
 import datetime
 import unittest
 
@@ -104,8 +105,6 @@ class TestEnrolmentInfo(unittest.TestCase):
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO._course_referenceNumber = (
             TestEnrolmentInfo.COURSE_REFERENCE_NUMBER_ONE)
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO._trainee_id = TestEnrolmentInfo.TRAINEE_ID_ONE
-        TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO._discount_amount = TestEnrolmentInfo.DISCOUNT_AMOUNT_ONE
-        TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO._collection_status = TestEnrolmentInfo.COLLECTION_STATUS_ONE
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO._trainee_idType_type = TestEnrolmentInfo.ID_TYPE_ONE
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO._trainee_employer_uen = TestEnrolmentInfo.EMPLOYER_UEN_ONE
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO._trainee_employer_contact_fullName = (
@@ -138,8 +137,6 @@ class TestEnrolmentInfo(unittest.TestCase):
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE._course_referenceNumber = (
             TestEnrolmentInfo.COURSE_REFERENCE_NUMBER_TWO)
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE._trainee_id = TestEnrolmentInfo.TRAINEE_ID_TWO
-        TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE._discount_amount = TestEnrolmentInfo.DISCOUNT_AMOUNT_TWO
-        TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE._collection_status = TestEnrolmentInfo.COLLECTION_STATUS_TWO
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE._trainee_idType_type = TestEnrolmentInfo.ID_TYPE_TWO
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE._trainee_employer_uen = TestEnrolmentInfo.EMPLOYER_UEN_TWO
         TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE._trainee_employer_contact_fullName = (
@@ -392,6 +389,26 @@ class TestEnrolmentInfo(unittest.TestCase):
         self.assertTrue(TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO.has_overridden_uen())
         self.assertTrue(TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE.has_overridden_uen())
 
+    def test_CreateEnrolmentInfo_hash(self):
+        duplicate = copy.deepcopy(TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO)
+
+        self.assertEqual(duplicate, TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO)
+        self.assertNotEqual(duplicate, TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE)
+        self.assertEqual(hash(duplicate), hash(TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO))
+        self.assertEqual(len({TestEnrolmentInfo.CREATE_ENROLMENT_INFO_TWO, duplicate,
+                              TestEnrolmentInfo.CREATE_ENROLMENT_INFO_THREE}), 2)
+
+        self.assertNotEqual(CreateEnrolmentInfo(), UpdateEnrolmentInfo())
+        self.assertNotEqual(UpdateEnrolmentInfo(), CreateEnrolmentInfo())
+        self.assertNotEqual(UpdateEnrolmentInfo(), CancelEnrolmentInfo())
+        self.assertEqual(UpdateEnrolmentInfo(), UpdateEnrolmentInfo())
+
+        # the fields are only held in slots
+        with self.assertRaises(AttributeError):
+            CreateEnrolmentInfo().unknown = 1
+
+        self.assertIn("_trainee_id", vars(duplicate))
+
     def test_CreateEnrolmentInfo_set_course_run_id(self):
         with self.assertRaises(ValueError):
             TestEnrolmentInfo.CREATE_ENROLMENT_INFO_ONE.course_run_id = 123
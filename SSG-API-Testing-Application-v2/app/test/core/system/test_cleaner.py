@@ -25,6 +25,16 @@ class TestCleaner(unittest.TestCase):
 
         self.assertFalse(os.path.exists(os.path.join(directory, "test.pem")))
 
+    def test_clean_temp_import_results(self):
+        path = os.path.join(tempfile.gettempdir(), "test-enrolments.csv")
+
+        with open(path, "w") as f:
+            f.write("line,status,referenceNumber,errors")
+
+        _clean_temp()
+
+        self.assertFalse(os.path.exists(path))
+
     def tearDown(self):
         if SCHEDULER.get_job(UNIQUE_JOB_ID) is not None:
             SCHEDULER.remove_job(UNIQUE_JOB_ID)
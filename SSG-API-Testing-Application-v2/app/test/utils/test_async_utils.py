@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import requests
+
+from streamlit.testing.v1 import AppTest
+
+from app.utils.async_utils import ThreadOffloader
+from app.utils.concurrency_utils import AdaptiveConcurrency
+
+
+def _session_state_script():
+    """Page script which reads the session state from a blocking function awaited through the offloader"""
+
+    import asyncio
+
+    import streamlit as st
+
+    from app.utils.async_utils import ThreadOffloader
+
+    st.session_state["value"] = 1
+    offloader = ThreadOffloader(2)
+
+    try:
+        st.session_state["read"] = asyncio.run(offloader.run(lambda: st.session_state.get("value")))
+    finally:
+        offloader.shutdown()
+
+
+class TestAsyncUtils(unittest.TestCase):
+    """
+    Tests the ThreadOffloader class within the async_utils file.
+    """
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            ThreadOffloader(0)
+
+        with self.assertRaises(ValueError):
+            ThreadOffloader("1")
+
+    def test_run(self):
+        offloader = ThreadOffloader(2)
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def blocking(value, offset=0):
+            with lock:
+                in_flight.append(value)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(value)
+            return value + offset
+
+        async def run_all():
+            return await asyncio.gather(*[offloader.run(blocking, i, offset=1) for i in range(6)])
+
+        try:
+            self.assertEqual(asyncio.run(run_all()), [1, 2, 3, 4, 5, 6])
+            self.assertLessEqual(max(max_in_flight), 2)
+        finally:
+            offloader.shutdown()
+
+    def test_configure(self):
+        offloader = ThreadOffloader(2)
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def blocking():
+            with lock:
+                in_flight.append(None)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+
+        async def run_all():
+            await asyncio.gather(*[offloader.run(blocking) for _ in range(8)])
+
+        with self.assertRaises(ValueError):
+            offloader.configure(0)
+
+        # the size of the pool caps the number of calls in flight, until the pool is resized
+        try:
+            asyncio.run(run_all())
+            self.assertEqual(max(max_in_flight), 2)
+
+            previous = offloader._get_executor()
+            offloader.configure(max_workers=8)
+            max_in_flight.clear()
+            asyncio.run(run_all())
+
+            self.assertEqual(offloader.max_workers, 8)
+            self.assertIsNot(offloader._get_executor(), previous)
+            self.assertGreater(max(max_in_flight), 2)
+        finally:
+            offloader.shutdown()
+
+    def test_run_adaptive(self):
+        controller = AdaptiveConcurrency(initial=3, max_limit=3)
+        offloader = ThreadOffloader(concurrency=controller)
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def throttled():
+            with lock:
+                in_flight.append(None)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.pop()
+
+            response = requests.Response()
+            response.status_code = 429
+            return response
+
+        async def run_all():
+            return await asyncio.gather(*[offloader.run(throttled) for _ in range(12)])
+
+        # the pool is sized for the highest limit, but the calls in flight follow the limit as it is cut
+        try:
+            self.assertEqual(offloader.max_workers, 3)
+            self.assertEqual([response.status_code for response in asyncio.run(run_all())], [429] * 12)
+            self.assertLessEqual(max(max_in_flight), 3)
+            self.assertEqual(controller.limit, 1)
+        finally:
+            offloader.shutdown()
+
+    def test_shared_executor(self):
+        offloader = ThreadOffloader(2)
+        barrier = threading.Barrier(8)
+
+        def get_executor():
+            barrier.wait()
+            return offloader._get_executor()
+
+        def slow_executor(*args, **kwargs):
+            time.sleep(0.05)
+            return ThreadPoolExecutor(*args, **kwargs)
+
+        # event loops on different threads which start using the offloader at the same time share a single pool
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool, \
+                    patch("app.utils.async_utils.ThreadPoolExecutor", side_effect=slow_executor):
+                executors = {id(executor) for executor in pool.map(lambda _: get_executor(), range(8))}
+
+            self.assertEqual(len(executors), 1)
+        finally:
+            offloader.shutdown()
+
+        self.assertIsNone(offloader._executor)
+
+    def test_run_session_state(self):
+        app = AppTest.from_function(_session_state_script).run(timeout=30)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertEqual(app.session_state["read"], 1)
@@ -0,0 +1,203 @@
+import threading
+import time
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from streamlit.testing.v1 import AppTest
+
+from app.core.abc.abstract import AbstractRequest
+from app.utils.batch_utils import AdaptiveConcurrency, BatchExecutor, BatchResult
+from app.utils.http_utils import HTTPRequestBuilder
+
+
+class _MockRequest(AbstractRequest):
+    """Request which sleeps for a while before returning a response with the given status code"""
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def __init__(self, endpoint: str, status_code: int = 200, delay: float = 0.01, fail: bool = False):
+        self.req = HTTPRequestBuilder().with_endpoint(endpoint)
+        self.status_code = status_code
+        self.delay = delay
+        self.fail = fail
+
+    def __repr__(self):
+        return self.req.endpoint
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _prepare(self, *args, **kwargs):
+        pass
+
+    def execute(self, cert_pem, key_pem) -> requests.Response:
+        with _MockRequest.lock:
+            _MockRequest.in_flight += 1
+            _MockRequest.max_in_flight = max(_MockRequest.max_in_flight, _MockRequest.in_flight)
+
+        time.sleep(self.delay)
+
+        with _MockRequest.lock:
+            _MockRequest.in_flight -= 1
+
+        if self.fail:
+            raise ConnectionError("Connection reset")
+
+        response = requests.Response()
+        response.status_code = self.status_code
+        return response
+
+
+class _PostRequest(AbstractRequest):
+    """Request which is sent through the real HTTPRequestBuilder.post()"""
+
+    def __init__(self):
+        self.req = HTTPRequestBuilder().with_endpoint("https://api.example.com/tpg/enrolments").with_body({"a": 1})
+
+    def __repr__(self):
+        return self.req.endpoint
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _prepare(self, *args, **kwargs):
+        pass
+
+    def execute(self, cert_pem, key_pem) -> requests.Response:
+        return self.req.post(cert_pem, key_pem)
+
+
+def _post_script():
+    """Page script which sends POST requests on the worker threads of a BatchExecutor"""
+
+    import streamlit as st
+
+    from app.test.utils.test_batch_utils import _PostRequest
+    from app.utils.batch_utils import BatchExecutor
+
+    st.session_state["cert_pem"] = "cert.pem"
+    st.session_state["key_pem"] = "key.pem"
+    st.session_state["results"] = [(result.status_code, result.error) for result in
+                                   BatchExecutor(max_workers=2).run([_PostRequest() for _ in range(4)],
+                                                                    "cert.pem", "key.pem")]
+
+
+class TestBatchUtils(unittest.TestCase):
+    """
+    Tests the classes within the batch_utils file.
+    """
+
+    def setUp(self):
+        _MockRequest.in_flight = 0
+        _MockRequest.max_in_flight = 0
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            BatchExecutor(max_workers=0)
+
+        with self.assertRaises(ValueError):
+            BatchExecutor(per_host_limit=0)
+
+        with self.assertRaises(ValueError):
+            BatchExecutor(per_host_limit="1")
+
+    def test_batch_result(self):
+        response = requests.Response()
+        response.status_code = 201
+
+        self.assertTrue(BatchResult(0, None, response=response).ok)
+        self.assertEqual(BatchResult(0, None, response=response).status_code, 201)
+        self.assertFalse(BatchResult(0, None, error=ValueError()).ok)
+        self.assertIsNone(BatchResult(0, None, error=ValueError()).status_code)
+
+        response.status_code = 429
+        self.assertFalse(BatchResult(0, None, response=response).ok)
+
+    def test_run(self):
+        reqs = [_MockRequest("https://localhost", status_code=200 + i) for i in range(20)]
+        reqs.append(_MockRequest("https://localhost", fail=True))
+
+        results = list(BatchExecutor(max_workers=4).run(reqs, "cert.pem", key_pem="key.pem"))
+        self.assertEqual(sorted(r.index for r in results), list(range(21)))
+        self.assertLessEqual(_MockRequest.max_in_flight, 4)
+
+        for result in results:
+            self.assertIs(result.request, reqs[result.index])
+            self.assertGreater(result.latency, 0)
+
+            if result.index == 20:
+                self.assertIsInstance(result.error, ConnectionError)
+            else:
+                self.assertEqual(result.status_code, 200 + result.index)
+
+    def test_per_host_limit(self):
+        reqs = [_MockRequest("https://localhost") for _ in range(10)]
+        list(BatchExecutor(max_workers=8, per_host_limit=2).run(reqs, "cert.pem", "key.pem"))
+        self.assertLessEqual(_MockRequest.max_in_flight, 2)
+
+    def test_lazy_consumption(self):
+        pulled = []
+
+        def generate():
+            for i in range(100):
+                pulled.append(i)
+                yield _MockRequest("https://localhost")
+
+        results = BatchExecutor(max_workers=2).run(generate(), "cert.pem", "key.pem")
+        next(results)
+        results.close()
+
+        # only a bounded number of requests should be pulled from the generator
+        self.assertLessEqual(len(pulled), 4)
+
+    def test_run_session_state(self):
+        response = requests.Response()
+        response.status_code = 201
+        response._content = b"{}"
+        session = MagicMock()
+        session.request.return_value = response
+
+        # under streamlit run, the worker threads must see the session state of the page which started the batch
+        with patch("app.utils.http_utils.SESSION_POOL.get", return_value=session):
+            app = AppTest.from_function(_post_script).run(timeout=30)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertEqual(app.session_state["results"], [(201, None)] * 4)
+        self.assertEqual(session.request.call_count, 4)
+
+    def test_run_adaptive(self):
+        controller = AdaptiveConcurrency(initial=3, max_limit=3)
+        reqs = [_MockRequest("https://localhost", status_code=429) for _ in range(12)]
+        results = list(BatchExecutor(max_workers=8, concurrency=controller).run(reqs, "cert.pem", "key.pem"))
+
+        self.assertEqual(len(results), 12)
+        self.assertLessEqual(_MockRequest.max_in_flight, 3)
+        self.assertEqual(controller.limit, 1)
+
+    def test_run_adaptive_pool_size(self):
+        # the number of requests in flight is only bounded by the controller, which starts at its initial limit
+        controller = AdaptiveConcurrency(initial=12, max_limit=16)
+        executor = BatchExecutor(concurrency=controller)
+        self.assertEqual((executor.max_workers, executor.per_host_limit), (16, 16))
+
+        reqs = [_MockRequest("https://localhost", delay=0.05) for _ in range(12)]
+        list(executor.run(reqs, "cert.pem", "key.pem"))
+        self.assertEqual(_MockRequest.max_in_flight, 12)
+
+    def test_run_adaptive_ignores_local_errors(self):
+        controller = AdaptiveConcurrency(initial=4)
+        reqs = [_MockRequest("https://localhost", status_code=400) for _ in range(8)]
+        list(BatchExecutor(concurrency=controller).run(reqs, "cert.pem", "key.pem"))
+
+        self.assertEqual(controller.limit, 4)
+
+    def test_adaptive(self):
+        executor = BatchExecutor.adaptive()
+
+        self.assertIsInstance(executor.concurrency, AdaptiveConcurrency)
+        self.assertEqual(executor.max_workers, executor.concurrency.max_limit)
@@ -0,0 +1,147 @@
+import threading
+import time
+import unittest
+
+import requests
+
+from app.utils.cache_utils import ResponseCache, SingleFlight
+
+
+def _response(status_code: int = 200, content: bytes = b"{}") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+class TestCacheUtils(unittest.TestCase):
+    """
+    Tests the ResponseCache class within the cache_utils file.
+    """
+
+    def test_configure(self):
+        with self.assertRaises(ValueError):
+            ResponseCache(ttl=-1)
+
+        with self.assertRaises(ValueError):
+            ResponseCache(max_entries=1.5)
+
+        with self.assertRaises(ValueError):
+            ResponseCache(max_bytes=None).configure(max_bytes="1")
+
+    def test_key(self):
+        key = ResponseCache.key("https://localhost/a", {"a": 1, "b": 2}, {"accept": "application/json"}, "cert.pem")
+
+        self.assertEqual(key, ResponseCache.key("https://localhost/a", {"b": 2, "a": 1},
+                                                {"Accept": "application/json", "Content-Type": "text"}, "cert.pem"))
+        self.assertNotEqual(key, ResponseCache.key("https://localhost/a", {"a": 1}, {"accept": "application/json"},
+                                                   "cert.pem"))
+        self.assertNotEqual(key, ResponseCache.key("https://localhost/a", {"a": 1, "b": 2},
+                                                   {"accept": "application/json", "x-api-version": "v1"},
+                                                   "cert.pem"))
+        self.assertNotEqual(key, ResponseCache.key("https://localhost/a", {"a": 1, "b": 2},
+                                                   {"accept": "application/json"}, "cert2.pem"))
+
+    def test_get_put(self):
+        cache = ResponseCache()
+        response = _response()
+
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "https://localhost/a", response)
+        self.assertIs(cache.get("a"), response)
+
+        # unsuccessful responses are not cached
+        cache.put("b", "https://localhost/b", _response(404))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_ttl(self):
+        cache = ResponseCache(ttl=0.01)
+        cache.put("a", "https://localhost/a", _response())
+        time.sleep(0.05)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2, max_bytes=10)
+        cache.put("a", "https://localhost/a", _response(content=b"1234"))
+        cache.put("b", "https://localhost/b", _response(content=b"1234"))
+        cache.get("a")
+        cache.put("c", "https://localhost/c", _response(content=b"1234"))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+        # evicts until the cache is within its byte limit
+        cache.put("d", "https://localhost/d", _response(content=b"123456789"))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()["bytes"], 9)
+        self.assertEqual(cache.stats()["evictions"], 3)
+
+        # responses larger than the byte limit are never cached
+        cache.put("e", "https://localhost/e", _response(content=b"12345678901"))
+        self.assertIsNone(cache.get("e"))
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        cache.put("a", "https://localhost/runs/1", _response())
+        cache.put("b", "https://localhost/runs/1/sessions", _response())
+        cache.put("c", "https://localhost/runs/10", _response())
+        cache.put("d", "https://localhost/runs/2", _response())
+
+        self.assertEqual(cache.invalidate("https://localhost/runs/1", "https://localhost/runs/3"), 2)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertIsNotNone(cache.get("d"))
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_single_flight(self):
+        flight = SingleFlight()
+        calls = []
+        results = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "result"
+
+        def worker():
+            results.append(flight.do("a", slow))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        threads[0].start()
+        started.wait()
+
+        for thread in threads[1:]:
+            thread.start()
+
+        # wait for the other callers to join the call that is in flight
+        while flight.shared < 4:
+            time.sleep(0.001)
+
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["result"] * 5)
+
+        # calls made after the previous call completes are executed again
+        self.assertEqual(flight.do("a", lambda: "again"), "again")
+
+    def test_single_flight_error(self):
+        flight = SingleFlight()
+
+        with self.assertRaises(KeyError):
+            flight.do("a", lambda: {}["missing"])
+
+        self.assertEqual(flight.do("a", lambda: 1), 1)
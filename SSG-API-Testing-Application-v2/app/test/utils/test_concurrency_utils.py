@@ -0,0 +1,133 @@
+import unittest
+
+import requests
+
+from app.utils.concurrency_utils import AdaptiveConcurrency
+
+
+class TestConcurrencyUtils(unittest.TestCase):
+    """
+    Tests the AdaptiveConcurrency class within the concurrency_utils file.
+    """
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrency(min_limit=0)
+
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrency(initial=10, max_limit=5)
+
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrency(decrease=1)
+
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrency(latency_tolerance=0.5)
+
+    def test_overloaded(self):
+        self.assertTrue(AdaptiveConcurrency.overloaded(429, None))
+        self.assertTrue(AdaptiveConcurrency.overloaded(500, None))
+        self.assertTrue(AdaptiveConcurrency.overloaded(501, None))
+        self.assertTrue(AdaptiveConcurrency.overloaded(None, ConnectionError()))
+        self.assertTrue(AdaptiveConcurrency.overloaded(None, TimeoutError()))
+        self.assertTrue(AdaptiveConcurrency.overloaded(None, requests.ConnectionError()))
+        self.assertTrue(AdaptiveConcurrency.overloaded(None, requests.ReadTimeout()))
+
+        # rejected requests and errors raised locally say nothing about the load on the API
+        self.assertFalse(AdaptiveConcurrency.overloaded(200, None))
+        self.assertFalse(AdaptiveConcurrency.overloaded(400, None))
+        self.assertFalse(AdaptiveConcurrency.overloaded(None, ValueError()))
+        self.assertFalse(AdaptiveConcurrency.overloaded(None, KeyError()))
+
+    def test_increase(self):
+        controller = AdaptiveConcurrency(initial=2, max_limit=4, window=5)
+
+        for _ in range(5):
+            controller.observe(0.1, 200)
+
+        self.assertEqual(controller.limit, 3)
+
+        for _ in range(20):
+            controller.observe(0.1, 200)
+
+        # the limit never exceeds the maximum limit
+        self.assertEqual(controller.limit, 4)
+
+    def test_decrease(self):
+        controller = AdaptiveConcurrency(initial=8, min_limit=2, window=5)
+        controller.started()
+        controller.started()
+
+        controller.observe(0.1, 429)
+        self.assertEqual(controller.limit, 4)
+
+        # requests that were in flight during the cut do not cut the limit again
+        controller.observe(0.1, 429)
+        self.assertEqual(controller.limit, 4)
+
+        for _ in range(10):
+            controller.observe(0.1, error=ConnectionError())
+
+        # the limit never drops below the minimum limit
+        self.assertEqual(controller.limit, 2)
+
+    def test_decrease_below_limit(self):
+        # the limit is cut again once the requests in flight during the cut complete, even if there were fewer of
+        # them than the limit
+        controller = AdaptiveConcurrency(initial=64)
+        controller.started()
+        controller.started()
+
+        controller.observe(0.1, 503)
+        controller.observe(0.1, 503)
+        self.assertEqual(controller.limit, 32)
+
+        controller.started()
+        controller.observe(0.1, 503)
+        self.assertEqual(controller.limit, 16)
+
+    def test_abandoned(self):
+        controller = AdaptiveConcurrency(initial=8)
+
+        for _ in range(4):
+            controller.started()
+
+        controller.observe(0.1, 429)
+        controller.abandoned(3)
+        self.assertEqual(controller.limit, 4)
+
+        # the abandoned requests are not waited for before the limit can be cut again
+        controller.started()
+        controller.observe(0.1, 429)
+        self.assertEqual(controller.limit, 2)
+
+    def test_local_errors(self):
+        controller = AdaptiveConcurrency(initial=8, window=5)
+
+        for _ in range(10):
+            controller.observe(0.0, error=ValueError())
+
+        self.assertEqual(controller.limit, 8)
+        self.assertIsNone(controller.baseline)
+
+        # rejected requests are still round trips to the API, whose latency is healthy
+        for _ in range(5):
+            controller.observe(0.1, 400)
+
+        self.assertEqual(controller.limit, 9)
+
+    def test_latency_spike(self):
+        controller = AdaptiveConcurrency(initial=8, window=5)
+
+        for _ in range(5):
+            controller.observe(0.1, 200)
+
+        self.assertEqual(controller.limit, 9)
+
+        for _ in range(5):
+            controller.observe(1.0, 200)
+
+        self.assertEqual(controller.limit, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.testing.v1 import AppTest
+
+from app.utils.context_utils import with_script_run_context
+
+
+def _context_script():
+    """Page script which reads the session state from a worker thread, with and without its script context"""
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    import streamlit as st
+
+    from app.utils.context_utils import with_script_run_context
+
+    st.session_state["value"] = 1
+
+    def read():
+        return st.session_state.get("value")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        st.session_state["unbound"] = pool.submit(read).result()
+        st.session_state["bound"] = pool.submit(with_script_run_context(read)).result()
+        st.session_state["after"] = pool.submit(read).result()
+
+
+class TestContextUtils(unittest.TestCase):
+    """
+    Tests the functions within the context_utils file.
+    """
+
+    def test_without_context(self):
+        def func():
+            return threading.current_thread().name
+
+        # outside of streamlit run there is no context to carry over
+        self.assertIsNone(get_script_run_ctx(suppress_warning=True))
+        self.assertIs(with_script_run_context(func), func)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="worker") as pool:
+            self.assertTrue(pool.submit(with_script_run_context(func)).result().startswith("worker"))
+
+    def test_with_context(self):
+        app = AppTest.from_function(_context_script).run(timeout=30)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertIsNone(app.session_state["unbound"])
+        self.assertEqual(app.session_state["bound"], 1)
+        self.assertIsNone(app.session_state["after"])
+
+
+if __name__ == '__main__':
+    unittest.main()
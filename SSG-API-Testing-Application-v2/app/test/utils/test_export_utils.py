@@ -0,0 +1,137 @@
+import io
+import os
+import tempfile
+import unittest
+
+from app.utils.export_utils import (ColumnTypes, CsvExporter, ParquetExporter, RecordFlattener, RecordSpool,
+                                    export_formats, export_pages)
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class TestExportUtils(unittest.TestCase):
+    """
+    Tests the functions and classes within the export_utils file.
+    """
+
+    PAGES = [
+        [{"enrolment": {"referenceNumber": "ENR-1", "course": {"run": {"id": 1}}, "fees": {"discountAmount": 0}}},
+         {"enrolment": {"referenceNumber": "ENR-2", "course": {"run": {"id": 2}}, "tags": ["a", "b"]}}],
+        [{"enrolment": {"referenceNumber": "ENR-3", "course": None, "fees": {"discountAmount": 12.5}}}],
+        []
+    ]
+
+    def test_flattener(self):
+        with self.assertRaises(ValueError):
+            RecordFlattener(["a", ""])
+
+        with self.assertRaises(ValueError):
+            RecordFlattener(["a", "a"])
+
+        flattener = RecordFlattener.infer(TestExportUtils.PAGES[0])
+        self.assertEqual(flattener.columns, ["enrolment.referenceNumber", "enrolment.course.run.id",
+                                             "enrolment.fees.discountAmount", "enrolment.tags"])
+        self.assertEqual(flattener.row(TestExportUtils.PAGES[0][0]), ["ENR-1", 1, 0, None])
+        self.assertEqual(flattener.row(TestExportUtils.PAGES[0][1]), ["ENR-2", 2, None, '["a", "b"]'])
+        self.assertEqual(flattener.row(TestExportUtils.PAGES[1][0]), ["ENR-3", None, 12.5, None])
+        self.assertEqual(flattener.row({"enrolment": "unexpected"}), [None, None, None, None])
+
+    def test_export_csv(self):
+        output = io.StringIO()
+        rows = export_pages(iter(TestExportUtils.PAGES), output)
+
+        self.assertEqual(rows, 3)
+        self.assertEqual(output.getvalue().splitlines(),
+                         ["enrolment.referenceNumber,enrolment.course.run.id,enrolment.fees.discountAmount,"
+                          "enrolment.tags",
+                          "ENR-1,1,0,", 'ENR-2,2,,"[""a"", ""b""]"', "ENR-3,,12.5,"])
+
+        output = io.StringIO()
+        export_pages(TestExportUtils.PAGES, output, columns=["enrolment.referenceNumber"])
+        self.assertEqual(output.getvalue().splitlines(), ["enrolment.referenceNumber", "ENR-1", "ENR-2", "ENR-3"])
+
+        output = io.StringIO()
+        self.assertEqual(export_pages([], output), 0)
+        self.assertEqual(output.getvalue().strip(), "")
+
+        with self.assertRaises(ValueError):
+            export_pages(TestExportUtils.PAGES, io.StringIO(), file_format="xlsx")
+
+    def test_export_csv_fields_of_later_pages(self):
+        pages = [[{"a": 1, "b": {"c": 2}}], [{"a": 2, "new": 5}], [{"b": {"c": 3, "d": [1]}}]]
+
+        output = io.StringIO()
+        self.assertEqual(export_pages(iter(pages), output), 3)
+        self.assertEqual(output.getvalue().splitlines(), ["a,b.c,new,b.d", "1,2,,", "2,,5,", ',3,,[1]'])
+
+    def test_record_spool(self):
+        with RecordSpool() as spool:
+            for page in TestExportUtils.PAGES:
+                spool.write(page)
+
+            self.assertEqual(spool.records, 3)
+            self.assertEqual(list(spool.columns), ["enrolment.referenceNumber", "enrolment.course.run.id",
+                                                   "enrolment.fees.discountAmount", "enrolment.tags"])
+            self.assertEqual([record for page in spool.pages() for record in page],
+                             [record for page in TestExportUtils.PAGES for record in page])
+
+    def test_export_formats(self):
+        self.assertEqual(export_formats(), ["csv", "parquet"] if pyarrow is not None else ["csv"])
+
+    def test_column_types(self):
+        types = ColumnTypes(7)
+        types.observe([True, 1, 1, 2 ** 60, 1, "a", None])
+        types.observe([False, 2 ** 62, 2.5, 1, "2", 1, None])
+        types.observe([None, None, None, 0.5, None, None, None])
+        types.observe([None, 2 ** 64, None, None, None, None, None])
+
+        self.assertEqual(types.kinds(), [ColumnTypes.BOOLEAN, ColumnTypes.STRING, ColumnTypes.DOUBLE,
+                                         ColumnTypes.STRING, ColumnTypes.STRING, ColumnTypes.STRING,
+                                         ColumnTypes.STRING])
+
+        types = ColumnTypes(2)
+        types.observe([2 ** 62, 1])
+        types.observe([-2 ** 63, 1.5])
+        self.assertEqual(types.kinds(), [ColumnTypes.INTEGER, ColumnTypes.DOUBLE])
+
+    def test_export_pages_is_lazy(self):
+        consumed = []
+
+        def pages():
+            for page in TestExportUtils.PAGES:
+                consumed.append(len(page))
+                yield page
+
+        output = io.StringIO()
+        exporter = CsvExporter(output, RecordFlattener(["enrolment.referenceNumber"]))
+        iterator = pages()
+        exporter.write(next(iterator))
+
+        self.assertEqual(consumed, [2])
+        self.assertEqual(exporter.rows, 2)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_export_parquet(self):
+        with self.assertRaises(ValueError):
+            ParquetExporter("out.parquet", RecordFlattener(["a"]), row_group_size=0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "enrolments.parquet")
+            rows = export_pages(TestExportUtils.PAGES, path, file_format="parquet", row_group_size=2)
+            metadata = pyarrow.parquet.ParquetFile(path).metadata
+            table = pyarrow.parquet.read_table(path)
+
+            self.assertEqual(rows, 3)
+            self.assertEqual(metadata.num_row_groups, 2)
+            self.assertEqual(table.column("enrolment.referenceNumber").to_pylist(), ["ENR-1", "ENR-2", "ENR-3"])
+            self.assertEqual(table.column("enrolment.fees.discountAmount").to_pylist(), [0.0, None, 12.5])
+            self.assertEqual(table.schema.field("enrolment.course.run.id").type, pyarrow.int64())
+
+            # a column which is numeric in the first row group, but not in a later one, falls back to strings
+            pages = [[{"id": 2 ** 60 + 1}, {"id": 2}], [{"id": "ENR-1"}]]
+            self.assertEqual(export_pages(pages, path, file_format="parquet", row_group_size=2), 3)
+            self.assertEqual(pyarrow.parquet.read_table(path).column("id").to_pylist(),
+                             [str(2 ** 60 + 1), "2", "ENR-1"])
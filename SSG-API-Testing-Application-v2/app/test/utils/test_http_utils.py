@@ -1,5 +1,7 @@
 import unittest
 
+from unittest.mock import MagicMock, patch
+
 from app.utils.http_utils import *
 
 
@@ -92,6 +94,19 @@ class TestHttpUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             builder.post_encrypted("encryptionKey==", "cert.pem", "key.pem")
 
+    def test_send_releases_session(self):
+        session = MagicMock()
+        session.request.side_effect = requests.ConnectionError("reset")
+        builder = HTTPRequestBuilder().with_endpoint("https://api.example.com/tpg/release")
+
+        # the session is handed back to the pool even when the request fails
+        with patch("app.utils.http_utils.SESSION_POOL.get", return_value=session), \
+                patch("app.utils.http_utils.SESSION_POOL.release") as release:
+            with self.assertRaises(requests.ConnectionError):
+                builder._send(HttpMethod.POST, "cert.pem", "key.pem")
+
+        release.assert_called_once_with(session)
+
     def test_repr(self):
         post1 = "POST None\n\nHeaders\n-------\naccept: application/json\n\nBody\n-------\n{}\n"
         post2 = ("POST https://www.google.com?param=value\n\nHeaders\n-------\naccept: application/json\nheader: "
@@ -115,3 +130,45 @@ class TestHttpUtils(unittest.TestCase):
                          .with_endpoint("https://www.google.com/")
                          .with_body({"data": "value"})
                          .repr(HttpMethod.GET), get2)
+
+    def test_request_timings(self):
+        timings = RequestTimings()
+        self.assertEqual(tuple(timings.stages.keys()), RequestTimings.STAGES)
+        self.assertEqual(timings.total, 0)
+
+        with self.assertRaises(ValueError):
+            with timings.measure("unknown"):
+                pass
+
+        with timings.measure("network"):
+            pass
+
+        self.assertGreater(timings.stages["network"], 0)
+        self.assertEqual(timings.total, timings.stages["network"])
+        self.assertIn("network=", str(timings))
+
+    def test_handle_response(self):
+        calls = []
+
+        def throwable(status_code: int):
+            def inner():
+                calls.append(status_code)
+                response = requests.Response()
+                response.status_code = status_code
+                response._content = b'{"data": "value"}'
+                return response
+
+            return inner
+
+        for code in (200, 400):
+            calls.clear()
+            timings = handle_response(throwable(code))
+
+            # the request must only be sent once
+            self.assertEqual(calls, [code])
+            self.assertIsInstance(timings, RequestTimings)
+            self.assertGreater(timings.stages["render"], 0)
+
+        calls.clear()
+        handle_response(lambda: calls.append(1))
+        self.assertEqual(calls, [1])
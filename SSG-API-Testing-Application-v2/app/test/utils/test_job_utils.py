@@ -0,0 +1,260 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from unittest.mock import patch
+
+import requests
+
+from app.core.abc.abstract import AbstractRequest
+from app.utils.batch_utils import BatchExecutor, BatchResult
+from app.utils.http_utils import HTTPRequestBuilder
+from app.utils.job_utils import JobJournal, ResumableJob
+from app.utils.retry_utils import CircuitOpenError
+
+
+class _MockRequest(AbstractRequest):
+    """Request which records that it was sent, and responds with the given status code or raises the given error"""
+
+    lock = threading.Lock()
+    sent = []
+
+    def __init__(self, key: str, status_code: int = 201, error: Exception = None):
+        self.req = HTTPRequestBuilder().with_endpoint("https://api.example.com/tpg/assessments")
+        self.key = key
+        self.status_code = status_code
+        self.error = error
+
+    def __repr__(self):
+        return self.key
+
+    def __str__(self):
+        return self.__repr__()
+
+    def _prepare(self, *args, **kwargs):
+        pass
+
+    def execute(self, cert_pem, key_pem) -> requests.Response:
+        with _MockRequest.lock:
+            _MockRequest.sent.append(self.key)
+
+        if self.error is not None:
+            raise self.error
+
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = f"REF-{self.key}".encode()
+        return response
+
+
+def _items(count: int, failing: tuple[str, ...] = ()):
+    for index in range(count):
+        key = f"item-{index}"
+        yield key, _MockRequest(key, 400 if key in failing else 201)
+
+
+def _describe(result: BatchResult) -> str:
+    return result.response.text if result.ok else f"HTTP {result.status_code}"
+
+
+class TestJobUtils(unittest.TestCase):
+    """
+    Tests the classes within the job_utils file.
+    """
+
+    def setUp(self):
+        _MockRequest.sent = []
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "job.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_journal(self):
+        with self.assertRaises(ValueError):
+            JobJournal("")
+
+        with self.assertRaises(ValueError):
+            JobJournal(self.path, fsync_every=0)
+
+        with JobJournal(self.path) as journal:
+            journal.record("a", JobJournal.PENDING)
+            journal.record("a", JobJournal.SENT)
+            journal.record("a", JobJournal.CONFIRMED, "ENR-1")
+            journal.record("b", JobJournal.FAILED, "HTTP 400")
+
+            with self.assertRaises(ValueError):
+                journal.record("c", "unknown")
+
+        with JobJournal(self.path) as journal:
+            self.assertEqual(len(journal), 2)
+            self.assertEqual(journal.state("a"), JobJournal.CONFIRMED)
+            self.assertEqual(journal.entries["a"].detail, "ENR-1")
+            self.assertEqual(journal.state("b"), JobJournal.FAILED)
+            self.assertIsNone(journal.state("c"))
+            self.assertEqual(journal.counts(), {"pending": 0, "sent": 0, "confirmed": 1, "failed": 1})
+
+    def test_journal_torn_line(self):
+        with JobJournal(self.path) as journal:
+            journal.record("a", JobJournal.CONFIRMED)
+
+        with open(self.path, "ab") as file:
+            file.write(b'{"key": "b", "state": "sen')
+
+        with JobJournal(self.path) as journal:
+            self.assertEqual(list(journal.entries), ["a"])
+            journal.record("b", JobJournal.SENT)
+
+        with JobJournal(self.path) as journal:
+            self.assertEqual(journal.state("b"), JobJournal.SENT)
+
+        with open(self.path, "rb") as file:
+            self.assertEqual(len(file.read().splitlines()), 2)
+
+    def test_journal_fsync_batching(self):
+        with patch("app.utils.job_utils.os.fsync") as fsync:
+            journal = JobJournal(self.path, fsync_every=3)
+
+            for index in range(7):
+                journal.record(str(index), JobJournal.PENDING)
+
+            self.assertEqual(fsync.call_count, 2)
+
+            journal.checkpoint()
+            journal.checkpoint()
+            self.assertEqual(fsync.call_count, 3)
+
+            journal.close()
+            self.assertEqual(fsync.call_count, 3)
+
+    def test_journal_discard(self):
+        with JobJournal(self.path) as journal:
+            journal.record("a", JobJournal.CONFIRMED)
+            journal.discard()
+
+            self.assertFalse(os.path.exists(self.path))
+
+        # discarding a journal whose file is already gone does nothing
+        journal.discard()
+
+        with JobJournal(self.path) as journal:
+            self.assertEqual(len(journal), 0)
+
+    def test_path_for(self):
+        with patch.dict(os.environ, {JobJournal.ENV_NAME_DIRECTORY: self.directory.name}):
+            path = JobJournal.path_for("enrolment-import", b"roster")
+
+        self.assertEqual(os.path.dirname(path), self.directory.name)
+        self.assertTrue(os.path.basename(path).startswith("enrolment-import-"))
+        self.assertNotEqual(JobJournal.path_for("enrolment-import", b"other"),
+                            JobJournal.path_for("enrolment-import", b"roster"))
+
+    def test_run(self):
+        with self.assertRaises(ValueError):
+            ResumableJob(batch_size=0)
+
+        with JobJournal(self.path) as journal:
+            job = ResumableJob(journal, BatchExecutor(max_workers=3), batch_size=4)
+            outcomes = {outcome.key: outcome for outcome in job.run(_items(10, ("item-3",)), _describe, "c", "k")}
+
+        self.assertEqual(len(outcomes), 10)
+        self.assertEqual(outcomes["item-0"].state, JobJournal.CONFIRMED)
+        self.assertEqual(outcomes["item-0"].detail, "REF-item-0")
+        self.assertFalse(outcomes["item-0"].resumed)
+        self.assertEqual(outcomes["item-3"].state, JobJournal.FAILED)
+        self.assertEqual(outcomes["item-3"].detail, "HTTP 400")
+
+        # confirmed items are not sent again, but failed ones are
+        _MockRequest.sent = []
+
+        with JobJournal(self.path) as journal:
+            self.assertEqual(journal.counts()["confirmed"], 9)
+            outcomes = {outcome.key: outcome for outcome in ResumableJob(journal).run(_items(12), _describe, "c", "k")}
+
+        self.assertEqual(sorted(_MockRequest.sent), ["item-10", "item-11", "item-3"])
+        self.assertEqual(len(outcomes), 12)
+        self.assertTrue(outcomes["item-0"].resumed)
+        self.assertIsNone(outcomes["item-0"].result)
+        self.assertEqual(outcomes["item-0"].detail, "REF-item-0")
+        self.assertEqual(outcomes["item-3"].state, JobJournal.CONFIRMED)
+
+    def test_run_in_doubt(self):
+        items = [
+            ("rejected", _MockRequest("rejected", 400)),
+            ("server-error", _MockRequest("server-error", 500)),
+            ("gateway-timeout", _MockRequest("gateway-timeout", 504)),
+            ("read-timeout", _MockRequest("read-timeout", error=requests.exceptions.ReadTimeout("read timed out"))),
+            ("disconnected", _MockRequest("disconnected", error=requests.ConnectionError("connection reset"))),
+            ("connect-timeout", _MockRequest("connect-timeout", error=requests.ConnectTimeout("connect timed out"))),
+            ("circuit-open", _MockRequest("circuit-open", error=CircuitOpenError("circuit open"))),
+            ("invalid-url", _MockRequest("invalid-url", error=requests.exceptions.InvalidURL("invalid url"))),
+            ("unprepared", _MockRequest("unprepared", error=ValueError("No Key or Certificate files specified!"))),
+        ]
+
+        def describe(result: BatchResult) -> str:
+            return str(result.error) if result.error is not None else f"HTTP {result.status_code}"
+
+        with JobJournal(self.path) as journal:
+            outcomes = {outcome.key: outcome for outcome in ResumableJob(journal).run(items, describe, "c", "k")}
+
+        # requests which may have been processed are left as sent, and only definite rejections are failed
+        in_doubt = ["server-error", "gateway-timeout", "read-timeout", "disconnected"]
+        self.assertEqual(sorted(key for key, outcome in outcomes.items() if outcome.state == JobJournal.SENT),
+                         sorted(in_doubt))
+        self.assertEqual(outcomes["gateway-timeout"].detail, ResumableJob.UNCONFIRMED.format("HTTP 504"))
+        self.assertEqual(outcomes["rejected"].state, JobJournal.FAILED)
+        self.assertEqual(outcomes["connect-timeout"].state, JobJournal.FAILED)
+        self.assertEqual(outcomes["circuit-open"].state, JobJournal.FAILED)
+        self.assertEqual(outcomes["invalid-url"].state, JobJournal.FAILED)
+        self.assertEqual(outcomes["unprepared"].state, JobJournal.FAILED)
+
+        # items in doubt are not sent again, and keep the detail of their result
+        _MockRequest.sent = []
+
+        with JobJournal(self.path) as journal:
+            self.assertEqual(journal.counts(), {"pending": 0, "sent": 4, "confirmed": 0, "failed": 5})
+            outcomes = {outcome.key: outcome for outcome in ResumableJob(journal).run(items, describe, "c", "k")}
+
+        self.assertTrue(set(in_doubt).isdisjoint(_MockRequest.sent))
+        self.assertEqual(len(_MockRequest.sent), 5)
+        self.assertTrue(outcomes["read-timeout"].resumed)
+        self.assertEqual(outcomes["read-timeout"].detail, ResumableJob.UNCONFIRMED.format("read timed out"))
+
+    def test_run_without_journal(self):
+        outcomes = list(ResumableJob().run(_items(5), _describe, "c", "k"))
+        self.assertEqual(len(outcomes), 5)
+        self.assertEqual(len(_MockRequest.sent), 5)
+
+    def test_interrupted_run(self):
+        with JobJournal(self.path) as journal:
+            job = ResumableJob(journal, BatchExecutor(max_workers=1), batch_size=3)
+            outcomes = job.run(_items(10), _describe, "c", "k")
+            next(outcomes)
+            outcomes.close()
+
+        # the first group was recorded as sent before it went out, but only one item was confirmed
+        with JobJournal(self.path) as journal:
+            self.assertEqual(journal.counts(), {"pending": 0, "sent": 2, "confirmed": 1, "failed": 0})
+            sent = set(_MockRequest.sent)
+            _MockRequest.sent = []
+            outcomes = {outcome.key: outcome for outcome in ResumableJob(journal).run(_items(10), _describe, "c", "k")}
+
+        in_doubt = [key for key, outcome in outcomes.items() if outcome.state == JobJournal.SENT]
+        self.assertEqual(len(in_doubt), 2)
+        self.assertTrue(all(outcomes[key].detail == ResumableJob.IN_DOUBT for key in in_doubt))
+        self.assertEqual(len(_MockRequest.sent), 7)
+        self.assertTrue(sent.isdisjoint(_MockRequest.sent))
+
+        # items in doubt are only sent again when asked to
+        _MockRequest.sent = []
+
+        with JobJournal(self.path) as journal:
+            outcomes = list(ResumableJob(journal, resend_in_doubt=True).run(_items(10), _describe, "c", "k"))
+
+        self.assertEqual(sorted(_MockRequest.sent), sorted(in_doubt))
+        self.assertEqual(len(outcomes), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
+import json
 import unittest
 
-from app.utils.json_utils import remove_null_fields
+from app.utils.json_utils import remove_null_fields, PayloadSerializer
 
 
 class TestJsonUtils(unittest.TestCase):
@@ -40,3 +41,61 @@ class TestJsonUtils(unittest.TestCase):
         self.assertEqual(remove_null_fields(empty), {})
         self.assertEqual(remove_null_fields(test1), result1)
         self.assertEqual(remove_null_fields(test2), result2)
+
+    def test_payload_serializer(self):
+        class Model:
+            def __init__(self, **kwargs):
+                self.name = kwargs.get("name")
+                self.phone = kwargs.get("phone")
+                self.area = kwargs.get("area")
+                self.tags = kwargs.get("tags")
+                self.extra = kwargs.get("extra")
+
+        spec = {
+            "name": "name",
+            "contact": {
+                "phone": "phone",
+                "areaCode": "area",
+                "nested": {
+                    "empty": lambda m: None
+                }
+            },
+            "tags": "tags",
+            "extra": lambda m: m.extra,
+            "fixed": lambda m: "Update"
+        }
+
+        def expected(m, exclude=()):
+            return remove_null_fields({
+                "name": m.name,
+                "contact": {
+                    "phone": m.phone,
+                    "areaCode": m.area,
+                    "nested": {
+                        "empty": None
+                    }
+                },
+                "tags": m.tags,
+                "extra": m.extra,
+                "fixed": "Update"
+            }, exclude)
+
+        models = [
+            Model(),
+            Model(name="John", phone="91234567"),
+            Model(name="", tags=[]),
+            Model(tags=[None, "", "a", {}, 1]),
+            Model(tags=[None]),
+            Model(extra={"a": None, "b": {"c": None}, "d": 1}),
+            Model(extra={"a": None})
+        ]
+
+        for exclude in ((), ("areaCode",), ("contact",), "nested"):
+            serializer = PayloadSerializer(spec, exclude=exclude)
+
+            for model in models:
+                self.assertEqual(json.dumps(expected(model, exclude)), serializer.json(model))
+                self.assertEqual(expected(model, exclude), serializer.dict(model))
+
+        with self.assertRaises(ValueError):
+            PayloadSerializer({"field": 1})
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from streamlit.testing.v1 import AppTest
+
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.utils.pagination_utils import decrypt_page, PageIterator
+
+KEY = "lBzq4y040AY0m4I2AUGJcxhjcY6Ykl0nHqOMGlN95bg="
+
+
+class _FakeSearch:
+    """Serves pages of a fixed number of records, recording the pages that were requested"""
+
+    def __init__(self, records: int, report_total: bool = True, delay: float = 0.0):
+        self.records = records
+        self.report_total = report_total
+        self.delay = delay
+        self.prepared = []
+        self.sent = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prepare_threads = set()
+
+    def prepare(self, page: int) -> int:
+        self.prepared.append(page)
+        self.prepare_threads.add(threading.get_ident())
+        return page
+
+    def send(self, page: int) -> tuple[list[int], int | None]:
+        with self.lock:
+            self.sent.append(page)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.in_flight -= 1
+
+        records = list(range(page * 10, min((page + 1) * 10, self.records)))
+        return records, self.records if self.report_total else None
+
+
+def _search_script():
+    """Page script which iterates over every page of an enrolment search sent through the real SearchEnrolment"""
+
+    import streamlit as st
+
+    from app.core.enrolment.search_enrolment import SearchEnrolment
+    from app.core.models.enrolment import SearchEnrolmentInfo
+    from app.test.utils.test_pagination_utils import KEY
+    from app.utils.streamlit_utils import init
+
+    init()
+    st.session_state["cert_pem"] = "cert.pem"
+    st.session_state["key_pem"] = "key.pem"
+
+    criteria = SearchEnrolmentInfo()
+    criteria.trainingPartner_code = "TP-1"
+    st.session_state["records"] = list(SearchEnrolment.iterate(criteria, KEY, "cert.pem", "key.pem", page_size=2))
+
+
+class TestPaginationUtils(unittest.TestCase):
+    """
+    Tests the functions and classes within the pagination_utils file.
+    """
+
+    def test_init(self):
+        search = _FakeSearch(0)
+
+        with self.assertRaises(ValueError):
+            PageIterator(search.prepare, search.send, 0)
+
+        with self.assertRaises(ValueError):
+            PageIterator(search.prepare, search.send, 10, first_page=-1)
+
+        with self.assertRaises(ValueError):
+            PageIterator(search.prepare, search.send, 10, max_workers=0)
+
+    def test_iterate_with_total(self):
+        search = _FakeSearch(95, delay=0.02)
+        iterator = PageIterator(search.prepare, search.send, 10, max_workers=4)
+
+        self.assertEqual(list(iterator), list(range(95)))
+        self.assertEqual(iterator.total, 95)
+        self.assertEqual(iterator.pages_fetched, 10)
+        self.assertEqual(sorted(search.sent), list(range(10)))
+        self.assertEqual(search.max_in_flight, 4)
+
+        # requests are always prepared on the calling thread
+        self.assertEqual(search.prepare_threads, {threading.get_ident()})
+
+    def test_iterate_without_total(self):
+        search = _FakeSearch(30, report_total=False)
+        iterator = PageIterator(search.prepare, search.send, 10, first_page=1, max_workers=4)
+
+        self.assertEqual(list(iterator), list(range(10, 30)))
+        self.assertIsNone(iterator.total)
+
+        # the page after the last full page has to be fetched to find out that there are no more records
+        self.assertEqual(search.sent, [1, 2, 3])
+        self.assertEqual(search.max_in_flight, 1)
+
+        empty = _FakeSearch(0)
+        self.assertEqual(list(PageIterator(empty.prepare, empty.send, 10)), [])
+        self.assertEqual(empty.sent, [0])
+
+    def test_stop_early(self):
+        search = _FakeSearch(10000, delay=0.01)
+        records = iter(PageIterator(search.prepare, search.send, 10, max_workers=2))
+
+        self.assertEqual([next(records) for _ in range(15)], list(range(15)))
+        records.close()
+
+        # only the page being consumed and the pages prefetched for it were ever requested
+        self.assertLessEqual(len(search.prepared), 4)
+
+    def test_errors(self):
+        def send(page: int) -> tuple[list[int], int]:
+            if page == 2:
+                raise requests.HTTPError("500 Server Error")
+
+            return list(range(10)), 50
+
+        records = []
+
+        with self.assertRaises(requests.HTTPError):
+            for record in PageIterator(lambda page: page, send, 10):
+                records.append(record)
+
+        self.assertEqual(len(records), 20)
+
+    def test_iterate_session_state(self):
+        def respond(method, url, **kwargs):
+            page = json.loads(Cryptography.decrypt(KEY, kwargs["json"]).decode("utf-8"))["parameters"]["page"]
+            data = {"data": [{"referenceNumber": f"ENR-{index}"} for index in range(page * 2, min(page * 2 + 2, 5))],
+                    "meta": {"total": 5}}
+
+            response = requests.Response()
+            response.status_code = 200
+            response._content = Cryptography.encrypt(KEY, json.dumps(data))
+            return response
+
+        session = MagicMock()
+        session.request.side_effect = respond
+
+        # pages are sent on worker threads, which must see the session state of the page
+        with patch("app.utils.http_utils.SESSION_POOL.get", return_value=session):
+            app = AppTest.from_function(_search_script).run(timeout=30)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertEqual([record["referenceNumber"] for record in app.session_state["records"]],
+                         [f"ENR-{index}" for index in range(5)])
+        self.assertEqual(session.request.call_count, 3)
+
+    def test_decrypt_page(self):
+        response = requests.Response()
+        response.status_code = 200
+        body = {"data": [{"enrolment": {"referenceNumber": "ENR-1"}}], "meta": {"total": 1}}
+        response._content = Cryptography.encrypt(KEY, json.dumps(body))
+
+        self.assertEqual(decrypt_page(response, KEY), (body["data"], 1))
+
+        # the mock API endpoints do not encrypt their responses
+        response._content = json.dumps({"data": {"assessment": {}}}).encode()
+        self.assertEqual(decrypt_page(response, KEY), ([{"assessment": {}}], None))
+
+        response.status_code = 400
+
+        with self.assertRaises(requests.HTTPError):
+            decrypt_page(response, KEY)
@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+
+from app.utils.rate_limit_utils import RateLimiter, TokenBucket
+
+
+class TestRateLimitUtils(unittest.TestCase):
+    """
+    Tests the classes within the rate_limit_utils file.
+    """
+
+    def test_token_bucket_init(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0, 1)
+
+        with self.assertRaises(ValueError):
+            TokenBucket(1, 0)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=100, capacity=5)
+
+        # the burst is served immediately
+        for _ in range(5):
+            self.assertEqual(bucket.acquire(), 0)
+
+        # subsequent requests are paced at the refill rate
+        start = time.monotonic()
+        waits = [bucket.acquire() for _ in range(5)]
+        self.assertTrue(all(wait > 0 for wait in waits))
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_token_bucket_concurrent(self):
+        bucket = TokenBucket(rate=200, capacity=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # 10 tokens need to be refilled, which takes at least 50ms at 200 tokens per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(limits={"tpg/enrolments": (1000, 1)}, default_limit=(1000, 2))
+
+        limiter.acquire("https://localhost/tpg/enrolments/search")
+        limiter.acquire("https://localhost/tpg/enrolments/details/1")
+        limiter.acquire("https://localhost/courses/courseRuns/id/1")
+
+        metrics = limiter.metrics()
+        self.assertEqual(set(metrics.keys()), {"localhost/tpg/enrolments", "localhost/courses"})
+        self.assertEqual(metrics["localhost/tpg/enrolments"]["requests"], 2)
+        self.assertEqual(metrics["localhost/tpg/enrolments"]["throttled"], 1)
+        self.assertGreater(metrics["localhost/tpg/enrolments"]["total_wait"], 0)
+        self.assertEqual(metrics["localhost/courses"]["throttled"], 0)
+
+        limiter.reset()
+        self.assertEqual(limiter.metrics(), {})
+
+    def test_configure(self):
+        limiter = RateLimiter()
+
+        with self.assertRaises(ValueError):
+            limiter.configure("courses", -1, 1)
+
+        limiter.configure("courses", 1000, 1)
+        self.assertEqual(limiter.limits["courses"], (1000, 1))
+
+        limiter.acquire("https://localhost/courses")
+        self.assertGreater(limiter.acquire("https://localhost/courses"), 0)
@@ -0,0 +1,181 @@
+import time
+import unittest
+
+from email.utils import formatdate
+
+import requests
+
+from requests.exceptions import ConnectionError, SSLError
+
+from app.utils.retry_utils import (CircuitBreaker, CircuitOpenError, RetryPolicy, endpoint_family,
+                                   idempotent)
+
+
+def _response(status_code: int, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+def _sender(*outcomes):
+    """Returns a send function which returns or raises each outcome in turn, and the list of calls made"""
+
+    calls = []
+
+    def send():
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(outcome)
+
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        return outcome
+
+    return send, calls
+
+
+class TestRetryUtils(unittest.TestCase):
+    """
+    Tests the functions and classes within the retry_utils file.
+    """
+
+    def test_endpoint_family(self):
+        with self.assertRaises(ValueError):
+            endpoint_family(None)
+
+        self.assertEqual(endpoint_family("https://uat-api.ssg-wsg.sg/tpg/enrolments/search"),
+                         "uat-api.ssg-wsg.sg/tpg/enrolments")
+        self.assertEqual(endpoint_family("https://uat-api.ssg-wsg.sg/tpg/assessments/details/1"),
+                         "uat-api.ssg-wsg.sg/tpg/assessments")
+        self.assertEqual(endpoint_family("https://uat-api.ssg-wsg.sg/courses/courseRuns/id/1"),
+                         "uat-api.ssg-wsg.sg/courses")
+        self.assertEqual(endpoint_family("https://uat-api.ssg-wsg.sg"), "uat-api.ssg-wsg.sg")
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+        breaker.before_request("a")
+        breaker.record_failure("a")
+        self.assertFalse(breaker.is_open("a"))
+        breaker.record_failure("a")
+        self.assertTrue(breaker.is_open("a"))
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request("a")
+
+        # other endpoints are not affected
+        breaker.before_request("b")
+
+        # only a single trial request is let through after the recovery timeout
+        time.sleep(0.06)
+        breaker.before_request("a")
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request("a")
+
+        # a failed trial keeps the circuit open
+        breaker.record_failure("a")
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request("a")
+
+        time.sleep(0.06)
+        breaker.before_request("a")
+        breaker.record_success("a")
+        self.assertFalse(breaker.is_open("a"))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=10)
+
+        for attempt in range(1, 6):
+            self.assertLessEqual(policy.backoff(attempt), min(10, 2 ** (attempt - 1)))
+
+        self.assertEqual(policy.backoff(1, _response(429, {"Retry-After": "3"})), 3)
+        self.assertEqual(policy.backoff(1, _response(429, {"Retry-After": "100"})), 10)
+        retry_at = formatdate(time.time() + 5, usegmt=True)
+        self.assertAlmostEqual(policy.backoff(1, _response(503, {"Retry-After": retry_at})), 5, delta=1.5)
+        self.assertLessEqual(policy.backoff(1, _response(503, {"Retry-After": "invalid"})), 1)
+
+    def test_call_retries_idempotent(self):
+        policy = RetryPolicy(max_retries=3, backoff_factor=0)
+
+        send, calls = _sender(_response(503), ConnectionError("reset"), _response(200))
+        self.assertEqual(policy.call("a", send, idempotent).status_code, 200)
+        self.assertEqual(len(calls), 3)
+
+        # the last response is returned once the retries are exhausted
+        send, calls = _sender(_response(429))
+        self.assertEqual(policy.call("b", send, idempotent).status_code, 429)
+        self.assertEqual(len(calls), 4)
+
+        # the last exception is raised once the retries are exhausted
+        send, calls = _sender(ConnectionError("reset"))
+
+        with self.assertRaises(ConnectionError):
+            policy.call("c", send, idempotent)
+
+        self.assertEqual(len(calls), 4)
+
+    def test_call_does_not_retry(self):
+        policy = RetryPolicy(max_retries=3, backoff_factor=0)
+
+        # non-transient errors are never retried
+        send, calls = _sender(_response(400), _response(200))
+        self.assertEqual(policy.call("a", send, idempotent).status_code, 400)
+        self.assertEqual(len(calls), 1)
+
+        send, calls = _sender(SSLError("bad certificate"), _response(200))
+
+        with self.assertRaises(SSLError):
+            policy.call("a", send, idempotent)
+
+        self.assertEqual(len(calls), 1)
+
+        # requests without a retry check are never retried
+        send, calls = _sender(_response(503), _response(200))
+        self.assertEqual(policy.call("a", send).status_code, 503)
+        self.assertEqual(len(calls), 1)
+
+        # requests are retried only if the retry check allows it
+        send, calls = _sender(_response(503), ConnectionError("reset"), _response(200))
+
+        with self.assertRaises(ConnectionError):
+            policy.call("a", send, lambda response, error: response is not None)
+
+        self.assertEqual(len(calls), 2)
+
+    def test_call_opens_circuit(self):
+        policy = RetryPolicy(max_retries=10, backoff_factor=0,
+                             breaker=CircuitBreaker(failure_threshold=3, recovery_timeout=60))
+        send, calls = _sender(_response(502))
+
+        with self.assertRaises(CircuitOpenError):
+            policy.call("a", send, idempotent)
+
+        self.assertEqual(len(calls), 3)
+
+        with self.assertRaises(CircuitOpenError):
+            policy.call("a", send, idempotent)
+
+        self.assertEqual(len(calls), 3)
+
+    def test_call_ends_trial_on_other_errors(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        policy = RetryPolicy(max_retries=0, breaker=breaker)
+
+        with self.assertRaises(ConnectionError):
+            policy.call("a", _sender(ConnectionError("reset"))[0])
+
+        time.sleep(0.06)
+
+        # the trial request fails before it goes out, with an exception which says nothing about the endpoint
+        with self.assertRaises(requests.exceptions.InvalidURL):
+            policy.call("a", _sender(requests.exceptions.InvalidURL("invalid url"))[0])
+
+        with self.assertRaises(KeyError):
+            policy.call("a", _sender(KeyError("cert_pem"))[0])
+
+        # another trial is let through, instead of the circuit staying open for good
+        self.assertTrue(breaker.is_open("a"))
+        self.assertEqual(policy.call("a", _sender(_response(200))[0]).status_code, 200)
+        self.assertFalse(breaker.is_open("a"))
@@ -0,0 +1,59 @@
+import io
+import os
+import tempfile
+import unittest
+
+from app.utils.roster_utils import read_roster, RosterResultWriter
+
+
+class TestRosterUtils(unittest.TestCase):
+    """
+    Tests the functions and classes within the roster_utils file.
+    """
+
+    ROSTER = "traineeId, traineeFullName ,\nS1234567D,  Alice  ,\n,,\nS7654321A,,ignored\n"
+
+    def test_read_roster(self):
+        expected = [(2, {"traineeId": "S1234567D", "traineeFullName": "Alice"}),
+                    (4, {"traineeId": "S7654321A", "traineeFullName": None})]
+
+        self.assertEqual(list(read_roster(io.StringIO(TestRosterUtils.ROSTER))), expected)
+
+        # binary files, such as those uploaded through Streamlit, are decoded and left open for the caller
+        uploaded = io.BytesIO(("﻿" + TestRosterUtils.ROSTER).encode("utf-8"))
+        self.assertEqual(list(read_roster(uploaded)), expected)
+        self.assertFalse(uploaded.closed)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "roster.csv")
+
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(TestRosterUtils.ROSTER)
+
+            self.assertEqual(list(read_roster(path)), expected)
+
+        self.assertEqual(list(read_roster(io.StringIO(""))), [])
+
+        with self.assertRaises(ValueError):
+            list(read_roster(123))
+
+    def test_read_roster_is_lazy(self):
+        rows = read_roster(io.StringIO("id\n" + "\n".join(str(i) for i in range(1, 100001))))
+
+        self.assertEqual(next(rows), (2, {"id": "1"}))
+        self.assertEqual(next(rows), (3, {"id": "2"}))
+
+    def test_result_writer(self):
+        output = io.StringIO()
+
+        with self.assertRaises(ValueError):
+            RosterResultWriter(output, flush_every=0)
+
+        with RosterResultWriter(output, flush_every=1) as writer:
+            writer.success(2, "ENR-1")
+            writer.failure(3, "Invalid, row")
+
+        self.assertEqual(output.getvalue().splitlines(),
+                         ["line,status,reference,error", "2,SUCCESS,ENR-1,", '3,FAILED,,"Invalid, row"'])
+        self.assertEqual((writer.succeeded, writer.failed), (1, 1))
+        self.assertFalse(output.closed)
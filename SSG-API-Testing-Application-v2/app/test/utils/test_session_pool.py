@@ -0,0 +1,111 @@
+import time
+import unittest
+
+from unittest.mock import patch
+
+from app.utils.session_pool import SessionPool
+
+
+class TestSessionPool(unittest.TestCase):
+    """
+    Tests the SessionPool class within the session_pool file.
+    """
+
+    def setUp(self):
+        self.pool = SessionPool(max_sessions=2, pool_maxsize=4, idle_timeout=60)
+
+    def tearDown(self):
+        self.pool.clear()
+
+    def test_configure(self):
+        with self.assertRaises(ValueError):
+            SessionPool(max_sessions=0)
+
+        with self.assertRaises(ValueError):
+            SessionPool(pool_maxsize="1")
+
+        with self.assertRaises(ValueError):
+            SessionPool(idle_timeout=-1)
+
+        self.pool.configure(max_sessions=5)
+        self.assertEqual(self.pool.max_sessions, 5)
+        self.assertEqual(self.pool.pool_maxsize, 4)
+
+    def test_get(self):
+        with self.assertRaises(ValueError):
+            self.pool.get("cert.pem", "key.pem", None)
+
+        session = self.pool.get("cert.pem", "key.pem", "https://localhost/a")
+        self.assertEqual(session.cert, ("cert.pem", "key.pem"))
+
+        # same cert, key and host should share the same session regardless of the path
+        self.assertIs(session, self.pool.get("cert.pem", "key.pem", "https://localhost/b?c=d"))
+        self.assertIsNot(session, self.pool.get("cert2.pem", "key.pem", "https://localhost/a"))
+        self.assertIsNot(session, self.pool.get("cert.pem", "key.pem", "https://localhost:8080/a"))
+
+    def test_lru_eviction(self):
+        first = self.pool.get("cert1.pem", "key.pem", "https://localhost")
+        self.pool.get("cert2.pem", "key.pem", "https://localhost")
+        self.assertIs(first, self.pool.get("cert1.pem", "key.pem", "https://localhost"))
+
+        # cert2 is the least recently used session, so it should be evicted first
+        self.pool.get("cert3.pem", "key.pem", "https://localhost")
+        self.assertEqual(len(self.pool), 2)
+        self.assertIs(first, self.pool.get("cert1.pem", "key.pem", "https://localhost"))
+
+    def test_idle_eviction(self):
+        self.pool.configure(idle_timeout=0.01)
+        first = self.pool.get("cert.pem", "key.pem", "https://localhost")
+        time.sleep(0.05)
+        self.assertIsNot(first, self.pool.get("cert.pem", "key.pem", "https://localhost"))
+        self.assertEqual(len(self.pool), 1)
+
+    def test_clear(self):
+        self.pool.get("cert.pem", "key.pem", "https://localhost")
+        self.pool.clear()
+        self.assertEqual(len(self.pool), 0)
+
+    def test_release(self):
+        first = self.pool.get("cert1.pem", "key.pem", "https://localhost")
+        again = self.pool.get("cert1.pem", "key.pem", "https://localhost")
+        self.assertIs(first, again)
+
+        with patch.object(first, "close") as close:
+            # first is evicted while two requests are still using it, so it is only closed once both release it
+            self.pool.get("cert2.pem", "key.pem", "https://localhost")
+            self.pool.get("cert3.pem", "key.pem", "https://localhost")
+            self.assertEqual(len(self.pool), 2)
+            self.assertIsNot(first, self.pool.get("cert1.pem", "key.pem", "https://localhost"))
+
+            self.pool.release(first)
+            close.assert_not_called()
+            self.pool.release(again)
+            close.assert_called_once()
+
+            # releasing a session which is no longer checked out, or which is not from the pool, does nothing
+            self.pool.release(first)
+            self.pool.release(object())
+            close.assert_called_once()
+
+    def test_release_idle(self):
+        self.pool.configure(idle_timeout=0.01)
+        first = self.pool.get("cert.pem", "key.pem", "https://localhost")
+        time.sleep(0.05)
+
+        with patch.object(first, "close") as close:
+            self.pool.get("cert.pem", "key.pem", "https://localhost")
+            close.assert_not_called()
+            self.pool.release(first)
+            close.assert_called_once()
+
+    def test_clear_checked_out(self):
+        session = self.pool.get("cert.pem", "key.pem", "https://localhost")
+        released = self.pool.get("cert2.pem", "key.pem", "https://localhost")
+        self.pool.release(released)
+
+        with patch.object(session, "close") as close, patch.object(released, "close") as released_close:
+            self.pool.clear()
+            released_close.assert_called_once()
+            close.assert_not_called()
+            self.pool.release(session)
+            close.assert_called_once()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from streamlit.testing.v1 import AppTest
+
+from app.core.constants import Endpoints
+from app.core.mirror.local_store import LocalStore, shared_store
+
+UEN = "199900650G"
+OTHER_UEN = "201000372W"
+
+
+def _lookup_script():
+    """Page script which looks up a trainee in the local store of the session"""
+
+    from app.core.mirror.local_store import LocalStore
+    from app.utils.streamlit_utils import init, display_local_record, warn_if_enrolled, warn_if_not_enrolled
+
+    init()
+    display_local_record(LocalStore.ENROLMENTS, "ENR-1")
+    warn_if_enrolled("S1234567D", "10026")
+    warn_if_not_enrolled("T9031775F", "10026")
+
+
+class TestStreamlitUtils(unittest.TestCase):
+    """
+    Tests the lookups of the local store made by the pages.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.environ = patch.dict(os.environ, {LocalStore.ENV_NAME_DIRECTORY: self.directory.name})
+        self.environ.start()
+
+        shared_store(Endpoints.UAT.value, UEN).upsert(LocalStore.ENROLMENTS, [
+            {"referenceNumber": "ENR-1", "status": "Confirmed", "course": {"run": {"id": "10026"}},
+             "trainee": {"id": "S1234567D"}},
+        ])
+
+    def tearDown(self):
+        shared_store(Endpoints.UAT.value, UEN).close()
+        shared_store(Endpoints.UAT.value, OTHER_UEN).close()
+        shared_store.cache_clear()
+        self.environ.stop()
+        self.directory.cleanup()
+
+    def _run(self, uen: str) -> AppTest:
+        app = AppTest.from_function(_lookup_script)
+        app.session_state["uen"] = uen
+        return app.run(timeout=30)
+
+    def test_lookups_of_training_partner(self):
+        app = self._run(UEN)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertEqual(len(app.expander), 1)
+        self.assertEqual(len(app.warning), 2)
+        self.assertIn("ENR-1", app.warning[0].value)
+
+    def test_lookups_of_other_training_partner(self):
+        # the records of another training partner are neither shown nor checked against
+        app = self._run(OTHER_UEN)
+
+        self.assertEqual(len(app.exception), 0)
+        self.assertEqual(len(app.expander), 0)
+        self.assertEqual(len(app.warning), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import os
+import random
 import unittest
 
-from app.utils.verify import Validators
+import numpy as np
+
+from app.utils.verify import Validators, BulkValidators
 from app.test.resources.definitions import RESOURCES_PATH
 
 
@@ -57,3 +60,64 @@ class TestVerify(unittest.TestCase):
 
         for nric in TestVerify.INVALID_NRICS:
             self.assertFalse(Validators.verify_nric(nric))
+
+    def test_verify_phone(self):
+        with self.assertRaises(ValueError):
+            Validators.verify_phone(91234567)
+
+        self.assertTrue(Validators.verify_phone("91234567"))
+        self.assertFalse(Validators.verify_phone(""))
+        self.assertFalse(Validators.verify_phone("+6591234567"))
+        self.assertFalse(Validators.verify_phone("1" * (Validators.PHONE_MAX_LENGTH + 1)))
+
+    def test_bulk_validate_nric(self):
+        rng = random.Random(42)
+        generated = ["".join([rng.choice("STFGMXs")] + [rng.choice("0123456789") for _ in range(7)]
+                             + [rng.choice("ABCDEFGHIJKLMNPQRTUWXZ")]) for _ in range(2000)]
+        values = TestVerify.VALID_NRICS + TestVerify.INVALID_NRICS + generated \
+            + ["S\u0661234567D", "S12345A7D", "", None, 1234567]
+
+        result = BulkValidators.validate_nric(values)
+        expected = [isinstance(value, str) and Validators.verify_nric(value) for value in values]
+
+        self.assertEqual(result.valid.tolist(), expected)
+        self.assertTrue(any(expected[len(TestVerify.VALID_NRICS) + len(TestVerify.INVALID_NRICS):]))
+        self.assertTrue(result.valid[:len(TestVerify.VALID_NRICS)].all())
+        self.assertEqual(result.errors[len(TestVerify.VALID_NRICS)], BulkValidators.INVALID_LENGTH)
+        self.assertEqual(result.errors[len(TestVerify.VALID_NRICS) + 1], BulkValidators.INVALID_FORMAT)
+        self.assertEqual(result.errors[len(TestVerify.VALID_NRICS) + 2], BulkValidators.INVALID_CHECKSUM)
+        self.assertEqual(result.errors[-5], "" if Validators.verify_nric("S\u0661234567D")
+                         else BulkValidators.INVALID_CHECKSUM)
+        self.assertEqual(result.errors[-4], BulkValidators.INVALID_FORMAT)
+        self.assertEqual(result.errors[-2:].tolist(), [BulkValidators.NOT_STRING] * 2)
+        self.assertTrue(((result.errors == "") == result.valid).all())
+
+        as_array = BulkValidators.validate_nric(np.array(TestVerify.VALID_NRICS + TestVerify.INVALID_NRICS))
+        self.assertEqual(as_array.valid.tolist(), expected[:len(as_array)])
+
+    def test_bulk_validate_uen_email_phone(self):
+        uens = ["A1234567A", "1234567890", "T99SGABCD1", "12345678A", "123456789A", "T99CC1234A", "T99XX1234A",
+                "123", 123]
+        result = BulkValidators.validate_uen(uens)
+        self.assertEqual(result.valid.tolist(), [isinstance(uen, str) and Validators.verify_uen(uen) for uen in uens])
+        self.assertEqual(result.errors[-2:].tolist(), [BulkValidators.INVALID_LENGTH, BulkValidators.NOT_STRING])
+
+        emails = ["a@b.com", "a.b.com", "a@b", "@b.com", "a@@b.c", None]
+        result = BulkValidators.validate_email(emails)
+        self.assertEqual(result.valid.tolist(),
+                         [isinstance(email, str) and bool(Validators.verify_email(email)) for email in emails])
+
+        phones = ["91234567", "", "6591 2345", "+6591234567", "1" * 20, "1" * 21, "\u0661\u0662", 91234567]
+        result = BulkValidators.validate_phone(phones)
+        self.assertEqual(result.valid.tolist(),
+                         [isinstance(phone, str) and Validators.verify_phone(phone) for phone in phones])
+        self.assertEqual(result.invalid_rows.tolist(), [1, 2, 3, 5, 6, 7])
+        self.assertFalse(result.ok)
+
+        with self.assertRaises(ValueError):
+            BulkValidators.validate_phone(np.array([["1"], ["2"]]))
+
+        with self.assertRaises(ValueError):
+            BulkValidators.validate_phone("91234567")
+
+        self.assertTrue(BulkValidators.validate_phone([]).ok)
@@ -0,0 +1,166 @@
+"""
+This file contains helpers used to await blocking request functions from an asyncio event loop, by offloading them
+onto a bounded pool of worker threads.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+import requests
+
+from app.utils.concurrency_utils import AdaptiveConcurrency
+from app.utils.context_utils import with_script_run_context
+
+T = TypeVar("T")
+
+
+class ThreadOffloader:
+    """
+    Bounded thread-offload helper, which runs blocking functions on a process-wide pool of worker threads so that
+    they can be awaited from an event loop.
+
+    This is not an asynchronous HTTP client. The HTTP layer of the application is built on requests and the pooled
+    keep-alive sessions found in session_pool.py, which take care of mutual TLS, and no asyncio HTTP client is part
+    of the dependencies of the application. Every call in flight occupies a worker thread while it blocks on the
+    network, so the size of the pool caps the number of calls in flight: any number of calls can be awaited at once,
+    but the calls beyond the number of workers wait in the queue of the pool until a worker is free. The pool is
+    sized with max_workers, and can be resized with configure().
+
+    The threads are created once per process and shared by every event loop, rather than started for each call. The
+    offloader can be given an AdaptiveConcurrency controller, in which case the number of calls in flight follows the
+    limit of the controller, up to the size of the pool, and the controller observes the response or exception of
+    every call.
+    """
+
+    # maximum number of blocking calls that can be in flight at any point in time
+    MAX_WORKERS: int = 32
+
+    def __init__(self, max_workers: int = None, concurrency: AdaptiveConcurrency = None):
+        """
+        Initialises the offloader.
+
+        :param max_workers: Maximum number of blocking calls that can be in flight at any point in time. If not
+                            specified, the highest limit of the controller is used if there is one, or MAX_WORKERS
+                            otherwise
+        :param concurrency: Controller which adapts the number of calls in flight to the latency and error rates of
+                            the API, up to max_workers. If not specified, max_workers calls are kept in flight
+        """
+
+        self.max_workers: int = 0
+        self.concurrency = concurrency
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._slots = threading.Condition()
+        self._in_flight = 0
+
+        if max_workers is None:
+            max_workers = concurrency.max_limit if concurrency is not None else ThreadOffloader.MAX_WORKERS
+
+        self.configure(max_workers)
+
+    def configure(self, max_workers: int = None) -> None:
+        """
+        Changes the configuration of the offloader. Fields that are not specified are left untouched.
+
+        Calls which were already handed to the worker pool complete on the threads of the previous pool, while every
+        later call runs on a pool of the new size.
+
+        :param max_workers: Maximum number of blocking calls that can be in flight at any point in time
+        """
+
+        if max_workers is None:
+            return
+
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("Maximum number of workers must be a positive integer!")
+
+        with self._lock:
+            self.max_workers = max_workers
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Lazily creates the worker pool, so that importing this module does not spawn any threads. Event loops on
+        different threads may use the offloader at the same time, so the pool is created under a lock, which ensures
+        that they all share a single pool.
+        """
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="thread-offloader")
+
+            return self._executor
+
+    def _call(self, call: Callable[[], T]) -> T:
+        """
+        Makes a blocking call on a worker thread, once the controller permits another call to be in flight.
+
+        :param call: Blocking call to make
+        :return: Return value of the call
+        """
+
+        if self.concurrency is None:
+            return call()
+
+        with self._slots:
+            self._slots.wait_for(lambda: self._in_flight < self.concurrency.limit)
+            self._in_flight += 1
+
+        self.concurrency.started()
+        start = time.perf_counter()
+
+        try:
+            result = call()
+        except Exception as ex:
+            self.concurrency.observe(time.perf_counter() - start, error=ex)
+            raise
+        else:
+            status_code = result.status_code if isinstance(result, requests.Response) else None
+            self.concurrency.observe(time.perf_counter() - start, status_code)
+            return result
+        finally:
+            with self._slots:
+                self._in_flight -= 1
+                self._slots.notify_all()
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Runs a blocking function on the worker pool and waits for its result without blocking the event loop.
+
+        The function runs with the Streamlit script context of the thread running the event loop, so that it sees
+        the same session state as the page which awaits it.
+
+        :param func: Blocking function to run
+        :param args: Positional arguments to pass to the function
+        :param kwargs: Keyword arguments to pass to the function
+        :return: Return value of the function
+        """
+
+        loop = asyncio.get_running_loop()
+        call = with_script_run_context(functools.partial(func, *args, **kwargs))
+        return await loop.run_in_executor(self._get_executor(), self._call, call)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts down the worker pool. A new worker pool is created if the offloader is used again.
+
+        :param wait: Whether to wait for pending calls to complete before returning
+        """
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# shared offloader used by AbstractRequest.execute_async()
+THREAD_OFFLOADER = ThreadOffloader(concurrency=AdaptiveConcurrency())
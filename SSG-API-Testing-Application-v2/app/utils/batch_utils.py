@@ -0,0 +1,210 @@
+"""
+This file contains classes used for executing large batches of requests with bounded concurrency.
+"""
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Iterable, Iterator
+from urllib.parse import urlparse
+
+import requests
+
+from app.core.abc.abstract import AbstractRequest
+from app.utils.concurrency_utils import AdaptiveConcurrency
+from app.utils.context_utils import with_script_run_context
+
+
+class BatchResult:
+    """Encapsulates the outcome of executing a single request within a batch"""
+
+    def __init__(self, index: int, request: AbstractRequest, response: requests.Response | None = None,
+                 error: Exception | None = None, latency: float = 0.0):
+        """
+        Initialises the result.
+
+        :param index: Position of the request within the batch
+        :param request: Request that was executed
+        :param response: Response returned by the request, if any
+        :param error: Exception raised by the request, if any
+        :param latency: Number of seconds taken to execute the request
+        """
+
+        self.index = index
+        self.request = request
+        self.response = response
+        self.error = error
+        self.latency = latency
+
+    def __repr__(self):
+        return f"BatchResult(index={self.index}, status={self.status_code}, latency={self.latency:.3f}s)"
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    def status_code(self) -> int | None:
+        """HTTP status code of the response, or None if the request raised an exception"""
+
+        return self.response.status_code if self.response is not None else None
+
+    @property
+    def ok(self) -> bool:
+        """True if the request completed with a non-error HTTP status code"""
+
+        return self.error is None and self.response is not None and self.response.status_code < 400
+
+
+class BatchExecutor:
+    """
+    Executes an iterable of prepared AbstractRequest objects on a pool of worker threads.
+
+    Requests are pulled from the iterable lazily, so that only a bounded number of requests are ever held in memory
+    at once, and results are yielded in completion order as soon as they are available.
+    """
+
+    # default number of requests that can be in flight at once
+    MAX_WORKERS: int = 8
+
+    # default number of requests that can be in flight at once to the same host
+    PER_HOST_LIMIT: int = 8
+
+    def __init__(self, max_workers: int = None, per_host_limit: int = None, concurrency: AdaptiveConcurrency = None):
+        """
+        Initialises the executor.
+
+        :param max_workers: Maximum number of requests that can be in flight at once. If not specified, the highest
+                            limit of the controller is used if there is one, or MAX_WORKERS otherwise
+        :param per_host_limit: Maximum number of requests that can be in flight at once to the same host. If not
+                               specified, the highest limit of the controller is used if there is one, or
+                               PER_HOST_LIMIT otherwise
+        :param concurrency: Controller which adapts the number of requests in flight to the latency and error
+                            rates of the API, up to max_workers. If not specified, max_workers requests are kept
+                            in flight.
+        """
+
+        if max_workers is None:
+            max_workers = concurrency.max_limit if concurrency is not None else BatchExecutor.MAX_WORKERS
+
+        if per_host_limit is None:
+            per_host_limit = concurrency.max_limit if concurrency is not None else BatchExecutor.PER_HOST_LIMIT
+
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("Maximum number of workers must be a positive integer!")
+
+        if not isinstance(per_host_limit, int) or per_host_limit < 1:
+            raise ValueError("Per-host limit must be a positive integer!")
+
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.concurrency = concurrency
+        self._host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def adaptive() -> "BatchExecutor":
+        """
+        Returns an executor whose number of requests in flight adapts to the latency and error rates of the API,
+        which is used by the bulk jobs of the application.
+
+        :return: BatchExecutor with an AdaptiveConcurrency controller with the default limits
+        """
+
+        return BatchExecutor(concurrency=AdaptiveConcurrency())
+
+    def _host_semaphore(self, request: AbstractRequest) -> threading.BoundedSemaphore:
+        """
+        Returns the semaphore guarding the host that the request is sent to.
+
+        :param request: Request to be executed
+        :return: Semaphore for the host of the request
+        """
+
+        builder = getattr(request, "req", None)
+        endpoint = getattr(builder, "endpoint", None)
+        host = urlparse(endpoint).netloc if isinstance(endpoint, str) else ""
+
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+
+            return self._host_semaphores[host]
+
+    def _execute(self, index: int, request: AbstractRequest, args: tuple, kwargs: dict) -> BatchResult:
+        """
+        Executes a single request and captures its response or exception.
+
+        :param index: Position of the request within the batch
+        :param request: Request to be executed
+        :param args: Positional arguments to pass to execute()
+        :param kwargs: Keyword arguments to pass to execute()
+        :return: BatchResult of the request
+        """
+
+        with self._host_semaphore(request):
+            start = time.perf_counter()
+
+            try:
+                response = request.execute(*args, **kwargs)
+                return BatchResult(index, request, response=response, latency=time.perf_counter() - start)
+            except Exception as ex:
+                return BatchResult(index, request, error=ex, latency=time.perf_counter() - start)
+
+    def run(self, reqs: Iterable[AbstractRequest], *args: Any, **kwargs: Any) -> Iterator[BatchResult]:
+        """
+        Executes every request in the iterable and yields their results as they complete.
+
+        The iterable is consumed from the calling thread, so requests that are built lazily (for example, from a
+        generator that reads a file) can safely rely on the Streamlit session state.
+
+        :param reqs: Iterable of prepared requests
+        :param args: Positional arguments to pass to the execute() method of every request
+        :param kwargs: Keyword arguments to pass to the execute() method of every request
+        :return: Iterator of BatchResult objects, in completion order
+        """
+
+        # the requests read the Streamlit session state when they are sent, which is only visible to the worker
+        # threads if they run with the script context of the calling thread
+        execute = with_script_run_context(self._execute)
+        iterator = enumerate(reqs)
+        in_flight: set[Future] = set()
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool:
+            try:
+                while True:
+                    limit = self.max_workers if self.concurrency is None \
+                        else min(self.max_workers, self.concurrency.limit)
+
+                    while not exhausted and len(in_flight) < limit:
+                        try:
+                            index, request = next(iterator)
+                        except StopIteration:
+                            exhausted = True
+                            break
+
+                        in_flight.add(pool.submit(execute, index, request, args, kwargs))
+
+                        if self.concurrency is not None:
+                            self.concurrency.started()
+
+                    if not in_flight:
+                        return
+
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        result = future.result()
+
+                        if self.concurrency is not None:
+                            self.concurrency.observe(result.latency, result.status_code, result.error)
+
+                        yield result
+            finally:
+                # if the caller stops consuming early, do not start any request that has not started yet
+                for future in in_flight:
+                    future.cancel()
+
+                if self.concurrency is not None:
+                    self.concurrency.abandoned(len(in_flight))
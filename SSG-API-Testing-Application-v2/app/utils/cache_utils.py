@@ -0,0 +1,287 @@
+"""
+This file contains the ResponseCache and SingleFlight classes, which are used to avoid repeating read-only API
+requests.
+"""
+
+import json
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+import requests
+
+T = TypeVar("T")
+
+
+class ResponseCache:
+    """
+    Thread-safe, size-bounded cache of successful GET responses with a time-to-live on every entry.
+
+    Entries are evicted in least-recently-used order once the cache holds too many entries or too many bytes of
+    response content. Requests which modify an entity should invalidate the cached responses of that entity by
+    calling invalidate() with the URLs of the endpoints that return it.
+    """
+
+    # number of seconds a cached response remains valid for
+    TTL: float = 120.0
+
+    # maximum number of responses to keep in the cache
+    MAX_ENTRIES: int = 256
+
+    # maximum number of bytes of response content to keep in the cache
+    MAX_BYTES: int = 32 * 1024 * 1024
+
+    # request headers which affect the content of a response, and hence form part of the cache key
+    KEY_HEADERS: tuple[str, ...] = ("accept", "x-api-version")
+
+    def __init__(self, ttl: float = TTL, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        """
+        Initialises the cache.
+
+        :param ttl: Number of seconds a cached response remains valid for
+        :param max_entries: Maximum number of responses to keep in the cache
+        :param max_bytes: Maximum number of bytes of response content to keep in the cache
+        """
+
+        self._entries: OrderedDict[Hashable, tuple[requests.Response, str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.configure(ttl, max_entries, max_bytes)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def configure(self, ttl: float = None, max_entries: int = None, max_bytes: int = None) -> None:
+        """
+        Changes the configuration of the cache. Fields that are not specified are left untouched.
+
+        :param ttl: Number of seconds a cached response remains valid for
+        :param max_entries: Maximum number of responses to keep in the cache
+        :param max_bytes: Maximum number of bytes of response content to keep in the cache
+        """
+
+        if ttl is not None:
+            if not isinstance(ttl, (int, float)) or ttl < 0:
+                raise ValueError("TTL must be a non-negative number!")
+
+            self.ttl = ttl
+
+        if max_entries is not None:
+            if not isinstance(max_entries, int) or max_entries < 0:
+                raise ValueError("Maximum number of entries must be a non-negative integer!")
+
+            self.max_entries = max_entries
+
+        if max_bytes is not None:
+            if not isinstance(max_bytes, int) or max_bytes < 0:
+                raise ValueError("Maximum number of bytes must be a non-negative integer!")
+
+            self.max_bytes = max_bytes
+
+        with self._lock:
+            self._shrink()
+
+    @staticmethod
+    def key(endpoint: str, params: dict, headers: dict, cert_pem: str = None) -> Hashable:
+        """
+        Builds the cache key of a request.
+
+        :param endpoint: Endpoint URL of the request
+        :param params: Query parameters of the request
+        :param headers: Headers of the request
+        :param cert_pem: Path to the certificate used for the request, as different certificates may belong to
+                         different organisations
+        :return: Cache key
+        """
+
+        lowered = {k.lower(): v for k, v in headers.items()}
+
+        return (endpoint,
+                json.dumps(params, sort_keys=True, default=str),
+                tuple(lowered.get(header) for header in ResponseCache.KEY_HEADERS),
+                cert_pem)
+
+    def get(self, key: Hashable) -> requests.Response | None:
+        """
+        Returns the cached response for the key, or None if there is no valid cached response.
+
+        :param key: Cache key built with key()
+        :return: Cached requests.Response object or None
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, endpoint: str, response: requests.Response) -> None:
+        """
+        Caches a response if it is successful and fits within the limits of the cache.
+
+        :param key: Cache key built with key()
+        :param endpoint: Endpoint URL of the request, used for invalidation
+        :param response: Response to cache
+        """
+
+        if not isinstance(response, requests.Response) or not 200 <= response.status_code < 300:
+            return
+
+        size = len(response.content or b"")
+
+        if self.ttl == 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (response, endpoint, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            self._shrink()
+
+    def invalidate(self, *endpoints: str) -> int:
+        """
+        Removes the cached responses of the given endpoints, and of any endpoint nested beneath them.
+
+        :param endpoints: Endpoint URLs to invalidate
+        :return: Number of cached responses removed
+        """
+
+        with self._lock:
+            stale = [key for key, (_, endpoint, _, _) in self._entries.items()
+                     if any(endpoint == url or endpoint.startswith(url.rstrip("/") + "/") for url in endpoints)]
+
+            for key in stale:
+                self._remove(key)
+
+            return len(stale)
+
+    def clear(self) -> None:
+        """Removes all cached responses."""
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the counters of the cache.
+
+        :return: Dictionary containing the number of hits, misses, evictions, entries and bytes cached
+        """
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Removes an entry from the cache if it exists. Must be called while holding the lock.
+
+        :param key: Cache key
+        """
+
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def _shrink(self) -> None:
+        """
+        Evicts the least recently used entries until the cache is within its limits. Must be called while holding
+        the lock.
+        """
+
+        while len(self._entries) > 0 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls that are in flight at the same time.
+
+    The first caller for a key executes the call, while any caller that arrives with the same key before the call
+    completes waits for it and receives the same result, or the same exception.
+    """
+
+    class _Call:
+        """Encapsulates a call that is in flight"""
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error: BaseException | None = None
+
+    def __init__(self):
+        """
+        Initialises the SingleFlight object with no calls in flight.
+        """
+
+        self._calls: dict[Hashable, SingleFlight._Call] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """
+        Executes the function, or waits for the identical call that is already in flight and shares its outcome.
+
+        :param key: Key identifying the call
+        :param func: Function to execute
+        :return: Return value of the function
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = SingleFlight._Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+
+# shared cache used by every HTTPRequestBuilder within this process
+RESPONSE_CACHE = ResponseCache()
+
+# shared call coalescer used by every HTTPRequestBuilder within this process
+IN_FLIGHT = SingleFlight()
@@ -0,0 +1,174 @@
+"""
+This file contains classes used for adapting the number of requests in flight to the load on the API endpoints.
+"""
+
+import math
+import threading
+
+from collections import deque
+
+import requests
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD (additive increase, multiplicative decrease) controller for the number of requests in flight.
+
+    The limit is raised by a fixed step every time a full window of requests completes with a p95 latency that
+    stays close to the baseline p95 latency, and is cut by a constant factor as soon as a request is throttled
+    (HTTP 429), fails with a server error, times out or cannot connect, or the p95 latency spikes above the baseline.
+    Requests which fail for any other reason, such as a request rejected by the API or an error raised while
+    preparing it, say nothing about the load on the API and leave the limit alone. This lets a batch find the
+    highest sustainable concurrency for whichever environment it runs against, without having to hand-tune worker
+    counts.
+    """
+
+    # HTTP status codes which indicate that the API is overloaded
+    OVERLOAD_STATUSES: frozenset[int] = frozenset({429, *range(500, 600)})
+
+    # exceptions which indicate that the API is overloaded
+    OVERLOAD_ERRORS: tuple[type[Exception], ...] = (ConnectionError, TimeoutError, requests.ConnectionError,
+                                                    requests.Timeout)
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 64, increase: int = 1,
+                 decrease: float = 0.5, window: int = 20, latency_tolerance: float = 1.5):
+        """
+        Initialises the controller.
+
+        :param initial: Initial concurrency limit
+        :param min_limit: Lowest concurrency limit
+        :param max_limit: Highest concurrency limit
+        :param increase: Number of requests to raise the limit by after a healthy window
+        :param decrease: Factor to multiply the limit by when the API shows signs of overload
+        :param window: Number of latency samples used to compute the p95 latency
+        :param latency_tolerance: Factor of the baseline p95 latency above which latency is considered to spike
+        """
+
+        if not isinstance(min_limit, int) or not isinstance(max_limit, int) or not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must be integers where 1 <= min_limit <= max_limit!")
+
+        if not isinstance(initial, int) or not min_limit <= initial <= max_limit:
+            raise ValueError("Initial limit must be an integer between min_limit and max_limit!")
+
+        if not isinstance(increase, int) or increase < 1:
+            raise ValueError("Increase must be a positive integer!")
+
+        if not isinstance(decrease, (int, float)) or not 0 < decrease < 1:
+            raise ValueError("Decrease must be a number between 0 and 1!")
+
+        if not isinstance(window, int) or window < 1:
+            raise ValueError("Window must be a positive integer!")
+
+        if not isinstance(latency_tolerance, (int, float)) or latency_tolerance < 1:
+            raise ValueError("Latency tolerance must be a number of at least 1!")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.baseline: float | None = None
+        self._limit = initial
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._since_change = 0
+        self._in_flight = 0
+        self._skip_cuts = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests permitted to be in flight"""
+
+        with self._lock:
+            return self._limit
+
+    @staticmethod
+    def overloaded(status_code: int | None, error: Exception | None) -> bool:
+        """
+        Returns true if the outcome of a request shows that the API is overloaded.
+
+        :param status_code: HTTP status code of the response, or None if the request raised an exception
+        :param error: Exception raised by the request, if any
+        :return: True if the request was throttled, failed with a server error, timed out or could not connect
+        """
+
+        if error is not None:
+            return isinstance(error, AdaptiveConcurrency.OVERLOAD_ERRORS)
+
+        return status_code in AdaptiveConcurrency.OVERLOAD_STATUSES
+
+    def started(self) -> None:
+        """Records that a request was sent, so that the requests in flight when the limit is cut are known."""
+
+        with self._lock:
+            self._in_flight += 1
+
+    def abandoned(self, count: int) -> None:
+        """
+        Records that requests which were sent will never be observed, as their outcomes are no longer wanted.
+
+        :param count: Number of requests abandoned
+        """
+
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - count)
+            self._skip_cuts = min(self._skip_cuts, self._in_flight)
+
+    def observe(self, latency: float, status_code: int | None = None, error: Exception | None = None) -> None:
+        """
+        Adjusts the limit using the outcome of a completed request.
+
+        :param latency: Number of seconds taken to execute the request
+        :param status_code: HTTP status code of the response, or None if the request raised an exception
+        :param error: Exception raised by the request, if any
+        """
+
+        with self._lock:
+            self._since_change += 1
+            self._in_flight = max(0, self._in_flight - 1)
+            skipped = self._skip_cuts > 0
+            self._skip_cuts = max(0, self._skip_cuts - 1)
+
+            if AdaptiveConcurrency.overloaded(status_code, error):
+                if not skipped:
+                    self._backoff()
+
+                return
+
+            # the latency of a request which failed without a response says nothing about the API either
+            if error is not None:
+                return
+
+            self._latencies.append(latency)
+
+            # only evaluate once a full window of requests has completed since the last change of the limit
+            if len(self._latencies) < self._latencies.maxlen or self._since_change < self._latencies.maxlen:
+                return
+
+            ordered = sorted(self._latencies)
+            p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+            if self.baseline is None:
+                self.baseline = p95
+
+            if p95 > self.baseline * self.latency_tolerance:
+                self._backoff()
+                return
+
+            # let the baseline drift slowly, so that it follows gradual changes in the API's performance
+            self.baseline = 0.9 * self.baseline + 0.1 * p95
+            self._limit = min(self.max_limit, self._limit + self.increase)
+            self._since_change = 0
+
+    def _backoff(self) -> None:
+        """
+        Cuts the limit multiplicatively. Must be called while holding the lock.
+
+        Requests that were already in flight when the limit was cut are likely to report the same overload, so the
+        limit is not cut again until every one of them has completed.
+        """
+
+        self._limit = max(self.min_limit, math.floor(self._limit * self.decrease))
+        self._latencies.clear()
+        self._since_change = 0
+        self._skip_cuts = self._in_flight
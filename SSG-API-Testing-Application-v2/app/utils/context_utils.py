@@ -0,0 +1,52 @@
+"""
+This file contains helper functions used to carry the Streamlit script context over to worker threads.
+"""
+
+import functools
+import threading
+
+from typing import Any, Callable, TypeVar
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.runtime.scriptrunner.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+
+T = TypeVar("T")
+
+
+def with_script_run_context(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Binds a function to the Streamlit script context of the calling thread.
+
+    Under streamlit run, only the thread running the page script has a script context, and st.session_state is
+    empty on every other thread. The returned function attaches the context of the thread which called this function
+    to whichever thread it runs on, for as long as it runs, so that functions handed off to a worker pool see the same
+    session state as the page which handed them off. Outside of streamlit run, there is no context to attach and the
+    function runs as is.
+
+    This function must be called on the thread running the page script, before the function is handed off.
+
+    :param func: Function to bind
+    :return: Function which runs func with the script context of the calling thread
+    """
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    if ctx is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        thread = threading.current_thread()
+        previous = getattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, ctx)
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # pooled threads outlive the call, so do not leave the context of this session behind on them
+            if previous is None:
+                delattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
+            else:
+                setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, previous)
+
+    return wrapper
@@ -0,0 +1,508 @@
+"""
+This file contains classes used for exporting search results to CSV or Parquet files as they are fetched, without
+holding the full result set in memory.
+"""
+
+import csv
+import functools
+import json
+import tempfile
+
+from typing import Any, BinaryIO, Iterable, Iterator, TextIO
+
+
+@functools.cache
+def export_formats() -> list[str]:
+    """
+    Returns the file formats that search results can be exported to. Parquet is only offered if pyarrow can be
+    imported, as it is an optional dependency.
+
+    :return: List of "csv", and "parquet" if pyarrow is available
+    """
+
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return ["csv"]
+
+    return ["csv", "parquet"]
+
+
+class RecordFlattener:
+    """
+    Flattens nested JSON records into flat rows, using a column schema which is computed once up front.
+
+    Each column is the dotted path of a field within a record, e.g. "enrolment.course.run.id". Lists and any other
+    value found at the end of a path that is not a scalar are kept as JSON strings, and fields which are not part of
+    the schema are dropped.
+    """
+
+    # separator between the keys in the path of a column
+    SEPARATOR: str = "."
+
+    def __init__(self, columns: Iterable[str]):
+        """
+        Initialises the flattener.
+
+        :param columns: Dotted paths of the fields to include in each row, in column order
+        """
+
+        self.columns = list(columns)
+
+        if not all(isinstance(column, str) and len(column) > 0 for column in self.columns):
+            raise ValueError("Columns must be non-empty strings!")
+
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError("Columns must be unique!")
+
+        self._paths = [tuple(column.split(RecordFlattener.SEPARATOR)) for column in self.columns]
+
+    @staticmethod
+    def collect(record: Any, columns: dict[str, None], prefix: str = "") -> None:
+        """
+        Adds the dotted path of every field of a record to a collection of columns, in the order that the fields are
+        first seen. Fields which are null are skipped, as they may hold a nested record in other records.
+
+        :param record: Nested JSON record
+        :param columns: Dictionary whose keys are the columns collected so far, which is updated in place
+        :param prefix: Dotted path of the record within its parent record
+        """
+
+        if isinstance(record, dict) and len(record) > 0:
+            for key, item in record.items():
+                RecordFlattener.collect(item, columns, f"{prefix}{RecordFlattener.SEPARATOR}{key}" if prefix
+                                        else str(key))
+        elif prefix and record is not None:
+            columns[prefix] = None
+
+    @staticmethod
+    def infer(records: Iterable[dict]) -> "RecordFlattener":
+        """
+        Builds a flattener with a column for every field found in the records, in the order that the fields are
+        first seen.
+
+        :param records: Records whose fields make up the columns
+        :return: RecordFlattener
+        """
+
+        columns: dict[str, None] = {}
+
+        for record in records:
+            RecordFlattener.collect(record, columns)
+
+        return RecordFlattener(columns)
+
+    @staticmethod
+    def _leaf(value: Any) -> Any:
+        """
+        Converts the value found at the end of a path into a scalar.
+
+        :param value: Value of the field
+        :return: Scalar value
+        """
+
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+
+        return json.dumps(value, default=str)
+
+    def row(self, record: dict) -> list[Any]:
+        """
+        Flattens a record into a row.
+
+        :param record: Nested JSON record
+        :return: List of the values of every column, which are None for fields missing from the record
+        """
+
+        row = []
+
+        for path in self._paths:
+            value = record
+
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+
+                if value is None:
+                    break
+
+            row.append(RecordFlattener._leaf(value))
+
+        return row
+
+
+class CsvExporter:
+    """Writes flattened records to a CSV file, one page at a time"""
+
+    def __init__(self, destination: str | TextIO, flattener: RecordFlattener):
+        """
+        Initialises the exporter and writes the header of the CSV file.
+
+        :param destination: Path to the CSV file, or a text file-like object
+        :param flattener: RecordFlattener used to flatten the records
+        """
+
+        self.flattener = flattener
+        self.rows = 0
+        self._owned = isinstance(destination, str)
+        self._file = open(destination, "w", encoding="utf-8", newline="") if self._owned else destination
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(flattener.columns)
+
+    def write(self, records: Iterable[dict]) -> None:
+        """
+        Writes a page of records to the file.
+
+        :param records: Nested JSON records
+        """
+
+        for record in records:
+            self._writer.writerow(["" if value is None else value for value in self.flattener.row(record)])
+            self.rows += 1
+
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flushes the file, and closes it if it was opened by the exporter."""
+
+        self._file.flush()
+
+        if self._owned:
+            self._file.close()
+
+
+class ColumnTypes:
+    """
+    Tracks the kinds of values found in every column of flattened rows, to pick a column type which holds every
+    value of the column without losing any of them.
+
+    Columns holding only booleans are booleans, columns holding only integers which fit in 64 bits are integers,
+    and columns holding integers and floats are doubles, unless one of the integers is too large to be held exactly
+    by a double. Every other column, including any column holding values of conflicting kinds, is a string column.
+    """
+
+    # kinds of columns
+    BOOLEAN: str = "boolean"
+    INTEGER: str = "integer"
+    DOUBLE: str = "double"
+    STRING: str = "string"
+
+    # range of integers which fit in 64 bits
+    INT64_RANGE: range = range(-2 ** 63, 2 ** 63)
+
+    # range of integers which are held exactly by a double
+    EXACT_DOUBLE_RANGE: range = range(-2 ** 53, 2 ** 53 + 1)
+
+    def __init__(self, count: int):
+        """
+        Initialises the tracker.
+
+        :param count: Number of columns
+        """
+
+        self._kinds: list[set[type]] = [set() for _ in range(count)]
+        self._int64 = [True] * count
+        self._exact = [True] * count
+
+    def observe(self, row: Iterable[Any]) -> None:
+        """
+        Records the kinds of the values of a row.
+
+        :param row: Flattened row, such as the row returned by RecordFlattener.row()
+        """
+
+        for index, value in enumerate(row):
+            if value is None:
+                continue
+
+            self._kinds[index].add(type(value))
+
+            if type(value) is int:
+                self._int64[index] = self._int64[index] and value in ColumnTypes.INT64_RANGE
+                self._exact[index] = self._exact[index] and value in ColumnTypes.EXACT_DOUBLE_RANGE
+
+    def kinds(self) -> list[str]:
+        """
+        Returns the kind of every column.
+
+        :return: List of BOOLEAN, INTEGER, DOUBLE or STRING
+        """
+
+        kinds = []
+
+        for index, found in enumerate(self._kinds):
+            if found == {bool}:
+                kinds.append(ColumnTypes.BOOLEAN)
+            elif found == {int} and self._int64[index]:
+                kinds.append(ColumnTypes.INTEGER)
+            elif found in ({float}, {int, float}) and self._exact[index]:
+                kinds.append(ColumnTypes.DOUBLE)
+            else:
+                kinds.append(ColumnTypes.STRING)
+
+        return kinds
+
+
+class ParquetExporter:
+    """
+    Writes flattened records to a Parquet file in row groups, so that only one row group is ever held in memory.
+
+    The type of each column is picked by ColumnTypes from the values of the column, which should be observed over
+    every row to be written, such as with a first pass over spooled records. If they are not given, the types are
+    picked from the values found in the first row group, and a value of a later row group which does not fit the
+    type of its column raises a ValueError.
+
+    Parquet files require pyarrow, which is only imported when a ParquetExporter is created.
+    """
+
+    # default number of rows held in memory and written to the file as a row group
+    ROW_GROUP_SIZE: int = 10000
+
+    def __init__(self, destination: str | BinaryIO, flattener: RecordFlattener,
+                 row_group_size: int = ROW_GROUP_SIZE, types: ColumnTypes = None):
+        """
+        Initialises the exporter.
+
+        :param destination: Path to the Parquet file, or a binary file-like object
+        :param flattener: RecordFlattener used to flatten the records
+        :param row_group_size: Number of rows held in memory and written to the file as a row group
+        :param types: ColumnTypes which observed every row to be written. If not specified, the types of the columns
+                      are picked from the first row group
+        """
+
+        if not isinstance(row_group_size, int) or row_group_size < 1:
+            raise ValueError("Row group size must be a positive integer!")
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as ex:
+            raise ImportError("pyarrow is required to export Parquet files! Install it with pip install pyarrow.") \
+                from ex
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.destination = destination
+        self.flattener = flattener
+        self.row_group_size = row_group_size
+        self.types = types
+        self.rows = 0
+        self._columns: list[list[Any]] = [[] for _ in flattener.columns]
+        self._buffered = 0
+        self._writer = None
+
+    def _schema(self) -> Any:
+        """
+        Derives the schema of the file from the column types, or from the rows buffered for the first row group if
+        there are none.
+
+        :return: pyarrow.Schema
+        """
+
+        types = self.types
+
+        if types is None:
+            types = ColumnTypes(len(self.flattener.columns))
+
+            for row in zip(*self._columns):
+                types.observe(row)
+
+        mapping = {
+            ColumnTypes.BOOLEAN: self._pa.bool_(),
+            ColumnTypes.INTEGER: self._pa.int64(),
+            ColumnTypes.DOUBLE: self._pa.float64(),
+            ColumnTypes.STRING: self._pa.string(),
+        }
+
+        return self._pa.schema([self._pa.field(name, mapping[kind])
+                                for name, kind in zip(self.flattener.columns, types.kinds())])
+
+    def _flush(self) -> None:
+        """Writes the buffered rows to the file as a row group."""
+
+        if self._buffered == 0:
+            return
+
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.destination, self._schema())
+
+        schema = self._writer.schema
+        arrays = []
+
+        for field, values in zip(schema, self._columns):
+            if self._pa.types.is_string(field.type):
+                values = [value if value is None or isinstance(value, str) else json.dumps(value)
+                          for value in values]
+
+            try:
+                arrays.append(self._pa.array(values, type=field.type))
+            except (self._pa.ArrowException, TypeError, OverflowError) as ex:
+                raise ValueError(f"Column {field.name} holds values which do not fit its type {field.type}! "
+                                 "Observe every row with ColumnTypes before writing the file.") from ex
+
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=schema))
+        self._columns = [[] for _ in self.flattener.columns]
+        self._buffered = 0
+
+    def write(self, records: Iterable[dict]) -> None:
+        """
+        Buffers a page of records, writing out a row group every time enough rows are buffered.
+
+        :param records: Nested JSON records
+        """
+
+        for record in records:
+            for column, value in zip(self._columns, self.flattener.row(record)):
+                column.append(value)
+
+            self.rows += 1
+            self._buffered += 1
+
+            if self._buffered >= self.row_group_size:
+                self._flush()
+
+    def close(self) -> None:
+        """Writes the remaining buffered rows and closes the file."""
+
+        self._flush()
+
+        if self._writer is None:
+            # no records were written, so the schema cannot be derived from them
+            self._writer = self._pq.ParquetWriter(self.destination, self._schema())
+
+        self._writer.close()
+
+
+class RecordSpool:
+    """
+    Spools pages of records to a temporary JSON Lines file, collecting the fields found in every record on the way,
+    so that the records can be replayed once the columns of the whole result set are known.
+    """
+
+    # number of records in each page replayed from the spool
+    PAGE_SIZE: int = 1000
+
+    def __init__(self):
+        """
+        Initialises an empty spool.
+        """
+
+        self.columns: dict[str, None] = {}
+        self.records = 0
+        self._file = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, records: Iterable[dict]) -> None:
+        """
+        Spools a page of records.
+
+        :param records: Nested JSON records
+        """
+
+        for record in records:
+            RecordFlattener.collect(record, self.columns)
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self.records += 1
+
+    def pages(self) -> Iterator[list[dict]]:
+        """
+        Replays the spooled records.
+
+        :return: Iterator of pages of at most PAGE_SIZE records
+        """
+
+        self._file.flush()
+        self._file.seek(0)
+        page = []
+
+        for line in self._file:
+            page.append(json.loads(line))
+
+            if len(page) >= RecordSpool.PAGE_SIZE:
+                yield page
+                page = []
+
+        if len(page) > 0:
+            yield page
+
+    def close(self) -> None:
+        """Closes and deletes the spool."""
+
+        self._file.close()
+
+
+def export_pages(pages: Iterable[list[dict]], destination: str | TextIO | BinaryIO, file_format: str = "csv",
+                 columns: Iterable[str] = None, row_group_size: int = ParquetExporter.ROW_GROUP_SIZE) -> int:
+    """
+    Exports every page of search results to a CSV or Parquet file, such as the pages yielded by
+    PageIterator.pages().
+
+    If the columns of a CSV file are specified, every page is written to the file as it arrives. Otherwise, optional
+    fields may only appear in later pages, and the type of a Parquet column has to hold the values of every page, so
+    the pages are first spooled to a temporary file on disk while the columns and their types are collected from
+    every record, and then written to the file. Either way, only a page of records is held in memory at once.
+
+    :param pages: Iterable of pages, each of which is a list of nested JSON records
+    :param destination: Path to the file, or a file-like object (text for CSV, binary for Parquet)
+    :param file_format: "csv" or "parquet"
+    :param columns: Dotted paths of the fields to export, in column order. If not specified, every field found in any
+                    record is exported, in the order that the fields are first seen
+    :param row_group_size: Number of rows in each row group of a Parquet file
+    :return: Number of records exported
+    """
+
+    if file_format not in ("csv", "parquet"):
+        raise ValueError("File format must be either csv or parquet!")
+
+    if columns is not None and file_format == "csv":
+        return _write_pages(pages, destination, file_format, RecordFlattener(columns), row_group_size)
+
+    with RecordSpool() as spool:
+        for page in pages:
+            spool.write(page)
+
+        flattener = RecordFlattener(columns if columns is not None else spool.columns)
+        types = None
+
+        if file_format == "parquet":
+            # the type of every column is fixed once the first row group is written, so it has to be picked from
+            # the values of every row up front
+            types = ColumnTypes(len(flattener.columns))
+
+            for page in spool.pages():
+                for record in page:
+                    types.observe(flattener.row(record))
+
+        return _write_pages(spool.pages(), destination, file_format, flattener, row_group_size, types)
+
+
+def _write_pages(pages: Iterable[list[dict]], destination: str | TextIO | BinaryIO, file_format: str,
+                 flattener: RecordFlattener, row_group_size: int, types: ColumnTypes = None) -> int:
+    """
+    Writes every page of records to a CSV or Parquet file as the pages arrive.
+
+    :param pages: Iterable of pages, each of which is a list of nested JSON records
+    :param destination: Path to the file, or a file-like object (text for CSV, binary for Parquet)
+    :param file_format: "csv" or "parquet"
+    :param flattener: RecordFlattener used to flatten the records
+    :param row_group_size: Number of rows in each row group of a Parquet file
+    :param types: ColumnTypes which observed every record, used to pick the column types of a Parquet file
+    :return: Number of records written
+    """
+
+    if file_format == "csv":
+        exporter = CsvExporter(destination, flattener)
+    else:
+        exporter = ParquetExporter(destination, flattener, row_group_size, types)
+
+    try:
+        for page in pages:
+            exporter.write(page)
+    finally:
+        exporter.close()
+
+    return exporter.rows
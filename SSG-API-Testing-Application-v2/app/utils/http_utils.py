@@ -2,11 +2,13 @@
 This file contains useful classes and methods used for creating and handling HTTP requests.
 """
 
-import binascii
 import json
 import textwrap
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-import certifi
 import requests
 import streamlit as st
 
@@ -17,8 +19,12 @@ from app.utils.streamlit_utils import init, http_code_handler
 from app.core.abc.abstract import AbstractRequest
 from app.core.constants import HttpMethod
 from app.core.cipher.encrypt_decrypt import Cryptography
-from typing import Self, Any, Callable
+from typing import Self, Any, Callable, Iterator
 from app.utils.string_utils import StringBuilder
+from app.utils.session_pool import SESSION_POOL
+from app.utils.cache_utils import RESPONSE_CACHE, IN_FLIGHT, ResponseCache
+from app.utils.rate_limit_utils import RATE_LIMITER
+from app.utils.retry_utils import RETRY_POLICY, CircuitOpenError, endpoint_family, idempotent
 
 
 # initiaise the session variables here
@@ -26,6 +32,76 @@ init()
 LOGGER = Logger("HTTP Request")
 
 
+class RequestTimings:
+    """
+    Class to record the time spent in each stage of a request
+    """
+
+    # stages of a request, in the order that they are executed
+    STAGES: tuple[str, ...] = ("build", "encryption", "network", "decryption", "render")
+
+    def __init__(self):
+        """
+        Initialises the timings of every stage to 0 seconds.
+        """
+
+        self.stages: dict[str, float] = {stage: 0.0 for stage in RequestTimings.STAGES}
+
+    def __repr__(self):
+        return ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in self.stages.items()) \
+            + f", total={self.total * 1000:.1f}ms"
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    def total(self) -> float:
+        """Total number of seconds spent across all stages"""
+
+        return sum(self.stages.values())
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Context manager that adds the time spent within its body to the given stage.
+
+        :param stage: Name of the stage, must be one of STAGES
+        """
+
+        if stage not in self.stages:
+            raise ValueError(f"Unknown stage: {stage}!")
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.stages[stage] += time.perf_counter() - start
+
+
+# timings of the request that is currently being handled by handle_response(), if any
+_ACTIVE_TIMINGS: ContextVar[RequestTimings | None] = ContextVar("active_timings", default=None)
+
+
+@contextmanager
+def _measure(stage: str) -> Iterator[None]:
+    """
+    Records the time spent within its body against the given stage of the request that is currently being handled,
+    or does nothing if no request is being handled.
+
+    :param stage: Name of the stage, must be one of RequestTimings.STAGES
+    """
+
+    timings = _ACTIVE_TIMINGS.get()
+
+    if timings is None:
+        yield
+        return
+
+    with timings.measure(stage):
+        yield
+
+
 class HTTPRequestBuilder:
     """
     Class to help in building HTTP requests
@@ -174,36 +250,92 @@ class HTTPRequestBuilder:
 
         return self.with_header("x-api-version", version)
 
-    def get(self, cert_pem, key_pem) -> requests.Response:
+    def _send(self, method: HttpMethod, cert_pem, key_pem,
+              retry_if: Callable[[requests.Response | None, Exception | None], bool] = None,
+              **kwargs) -> requests.Response:
+        """
+        Sends the request through the pooled session for the endpoint and certificate, retrying transient failures
+        and failing fast if the circuit for the endpoint is open. Every attempt is paced by the rate limiter of the
+        endpoint family.
+
+        :param method: HttpMethod of the request
+        :param retry_if: Function which decides if a failed attempt may be retried. If not specified, the request
+                         is sent at most once.
+        :param kwargs: Any other keyword arguments to pass to requests
+        :return: requests.Response object
+        """
+
+        session = SESSION_POOL.get(cert_pem, key_pem, self.endpoint)
+
+        def send() -> requests.Response:
+            RATE_LIMITER.acquire(self.endpoint)
+
+            with _measure("network"):
+                return session.request(method.value, self.endpoint, params=self.params, headers=self.header,
+                                       **kwargs)
+
+        try:
+            return RETRY_POLICY.call(endpoint_family(self.endpoint), send, retry_if)
+        finally:
+            # the pool only closes the session once no request is using it
+            SESSION_POOL.release(session)
+
+    def get(self, cert_pem, key_pem, use_cache: bool = True) -> requests.Response:
         """
         Sends a GET request to the endpoint using the relevant certs stored in the session state.
 
+        The request is sent through a pooled keep-alive session, so that connections to the same host with the
+        same certificate and key are reused across requests. As GET requests are idempotent, they are retried
+        automatically on transient failures, successful responses are cached for a short while, and identical
+        requests made at the same time (e.g. from different Streamlit sessions) share a single API call.
+
+        :param use_cache: If True, a cached response is returned if there is one, and the response is cached
+        :return: requests.Response object
+        """
+
+        key = ResponseCache.key(self.endpoint, self.params, self.header, cert_pem)
+
+        if not use_cache:
+            return IN_FLIGHT.do(key, lambda: self._send(HttpMethod.GET, cert_pem, key_pem, retry_if=idempotent))
+
+        response = RESPONSE_CACHE.get(key)
+
+        if response is None:
+            response = IN_FLIGHT.do(key, lambda: self._fetch(key, cert_pem, key_pem))
+
+        return response
+
+    def _fetch(self, key, cert_pem, key_pem) -> requests.Response:
+        """
+        Sends a GET request to the endpoint and caches its response.
+
+        :param key: Cache key of the request
         :return: requests.Response object
         """
-        return requests.get(self.endpoint,
-                            params=self.params,
-                            headers=self.header,
-                            verify=certifi.where(),
-                            cert=(cert_pem, key_pem))
 
-    def post(self, cert_pem, key_pem) -> requests.Response:
+        response = self._send(HttpMethod.GET, cert_pem, key_pem, retry_if=idempotent)
+        RESPONSE_CACHE.put(key, self.endpoint, response)
+
+        return response
+
+    def post(self, cert_pem, key_pem,
+             retry_if: Callable[[requests.Response | None, Exception | None], bool] = None) -> requests.Response:
         """
         Sends a POST request to the endpoint using the relevant certs stored in the sessions state.
 
+        :param retry_if: Function which receives the failed response or exception and returns True if the request
+                         is safe to send again. If not specified, the request is never retried.
         :return: requests.Response object
         """
 
         if "key_pem" not in st.session_state or "cert_pem" not in st.session_state:
             raise ValueError("No Key or Certificate files specified!")
 
-        return requests.post(self.endpoint,
-                             params=self.params,
-                             headers=self.header,
-                             data=self.body,
-                             verify=certifi.where(),
-                             cert=(cert_pem, key_pem))
+        return self._send(HttpMethod.POST, cert_pem, key_pem, retry_if=retry_if, data=self.body)
 
-    def post_encrypted(self, encryption_key, cert_pem, key_pem) -> requests.Response:
+    def post_encrypted(self, encryption_key, cert_pem, key_pem,
+                       retry_if: Callable[[requests.Response | None, Exception | None], bool] = None) \
+            -> requests.Response:
         """
         Sends an encrypted POST request to the endpoint using the relevant certs stored in the session state.
         Note that we use json=... here to ensure the encrypted payload is automatically form-encoded.
@@ -215,18 +347,21 @@ class HTTPRequestBuilder:
         certificate, or a 2-tuple (cert, key) representing the file path to a certificate and private key file
         respectively.
 
+        :param retry_if: Function which receives the failed response or exception and returns True if the request
+                         is safe to send again. If not specified, the request is never retried.
         :return: requests.Response object
         """
 
         if "key_pem" not in st.session_state or "cert_pem" not in st.session_state:
             raise ValueError("No Key or Certificate files specified!")
 
-        return requests.post(self.endpoint,
-                             params=self.params,
-                             headers=self.header,
-                             json=Cryptography.encrypt(
-                                 encryption_key, json.dumps(self.body), return_bytes=False),
-                             cert=(cert_pem, key_pem))
+        with _measure("build"):
+            plaintext = json.dumps(self.body)
+
+        with _measure("encryption"):
+            ciphertext = Cryptography.encrypt(encryption_key, plaintext, return_bytes=False)
+
+        return self._send(HttpMethod.POST, cert_pem, key_pem, retry_if=retry_if, json=ciphertext)
 
     def repr(self, req_type: HttpMethod) -> str:
         """
@@ -302,12 +437,13 @@ def handle_request(rec_obj: AbstractRequest, encryption_key: str = None) -> None
         st.subheader("Encrypted Request Payload")
         try:
             LOGGER.info("Encrypting Request Payload...")
-            # decode the object and wrap it to display it properly
+            # encrypt the same plaintext that post_encrypted() sends, so that its ciphertext is reused when the
+            # request is executed, then decode the ciphertext and wrap it to display it properly
             ciphertext = Cryptography.encrypt(
-                encryption_key, str(rec_obj)).decode()
+                encryption_key, json.dumps(rec_obj.req.body)).decode()
             st.code("\n".join(textwrap.wrap(
                 ciphertext, width=HTTPRequestBuilder.WRAP_LEVEL)), language="text")
-        except binascii.Error:
+        except ValueError:
             LOGGER.error("Encryption failed! Aborting request...")
             st.error(
                 "Unable to perform Encryption! Check your AES key to make sure that it is valid!", icon="🚨")
@@ -317,87 +453,112 @@ def handle_request(rec_obj: AbstractRequest, encryption_key: str = None) -> None
 
 
 def handle_response(throwable: Callable[[], requests.Response],
-                    decryption_key: str = None) -> dict:
+                    decryption_key: str = None) -> RequestTimings:
     """
     Handles the potentially throwing request function and uses Streamlit to display or handle the error.
 
+    The request function is invoked exactly once. The time spent in each stage of the request (building the
+    payload, encryption, the network round-trip, decryption and rendering) is recorded, logged and returned to the
+    caller.
+
     :param throwable: Function to be called.
                       This function accepts no inputs and may potentially raise an error.
                       This function should also return the response object from the request.
     :param decryption_key: Provide a key if decryption is required for the returned payload. If the
                                response should be decrypted, then a section will display the decrypted response.
+    :return: RequestTimings object containing the time spent in each stage of the request
     """
 
+    timings = RequestTimings()
+    token = _ACTIVE_TIMINGS.set(timings)
+
     try:
         LOGGER.info("Executing request...")
         response = throwable()
-        if not isinstance(throwable(), requests.Response):
+
+        if not isinstance(response, requests.Response):
             LOGGER.error(
                 "Function does not return the expected requests.Response object! Aborting request...")
             raise AssertionError(
                 "The request function does not return a valid HTTP response!")
 
-        http_code_handler(response.status_code)
-
         if response.status_code >= 400:
             # is an error, no need to decrypt
-            LOGGER.error(f"Request failed with HTTP request code {
-                         response.status_code}! Aborting request...")
-            st.header("Error Message")
-            try:
-                data = json.loads(response.text)
-                st.json(Cryptography.decrypt(decryption_key, data["error"]).decode("utf-8"))
-
-            except Exception:
-                # replace the unicode characters with the utf-8 encoded characters
-                st.code(response.text.replace(r"\u003D", "="))
-            return
-
-        LOGGER.info("Decrypting response...")
+            LOGGER.error(f"Request failed with HTTP request code {response.status_code}! Aborting request...")
+
+            with timings.measure("decryption"):
+                try:
+                    error = Cryptography.decrypt(decryption_key, json.loads(response.text)["error"]).decode("utf-8")
+                except Exception:
+                    error = None
+
+            with timings.measure("render"):
+                http_code_handler(response.status_code)
+                st.header("Error Message")
+
+                if error is not None:
+                    st.json(error)
+                else:
+                    # replace the unicode characters with the utf-8 encoded characters
+                    st.code(response.text.replace(r"\u003D", "="))
+
+            return timings
+
         if decryption_key is not None:
-            st.subheader("Encrypted Response")
-            st.code(response.text)
-            st.subheader("Decrypted Response")
-            try:
-                data = Cryptography.decrypt(decryption_key, response.text).decode()
-                json_data = json.loads(data)
-                st.json(json_data)
-            except Exception as ex:
-                print(ex)
-                st.error("Unable to decrypt the response! It might be possible that the outputs are already "
-                         "decrypted (as with the Mock API endpoint)!", icon="🚨")
+            LOGGER.info("Decrypting response...")
+
+            with timings.measure("decryption"):
+                try:
+                    data = json.loads(Cryptography.decrypt(decryption_key, response.text).decode())
+                except Exception as ex:
+                    LOGGER.error(f"Unable to decrypt the response! Error: {ex}")
+                    data = None
+
+            with timings.measure("render"):
+                http_code_handler(response.status_code)
+                st.subheader("Encrypted Response")
+                st.code(response.text)
+                st.subheader("Decrypted Response")
+
+                if data is not None:
+                    st.json(data)
+                else:
+                    st.error("Unable to decrypt the response! It might be possible that the outputs are already "
+                             "decrypted (as with the Mock API endpoint)!", icon="🚨")
         else:
-            st.subheader("Response")
-            try:
-                data = response.json()
-                st.json(data)
-            except json.decoder.JSONDecodeError:
-                LOGGER.warning(
-                    "Message is not JSON-serializable! Defaulting to plain text instead...")
-                st.code(response.text, language="text")
+            with timings.measure("render"):
+                http_code_handler(response.status_code)
+                st.subheader("Response")
+
+                try:
+                    st.json(response.json())
+                except json.decoder.JSONDecodeError:
+                    LOGGER.warning(
+                        "Message is not JSON-serializable! Defaulting to plain text instead...")
+                    st.code(response.text, language="text")
+    except CircuitOpenError as ex:
+        LOGGER.error(f"Request rejected as the API endpoint is failing repeatedly! Error: {ex}. Aborting request...")
+        st.error("The API endpoint is currently failing repeatedly, so the request was not sent! "
+                 "Wait a while before trying again!", icon="🚨")
     except HTTPError as ex:
-        LOGGER.error(f"Request failed with HTTP exception! Error: {
-                     ex}. Aborting request...")
+        LOGGER.error(f"Request failed with HTTP exception! Error: {ex}. Aborting request...")
         st.error("Unable to make a HTTP request to the API endpoint! "
                  "Check your inputs and make sure that there are no mistakes in your inputs!")
     except InvalidURL as ex:
-        LOGGER.error(f"Request failed due to URL error. Error: {
-                     ex}. Aborting request...")
+        LOGGER.error(f"Request failed due to URL error. Error: {ex}. Aborting request...")
         st.error("Check that the URL you provided is a valid URL!")
     except InvalidHeader as ex:
-        LOGGER.error(f"Request failed due to HTTP header error. Error: {
-                     ex}. Aborting request...")
+        LOGGER.error(f"Request failed due to HTTP header error. Error: {ex}. Aborting request...")
         st.error("Check that the headers you provided is valid!")
     except SSLError as ex:
         # there are some issues with the SSL keys
-        LOGGER.error(f"Unable to establish SSL connection with the server! Error: {
-                     ex}. Aborting request...")
+        LOGGER.error(f"Unable to establish SSL connection with the server! Error: {ex}. Aborting request...")
         st.error(
             "Check your SSL certificate and keys and ensure that they are valid!\n\n", icon="🚨")
     except ConnectionError as ex:
         # the endpoint url is likely malformed here
-        LOGGER.error(f"There is an issue with the connection with the API endpoint! Error: {
-                     ex}. Aborting request...")
+        LOGGER.error(f"There is an issue with the connection with the API endpoint! Error: {ex}. "
+                     f"Aborting request...")
         st.error("Check the inputs that you have used for the API request and check that "
                  "they are valid!\n\nIt is likely that you have included a value that "
                  "causes the API request to query from a URL that does not exist or is "
@@ -405,3 +566,8 @@ def handle_response(throwable: Callable[[], requests.Response],
     except Exception as ex:
         # float it back to the user to handle
         st.exception(ex)
+    finally:
+        _ACTIVE_TIMINGS.reset(token)
+        LOGGER.info(f"Request timings: {timings}")
+
+    return timings
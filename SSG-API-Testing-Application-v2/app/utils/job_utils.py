@@ -0,0 +1,386 @@
+"""
+This file contains classes used for running large batches of requests as jobs which can be resumed after they are
+interrupted, without sending any request which already went through a second time.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+from requests.exceptions import ConnectTimeout, InvalidHeader, InvalidSchema, InvalidURL, MissingSchema, \
+    RequestException, SSLError
+
+from app.core.abc.abstract import AbstractRequest
+from app.utils.batch_utils import BatchExecutor, BatchResult
+from app.utils.retry_utils import CircuitOpenError
+
+
+class JournalEntry(NamedTuple):
+    """Latest state of an item of a job, as recorded in its journal"""
+
+    state: str
+    detail: str | None
+
+
+class JobOutcome(NamedTuple):
+    """Outcome of an item of a job"""
+
+    key: str
+    state: str
+    detail: str | None
+
+    # BatchResult of the request, or None if the item was not sent during this run
+    result: BatchResult | None
+
+    # True if the outcome was carried over from an earlier run of the job
+    resumed: bool
+
+
+class JobJournal:
+    """
+    Write-ahead journal of the state of every item of a job, kept as a JSON Lines file.
+
+    Every change of state is appended to the file as a line of its own, and the latest line of an item is its
+    current state. Writes are buffered and only fsynced once every fsync_every lines, or when checkpoint() is called,
+    so that a job does not pay for a disk flush on every item. Reopening the journal replays the file, discarding a
+    last line which was only partially written when the job was interrupted.
+    """
+
+    # states of an item
+    PENDING: str = "pending"
+    SENT: str = "sent"
+    CONFIRMED: str = "confirmed"
+    FAILED: str = "failed"
+    STATES: tuple[str, ...] = (PENDING, SENT, CONFIRMED, FAILED)
+
+    # default number of lines written between fsyncs
+    FSYNC_EVERY: int = 100
+
+    # name of the environment variable which overrides the directory that journals are kept in
+    ENV_NAME_DIRECTORY: str = "SSG_JOURNAL_DIR"
+
+    def __init__(self, path: str, fsync_every: int = FSYNC_EVERY):
+        """
+        Opens the journal, replaying the states recorded by earlier runs of the job.
+
+        :param path: Path to the journal file, which is created if it does not exist
+        :param fsync_every: Number of lines written between fsyncs
+        """
+
+        if not isinstance(path, str) or len(path) == 0:
+            raise ValueError("Path to the journal must be a non-empty string!")
+
+        if not isinstance(fsync_every, int) or fsync_every < 1:
+            raise ValueError("Fsync interval must be a positive integer!")
+
+        self.path = path
+        self.fsync_every = fsync_every
+        self.entries: dict[str, JournalEntry] = {}
+        self._unsynced = 0
+
+        valid = self._replay()
+        self._file = open(path, "a+b")
+
+        # drop a torn last line, so that the next line starts on a line of its own
+        if self._file.seek(0, os.SEEK_END) != valid:
+            self._file.truncate(valid)
+            self._file.seek(valid)
+
+    @staticmethod
+    def path_for(job: str, content: bytes) -> str:
+        """
+        Returns the path of the journal of a job over some input, so that running the same job over the same input
+        again picks up the journal of the earlier run.
+
+        :param job: Name of the job, such as "enrolment-import"
+        :param content: Input of the job, such as the contents of an uploaded roster
+        :return: Path to the journal, within the directory set in the environment variable named by
+                 ENV_NAME_DIRECTORY, or the temporary directory if it is not set
+        """
+
+        directory = os.environ.get(JobJournal.ENV_NAME_DIRECTORY) or tempfile.gettempdir()
+        return os.path.join(directory, f"{job}-{hashlib.sha256(content).hexdigest()[:16]}.jsonl")
+
+    def _replay(self) -> int:
+        """
+        Reads the states recorded in the journal file, if it exists.
+
+        :return: Number of bytes of the file which hold complete lines
+        """
+
+        if not os.path.exists(self.path):
+            return 0
+
+        valid = 0
+
+        with open(self.path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+
+                try:
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = JournalEntry(entry["state"], entry.get("detail"))
+                except (ValueError, KeyError, TypeError):
+                    break
+
+                valid += len(line)
+
+        return valid
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def state(self, key: str) -> str | None:
+        """
+        Returns the current state of an item.
+
+        :param key: Key of the item
+        :return: State of the item, or None if the item has not been recorded
+        """
+
+        entry = self.entries.get(key)
+        return entry.state if entry is not None else None
+
+    def counts(self) -> dict[str, int]:
+        """Returns the number of items currently in each state"""
+
+        counts = {state: 0 for state in JobJournal.STATES}
+
+        for entry in self.entries.values():
+            counts[entry.state] += 1
+
+        return counts
+
+    def record(self, key: str, state: str, detail: str = None) -> None:
+        """
+        Records a change of state of an item. The line is only guaranteed to be on disk after the next fsync.
+
+        :param key: Key of the item
+        :param state: New state of the item
+        :param detail: Detail of the state, such as the reference number returned for the item or the reason why it
+                       failed
+        """
+
+        if state not in JobJournal.STATES:
+            raise ValueError(f"State must be one of {', '.join(JobJournal.STATES)}!")
+
+        self._file.write(json.dumps({"key": key, "state": state, "detail": detail}).encode("utf-8") + b"\n")
+        self.entries[key] = JournalEntry(state, detail)
+        self._unsynced += 1
+
+        if self._unsynced >= self.fsync_every:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Flushes every line written so far to disk."""
+
+        if self._unsynced == 0:
+            return
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        """Flushes the journal to disk and closes it."""
+
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def discard(self) -> None:
+        """
+        Closes the journal and deletes its file, once the job has finished and no item is left to be resumed.
+        """
+
+        self.close()
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ResumableJob:
+    """
+    Runs a batch of requests on a BatchExecutor, recording the state of every item in a JobJournal, so that a job
+    which is interrupted can be run again over the same items without sending the items which already went through.
+
+    Items are released to the executor in groups of batch_size: every item of a group is recorded as sent, and the
+    journal is fsynced once for the whole group, before any of them is sent. When the job is run again:
+
+    - Confirmed items are not sent again, and their recorded outcome is reported instead
+    - Items which were sent but never confirmed may or may not have gone through, so they are reported as in doubt
+      instead of being sent again, unless resend_in_doubt is set
+    - Failed items, and items which were never sent, are sent again
+
+    An item is only recorded as failed if its request was definitely rejected or never went out. If the connection
+    broke after the request went out, or the server responded with a 5xx error, the request may still have been
+    processed, so the item is left as sent and is in doubt.
+
+    Without a journal, every item is sent and nothing is recorded.
+    """
+
+    # default number of items recorded as sent with a single fsync
+    BATCH_SIZE: int = 8
+
+    # detail reported for items which were sent but never confirmed by an earlier run
+    IN_DOUBT: str = "Sent before the job was interrupted, but never confirmed! Check whether it went through " \
+                    "before sending it again."
+
+    # detail reported for items which were sent, but whose outcome is unknown, formatted with the detail of the result
+    UNCONFIRMED: str = "Sent, but the outcome is unknown ({})! Check whether it went through before sending it again."
+
+    # exceptions raised before a request goes out, which mean that it was never sent
+    UNSENT_ERRORS: tuple[type[Exception], ...] = (ConnectTimeout, SSLError, CircuitOpenError, InvalidURL,
+                                                  InvalidHeader, InvalidSchema, MissingSchema)
+
+    def __init__(self, journal: JobJournal = None, executor: BatchExecutor = None, batch_size: int = BATCH_SIZE,
+                 resend_in_doubt: bool = False):
+        """
+        Initialises the job.
+
+        :param journal: JobJournal to record the state of every item in. If not specified, nothing is recorded
+        :param executor: BatchExecutor used to send the requests. If not specified,
+                         BatchExecutor.adaptive() is used
+        :param batch_size: Number of items recorded as sent with a single fsync
+        :param resend_in_doubt: True to send the items which were sent but never confirmed by an earlier run again
+        """
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("Batch size must be a positive integer!")
+
+        self.journal = journal
+        self.executor = executor if executor is not None else BatchExecutor.adaptive()
+        self.batch_size = batch_size
+        self.resend_in_doubt = resend_in_doubt
+
+    @staticmethod
+    def in_doubt(result: BatchResult) -> bool:
+        """
+        Returns True if the request of a result may or may not have been processed.
+
+        :param result: BatchResult of the request
+        :return: True if the connection broke after the request went out, or the server responded with a 5xx error,
+                 False if the request was confirmed, definitely rejected, or never sent
+        """
+
+        if result.error is None:
+            return result.status_code >= 500
+
+        # exceptions which are not raised by requests come from preparing the request, before it is sent
+        return isinstance(result.error, RequestException) and not isinstance(result.error, ResumableJob.UNSENT_ERRORS)
+
+    def _release(self, batch: list[tuple[str, AbstractRequest]], keys: dict[int, str],
+                 position: int) -> Iterator[AbstractRequest]:
+        """
+        Records a group of items as sent, and then releases their requests.
+
+        :param batch: List of the key and the request of every item of the group
+        :param keys: Dictionary which is filled with the key of every request released, keyed by the position of the
+                     request
+        :param position: Position of the first request of the group
+        :return: Iterator of requests
+        """
+
+        if self.journal is not None:
+            for key, _ in batch:
+                self.journal.record(key, JobJournal.SENT)
+
+            # the items must be on disk as sent before any of them goes out
+            self.journal.checkpoint()
+
+        for offset, (key, request) in enumerate(batch):
+            keys[position + offset] = key
+            yield request
+
+    def _requests(self, items: Iterable[tuple[str, AbstractRequest]], keys: dict[int, str],
+                  carried: deque[JobOutcome]) -> Iterator[AbstractRequest]:
+        """
+        Lazily releases the requests of the items which need to be sent.
+
+        :param items: Iterable of the key and the request of every item
+        :param keys: Dictionary which is filled with the key of every request released, keyed by the position of the
+                     request
+        :param carried: Queue which is filled with the outcomes of the items which are not sent
+        :return: Iterator of requests
+        """
+
+        batch = []
+        released = 0
+
+        for key, request in items:
+            entry = self.journal.entries.get(key) if self.journal is not None else None
+
+            if entry is not None and entry.state == JobJournal.CONFIRMED:
+                carried.append(JobOutcome(key, JobJournal.CONFIRMED, entry.detail, None, True))
+                continue
+
+            if entry is not None and entry.state == JobJournal.SENT and not self.resend_in_doubt:
+                carried.append(JobOutcome(key, JobJournal.SENT, entry.detail or ResumableJob.IN_DOUBT, None, True))
+                continue
+
+            if self.journal is not None:
+                self.journal.record(key, JobJournal.PENDING)
+
+            batch.append((key, request))
+
+            if len(batch) >= self.batch_size:
+                yield from self._release(batch, keys, released)
+                released += len(batch)
+                batch = []
+
+        if len(batch) > 0:
+            yield from self._release(batch, keys, released)
+
+    def run(self, items: Iterable[tuple[str, AbstractRequest]], describe: Callable[[BatchResult], str | None],
+            *args: Any, **kwargs: Any) -> Iterator[JobOutcome]:
+        """
+        Sends the request of every item which needs to be sent, and yields the outcome of every item.
+
+        :param items: Iterable of a unique key and the request of every item. The same item must be given the same
+                      key every time the job is run. The iterable is consumed from the calling thread
+        :param describe: Function which returns the detail recorded for the result of a request, such as the
+                         reference number returned, or the reason why the request failed
+        :param args: Positional arguments to pass to the execute() method of every request
+        :param kwargs: Keyword arguments to pass to the execute() method of every request
+        :return: Iterator of JobOutcome objects, in no particular order
+        """
+
+        keys: dict[int, str] = {}
+        carried: deque[JobOutcome] = deque()
+
+        try:
+            for result in self.executor.run(self._requests(items, keys, carried), *args, **kwargs):
+                while len(carried) > 0:
+                    yield carried.popleft()
+
+                key = keys.pop(result.index)
+                detail = describe(result)
+
+                if result.ok:
+                    state = JobJournal.CONFIRMED
+                elif ResumableJob.in_doubt(result):
+                    state, detail = JobJournal.SENT, ResumableJob.UNCONFIRMED.format(detail)
+                else:
+                    state = JobJournal.FAILED
+
+                if self.journal is not None:
+                    self.journal.record(key, state, detail)
+
+                yield JobOutcome(key, state, detail, result, False)
+
+            while len(carried) > 0:
+                yield carried.popleft()
+        finally:
+            if self.journal is not None:
+                self.journal.checkpoint()
@@ -2,7 +2,10 @@
 This file contains helper functions that handles the manipulation of JSON data.
 """
 
-from typing import Sequence, Sized
+import json
+
+from operator import attrgetter
+from typing import Any, Callable, Sequence, Sized
 
 
 def remove_null_fields(d: dict, exclude: Sequence[str] = ()) -> dict:
@@ -46,3 +49,109 @@ def remove_null_fields(d: dict, exclude: Sequence[str] = ()) -> dict:
 
     # return only keys with non-None values
     return {k: v for k, v in d.items() if k not in keys_to_remove}
+
+
+class PayloadSerializer:
+    """
+    Serializer that builds the payload of a model object directly from a field-path specification.
+
+    The specification is a nested dictionary that mirrors the shape of the payload, where every leaf is either the
+    name of the attribute of the model object holding the value of the field, or a function which receives the model
+    object and returns the value of the field. The specification is compiled once, and every payload is then built in
+    a single pass that skips empty fields as it goes, producing exactly what remove_null_fields() would return for
+    the fully populated payload.
+    """
+
+    def __init__(self, spec: dict[str, Any], exclude: Sequence[str] = ()):
+        """
+        Compiles the specification.
+
+        :param spec: Nested dictionary mirroring the shape of the payload, with attribute names or functions as leaves
+        :param exclude: Sequence of fields that are kept even if they contain None or an empty dictionary, with the
+                        same meaning as in remove_null_fields()
+        """
+
+        self.exclude = exclude
+        self._build = self._compile(spec)
+
+    def _compile(self, spec: dict[str, Any]) -> Callable[[Any, bool], dict]:
+        """
+        Compiles one level of the specification into a function that builds that level of the payload.
+
+        :param spec: Level of the specification to compile
+        :return: Function which receives the model object and whether empty fields should be removed, and returns the
+                 dictionary for that level of the payload
+        """
+
+        if not isinstance(spec, dict):
+            raise ValueError("Payload specification must be a dictionary!")
+
+        fields: list[tuple[str, bool, Callable]] = []
+
+        for key, field in spec.items():
+            if isinstance(field, dict):
+                fields.append((key, True, self._compile(field)))
+            elif isinstance(field, str):
+                fields.append((key, False, attrgetter(field)))
+            elif callable(field):
+                fields.append((key, False, field))
+            else:
+                raise ValueError(f"Field {key} must be a dictionary, an attribute name or a function!")
+
+        exclude = self.exclude
+
+        def build(obj: Any, strip: bool) -> dict:
+            payload = {}
+
+            for key, nested, getter in fields:
+                keep = not strip or key in exclude
+
+                if nested:
+                    value = getter(obj, not keep)
+
+                    if keep or len(value) > 0:
+                        payload[key] = value
+
+                    continue
+
+                value = getter(obj)
+
+                if keep:
+                    payload[key] = value
+                elif value is None:
+                    continue
+                elif isinstance(value, dict):
+                    value = remove_null_fields(value, exclude)
+
+                    if len(value) > 0:
+                        payload[key] = value
+                elif isinstance(value, list):
+                    if len(value) > 0:
+                        payload[key] = [item for item in value
+                                        if item is not None and (not isinstance(item, Sized) or len(item) > 0)]
+                else:
+                    payload[key] = value
+
+            return payload
+
+        return build
+
+    def dict(self, obj: Any) -> dict:
+        """
+        Builds the payload of a model object.
+
+        :param obj: Model object
+        :return: Payload with empty fields removed
+        """
+
+        return self._build(obj, True)
+
+    def json(self, obj: Any) -> str:
+        """
+        Builds the payload of a model object as a JSON string.
+
+        :param obj: Model object
+        :return: JSON string of the payload with empty fields removed
+        """
+
+        return json.dumps(self._build(obj, True))
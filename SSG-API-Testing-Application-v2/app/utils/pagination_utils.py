@@ -0,0 +1,139 @@
+"""
+This file contains classes used for iterating over every record returned by paginated search APIs.
+"""
+
+import json
+import math
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Generic, Iterator, TypeVar
+
+import requests
+
+from app.core.cipher.encrypt_decrypt import Cryptography
+from app.utils.context_utils import with_script_run_context
+
+T = TypeVar("T")
+
+
+def decrypt_page(response: requests.Response, encryption_key: str) -> tuple[list[Any], int | None]:
+    """
+    Decrypts a page of search results, returning its records and the total number of records across all pages.
+
+    :param response: Response of a search request
+    :param encryption_key: Encryption key used to decrypt the response
+    :return: Tuple of the records in the page and the total number of records, or None if the total is not known
+    """
+
+    response.raise_for_status()
+
+    try:
+        data = json.loads(Cryptography.decrypt(encryption_key, response.text).decode("utf-8"))
+    except Exception:
+        # the mock API endpoints do not encrypt their responses
+        data = response.json()
+
+    records = data.get("data") if isinstance(data, dict) else None
+    meta = data.get("meta") if isinstance(data, dict) else None
+    total = meta.get("total") if isinstance(meta, dict) else None
+
+    if not isinstance(records, list):
+        records = [] if records is None else [records]
+
+    return records, total if isinstance(total, int) else None
+
+
+class PageIterator(Generic[T]):
+    """
+    Iterates over every record of a paginated search, fetching pages in the background.
+
+    While a page is being consumed, the next page is already being fetched. Once the first page reveals the total
+    number of records, up to max_workers of the remaining pages are fetched in parallel, while pages are still
+    yielded in order. If the total is not known, pages are fetched one ahead until a page comes back short. Pages
+    which have not been fetched yet are abandoned as soon as the caller stops iterating.
+
+    Requests are created on the calling thread with prepare(), as the request classes read the Streamlit session
+    state, and sent on the worker threads with send(), which runs with the script context of the calling thread so
+    that sending a request can read the session state too.
+    """
+
+    # default number of pages fetched in parallel once the total number of records is known
+    MAX_WORKERS: int = 4
+
+    def __init__(self, prepare: Callable[[int], T], send: Callable[[T], tuple[list[Any], int | None]],
+                 page_size: int, first_page: int = 0, max_workers: int = MAX_WORKERS):
+        """
+        Initialises the iterator.
+
+        :param prepare: Function which creates the request for a page number
+        :param send: Function which sends a request and returns the records of the page and the total number of
+                     records, such as decrypt_page() applied to the response
+        :param page_size: Number of records in a full page
+        :param first_page: Page number of the first page to fetch
+        :param max_workers: Number of pages fetched in parallel once the total number of records is known
+        """
+
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError("Page size must be a positive integer!")
+
+        if not isinstance(first_page, int) or first_page < 0:
+            raise ValueError("First page must be a non-negative integer!")
+
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("Maximum number of workers must be a positive integer!")
+
+        self.prepare = prepare
+        self.send = send
+        self.page_size = page_size
+        self.first_page = first_page
+        self.max_workers = max_workers
+        self.total: int | None = None
+        self.pages_fetched = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for page in self.pages():
+            yield from page
+
+    def pages(self) -> Iterator[list[Any]]:
+        """
+        Yields the records of every page, in page order.
+
+        :return: Iterator of the list of records in each page
+        """
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pages")
+        send = with_script_run_context(self.send)
+        in_flight: deque[tuple[int, Future]] = deque()
+        next_page = self.first_page
+        last_page: int | None = None
+
+        def submit() -> None:
+            nonlocal next_page
+            in_flight.append((next_page, pool.submit(send, self.prepare(next_page))))
+            next_page += 1
+
+        try:
+            submit()
+
+            while len(in_flight) > 0:
+                page, future = in_flight.popleft()
+                records, total = future.result()
+                self.pages_fetched += 1
+
+                if page == self.first_page and total is not None:
+                    self.total = total
+                    last_page = self.first_page + max(math.ceil(total / self.page_size), 1) - 1
+
+                if last_page is not None:
+                    # the number of pages is known, so keep every worker busy with the pages that remain
+                    while len(in_flight) < self.max_workers and next_page <= last_page:
+                        submit()
+                elif len(records) >= self.page_size and len(in_flight) == 0:
+                    # the number of pages is not known, so only fetch one page ahead until a page comes back short
+                    submit()
+
+                yield records
+        finally:
+            # abandon the pages that the caller no longer needs
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,181 @@
+"""
+This file contains classes used for pacing the requests sent to the API endpoints, so that the application does
+not exceed the request rates permitted by the APIs.
+"""
+
+import threading
+import time
+
+from app.utils.retry_utils import endpoint_family
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket which refills at a fixed rate up to its capacity.
+
+    Every request consumes one token. If no token is available, the caller reserves the next token that will be
+    refilled and sleeps until then, so that waiting callers are served in the order that they arrived in.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialises a full token bucket.
+
+        :param rate: Number of tokens refilled per second
+        :param capacity: Maximum number of tokens in the bucket, i.e. the largest burst of requests permitted
+        """
+
+        if not isinstance(rate, (int, float)) or rate <= 0:
+            raise ValueError("Rate must be a positive number!")
+
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Capacity must be a positive integer!")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token from the bucket, borrowing against future refills if the bucket is empty.
+
+        :return: Number of seconds the caller must wait before its token is available
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        Takes a token from the bucket, waiting for one to be refilled if the bucket is empty.
+
+        :return: Number of seconds spent waiting
+        """
+
+        wait = self.reserve()
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+class RateLimiter:
+    """
+    Process-wide rate limiter with a separate token bucket for each family of API endpoints on each host.
+
+    Limits are looked up by the API group of the endpoint (e.g. "courses" or "tpg/enrolments"); endpoints which
+    do not belong to any configured group share the default limit.
+    """
+
+    # default (requests per second, burst size) for each API group
+    LIMITS: dict[str, tuple[float, int]] = {
+        "courses": (10.0, 20),
+        "tpg/enrolments": (10.0, 20),
+        "tpg/assessments": (10.0, 20),
+        "skillsFutureCredits": (5.0, 10)
+    }
+
+    # (requests per second, burst size) for any API group that is not found in LIMITS
+    DEFAULT_LIMIT: tuple[float, int] = (10.0, 20)
+
+    def __init__(self, limits: dict[str, tuple[float, int]] = None, default_limit: tuple[float, int] = None):
+        """
+        Initialises the rate limiter.
+
+        :param limits: Mapping of API group to its (requests per second, burst size)
+        :param default_limit: (requests per second, burst size) for any API group that is not found in limits
+        """
+
+        self.limits = dict(RateLimiter.LIMITS if limits is None else limits)
+        self.default_limit = RateLimiter.DEFAULT_LIMIT if default_limit is None else default_limit
+        self._buckets: dict[str, TokenBucket] = {}
+        self._metrics: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, group: str, rate: float, burst: int) -> None:
+        """
+        Sets the limit for an API group. Buckets that were already created for the group are replaced.
+
+        :param group: API group, e.g. "tpg/enrolments"
+        :param rate: Number of requests permitted per second
+        :param burst: Largest burst of requests permitted
+        """
+
+        # validate the values before storing them
+        TokenBucket(rate, burst)
+
+        with self._lock:
+            self.limits[group] = (rate, burst)
+
+            for family in [family for family in self._buckets if RateLimiter._group(family) == group]:
+                del self._buckets[family]
+
+    def acquire(self, url: str) -> float:
+        """
+        Waits until a request to the URL is permitted by the limit of its endpoint family.
+
+        :param url: URL of the request
+        :return: Number of seconds spent waiting
+        """
+
+        family = endpoint_family(url)
+
+        with self._lock:
+            bucket = self._buckets.get(family)
+
+            if bucket is None:
+                rate, burst = self.limits.get(RateLimiter._group(family), self.default_limit)
+                bucket = self._buckets[family] = TokenBucket(rate, burst)
+
+        wait = bucket.acquire()
+
+        with self._lock:
+            metrics = self._metrics.setdefault(family, {"requests": 0, "throttled": 0, "total_wait": 0.0,
+                                                        "max_wait": 0.0})
+            metrics["requests"] += 1
+            metrics["throttled"] += 1 if wait > 0 else 0
+            metrics["total_wait"] += wait
+            metrics["max_wait"] = max(metrics["max_wait"], wait)
+
+        return wait
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Returns the wait time metrics of each endpoint family.
+
+        :return: Mapping of endpoint family to its number of requests, number of requests that had to wait, total
+                 number of seconds waited and longest wait in seconds
+        """
+
+        with self._lock:
+            return {family: dict(metrics) for family, metrics in self._metrics.items()}
+
+    def reset(self) -> None:
+        """Refills all buckets and clears all metrics."""
+
+        with self._lock:
+            self._buckets.clear()
+            self._metrics.clear()
+
+    @staticmethod
+    def _group(family: str) -> str:
+        """
+        Strips the host from an endpoint family, returning its API group.
+
+        :param family: Endpoint family, as returned by endpoint_family()
+        :return: API group
+        """
+
+        return family.split("/", 1)[1] if "/" in family else ""
+
+
+# shared rate limiter used by every HTTPRequestBuilder within this process
+RATE_LIMITER = RateLimiter()
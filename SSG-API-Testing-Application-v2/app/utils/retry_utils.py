@@ -0,0 +1,304 @@
+"""
+This file contains classes used for retrying failed HTTP requests and for failing fast when an API endpoint is down.
+"""
+
+import random
+import threading
+import time
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable
+from urllib.parse import urlparse
+
+import requests
+
+from requests.exceptions import ConnectionError, SSLError, Timeout, RequestException
+
+
+def endpoint_family(url: str) -> str:
+    """
+    Returns the family of API endpoints that a URL belongs to, made up of the host and the API group found at the
+    start of the path.
+
+    e.g. https://uat-api.ssg-wsg.sg/tpg/enrolments/search -> uat-api.ssg-wsg.sg/tpg/enrolments
+         https://uat-api.ssg-wsg.sg/courses/courseRuns/id/1 -> uat-api.ssg-wsg.sg/courses
+
+    :param url: URL of the API endpoint
+    :return: Endpoint family of the URL
+    """
+
+    if not isinstance(url, str):
+        raise ValueError("URL must be a string!")
+
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split("/") if len(segment) > 0]
+
+    # the TPG APIs are grouped under a common prefix, so the second segment is needed to tell them apart
+    family = segments[:2] if len(segments) > 0 and segments[0] == "tpg" else segments[:1]
+
+    return "/".join([parsed.netloc] + family)
+
+
+def idempotent(response: requests.Response | None, error: Exception | None) -> bool:
+    """
+    Retry check for requests that are safe to repeat, such as GET requests. Always permits a retry.
+
+    :param response: Response of the failed attempt, if any
+    :param error: Exception raised by the failed attempt, if any
+    :return: True
+    """
+
+    return True
+
+
+class CircuitOpenError(RequestException):
+    """Raised when a request is rejected because the circuit for its endpoint is open"""
+
+    pass
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    Once an endpoint fails a number of times in a row, its circuit opens and requests to it are rejected
+    immediately with a CircuitOpenError. After the recovery timeout, a single trial request is let through; its
+    outcome decides whether the circuit closes again or stays open for another recovery period.
+    """
+
+    # number of consecutive failures needed to open the circuit
+    FAILURE_THRESHOLD: int = 5
+
+    # number of seconds to wait before letting a trial request through an open circuit
+    RECOVERY_TIMEOUT: float = 30.0
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, recovery_timeout: float = RECOVERY_TIMEOUT):
+        """
+        Initialises the circuit breaker.
+
+        :param failure_threshold: Number of consecutive failures needed to open the circuit
+        :param recovery_timeout: Number of seconds to wait before letting a trial request through an open circuit
+        """
+
+        if not isinstance(failure_threshold, int) or failure_threshold < 1:
+            raise ValueError("Failure threshold must be a positive integer!")
+
+        if not isinstance(recovery_timeout, (int, float)) or recovery_timeout < 0:
+            raise ValueError("Recovery timeout must be a non-negative number!")
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        # maps the endpoint key to the number of consecutive failures and the time that the circuit opened at
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+        self._trial_in_progress: set[str] = set()
+        self._lock = threading.Lock()
+
+    def is_open(self, key: str) -> bool:
+        """
+        Returns True if the circuit for the endpoint is open.
+
+        :param key: Endpoint key
+        """
+
+        with self._lock:
+            return key in self._opened_at
+
+    def before_request(self, key: str) -> None:
+        """
+        Checks if a request to the endpoint may proceed, and raises a CircuitOpenError if it may not.
+
+        :param key: Endpoint key
+        """
+
+        with self._lock:
+            if key not in self._opened_at:
+                return
+
+            recovered = time.monotonic() - self._opened_at[key] >= self.recovery_timeout
+
+            if recovered and key not in self._trial_in_progress:
+                # let a single trial request through to check if the endpoint has recovered
+                self._trial_in_progress.add(key)
+                return
+
+        raise CircuitOpenError(f"Circuit for {key} is open as the endpoint has failed repeatedly! "
+                               f"Try again later.")
+
+    def record_success(self, key: str) -> None:
+        """
+        Records a successful request to the endpoint, closing its circuit.
+
+        :param key: Endpoint key
+        """
+
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+            self._trial_in_progress.discard(key)
+
+    def record_failure(self, key: str) -> None:
+        """
+        Records a failed request to the endpoint, opening its circuit if the failure threshold is reached.
+
+        :param key: Endpoint key
+        """
+
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            self._trial_in_progress.discard(key)
+
+            if self._failures[key] >= self.failure_threshold or key in self._opened_at:
+                self._opened_at[key] = time.monotonic()
+
+    def end_trial(self, key: str) -> None:
+        """
+        Ends the trial request to the endpoint, if one is in progress, so that another request may be let through to
+        check if the endpoint has recovered. Has no effect once the outcome of the trial has been recorded.
+
+        :param key: Endpoint key
+        """
+
+        with self._lock:
+            self._trial_in_progress.discard(key)
+
+    def reset(self) -> None:
+        """Closes all circuits."""
+
+        with self._lock:
+            self._failures.clear()
+            self._opened_at.clear()
+            self._trial_in_progress.clear()
+
+
+class RetryPolicy:
+    """
+    Retries requests that fail with a transient error, using exponential backoff with full jitter.
+
+    Requests are only retried if the retry check passed in by the caller allows it, which lets callers retry
+    idempotent requests freely while keeping non-idempotent requests from being sent twice.
+    """
+
+    # HTTP status codes which indicate a transient failure
+    RETRY_STATUSES: frozenset[int] = frozenset({429, 502, 503, 504})
+
+    # HTTP status codes which indicate that the endpoint is unhealthy, and count towards opening its circuit
+    FAILURE_STATUSES: frozenset[int] = frozenset({500, 502, 503, 504})
+
+    # default number of retries after the first attempt
+    MAX_RETRIES: int = 3
+
+    # base number of seconds to back off for, which doubles with each retry
+    BACKOFF_FACTOR: float = 0.5
+
+    # maximum number of seconds to wait between attempts, including waits requested through Retry-After
+    MAX_BACKOFF: float = 30.0
+
+    def __init__(self, max_retries: int = MAX_RETRIES, backoff_factor: float = BACKOFF_FACTOR,
+                 max_backoff: float = MAX_BACKOFF, breaker: CircuitBreaker = None):
+        """
+        Initialises the retry policy.
+
+        :param max_retries: Number of retries after the first attempt
+        :param backoff_factor: Base number of seconds to back off for, which doubles with each retry
+        :param max_backoff: Maximum number of seconds to wait between attempts
+        :param breaker: Circuit breaker to guard each endpoint with
+        """
+
+        if not isinstance(max_retries, int) or max_retries < 0:
+            raise ValueError("Maximum number of retries must be a non-negative integer!")
+
+        if not isinstance(backoff_factor, (int, float)) or backoff_factor < 0:
+            raise ValueError("Backoff factor must be a non-negative number!")
+
+        if not isinstance(max_backoff, (int, float)) or max_backoff < 0:
+            raise ValueError("Maximum backoff must be a non-negative number!")
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+
+    def backoff(self, attempt: int, response: requests.Response | None = None) -> float:
+        """
+        Returns the number of seconds to wait before the next attempt.
+
+        If the response carries a Retry-After header, it is honoured, otherwise a random delay between 0 and the
+        exponential backoff for the attempt is used.
+
+        :param attempt: Number of attempts made so far
+        :param response: Response of the failed attempt, if any
+        :return: Number of seconds to wait
+        """
+
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+
+            if delay is not None:
+                return min(max(delay, 0.0), self.max_backoff)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1))))
+
+    def call(self, key: str, send: Callable[[], requests.Response],
+             retry_if: Callable[[requests.Response | None, Exception | None], bool] = None) -> requests.Response:
+        """
+        Sends a request through the circuit breaker of its endpoint, retrying it on transient failures.
+
+        If the request still fails after the last retry, the last response is returned or the last exception is
+        raised.
+
+        :param key: Endpoint key of the request, used to select its circuit
+        :param send: Function which sends the request and returns its response
+        :param retry_if: Function which receives the failed response or exception, and returns True if the
+                         request may be sent again. If not specified, the request is never retried.
+        :return: requests.Response object
+        """
+
+        attempt = 0
+
+        while True:
+            self.breaker.before_request(key)
+            attempt += 1
+            response, error = None, None
+
+            try:
+                response = send()
+            except SSLError:
+                # the endpoint is reachable, but certificate issues will not go away on a retry
+                self.breaker.record_success(key)
+                raise
+            except (ConnectionError, Timeout) as ex:
+                error = ex
+            finally:
+                # any other exception says nothing about the endpoint, but must not leave its circuit stuck open
+                if response is None and error is None:
+                    self.breaker.end_trial(key)
+
+            if error is not None or response.status_code in RetryPolicy.FAILURE_STATUSES:
+                self.breaker.record_failure(key)
+            else:
+                self.breaker.record_success(key)
+
+            transient = error is not None or response.status_code in RetryPolicy.RETRY_STATUSES
+
+            if not transient or attempt > self.max_retries or retry_if is None or not retry_if(response, error):
+                if error is not None:
+                    raise error
+
+                return response
+
+            time.sleep(self.backoff(attempt, response))
+
+
+# shared retry policy used by every HTTPRequestBuilder within this process
+RETRY_POLICY = RetryPolicy()
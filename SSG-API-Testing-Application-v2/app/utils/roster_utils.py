@@ -0,0 +1,239 @@
+"""
+This file contains functions and classes used for streaming large rosters of trainees from CSV or Excel files, and
+for writing out the outcome of processing every row of a roster.
+"""
+
+import csv
+import io
+import os
+
+from typing import Any, BinaryIO, Iterable, Iterator, TextIO
+
+
+# file extensions which are read as Excel workbooks instead of CSV files
+EXCEL_EXTENSIONS: tuple[str, ...] = (".xlsx", ".xlsm")
+
+
+def _cell(value: Any) -> Any:
+    """
+    Normalises the value of a cell, stripping strings and converting empty cells to None.
+
+    :param value: Value of the cell
+    :return: Normalised value
+    """
+
+    if isinstance(value, str):
+        value = value.strip()
+        return value if len(value) > 0 else None
+
+    return value
+
+
+def _rows(header: Iterable[Any], rows: Iterable[Iterable[Any]]) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Pairs up every row with the header of the roster, skipping rows which are completely empty.
+
+    :param header: Column names of the roster
+    :param rows: Iterable of rows, each of which is an iterable of cell values
+    :return: Iterator of the line number of every row, starting from 2 as line 1 is the header, and the row itself
+    """
+
+    columns = [str(_cell(name) or "") for name in header]
+
+    for line, row in enumerate(rows, start=2):
+        values = [_cell(value) for value in row]
+
+        if all(value is None for value in values):
+            continue
+
+        yield line, {column: value for column, value in zip(columns, values) if len(column) > 0}
+
+
+def read_roster(source: str | BinaryIO | TextIO, sheet: str = None, excel: bool = None) \
+        -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Reads a roster from a CSV or Excel file one row at a time, so that rosters of any size can be read without
+    holding the whole roster in memory.
+
+    Excel workbooks require openpyxl, which is only imported when a workbook is read.
+
+    :param source: Path to the roster, or a file-like object such as a file uploaded through Streamlit
+    :param sheet: Name of the worksheet to read from an Excel workbook. If not specified, the active worksheet is read
+    :param excel: True if the roster is an Excel workbook. If not specified, this is inferred from the file extension
+    :return: Iterator of the line number and the row of every non-empty row, where each row maps the column names
+             found in the header to the values of the cells
+    """
+
+    if not isinstance(source, str) and not hasattr(source, "read"):
+        raise ValueError("Roster must be a path or a file-like object!")
+
+    if excel is None:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        excel = isinstance(name, str) and os.path.splitext(name)[1].lower() in EXCEL_EXTENSIONS
+
+    if excel:
+        yield from _read_excel(source, sheet)
+    else:
+        yield from _read_csv(source)
+
+
+def _read_csv(source: str | BinaryIO | TextIO) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Reads a roster from a CSV file one row at a time.
+
+    :param source: Path to the CSV file, or a file-like object
+    :return: Iterator of the line number and the row of every non-empty row
+    """
+
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8-sig", newline="") as file:
+            yield from _read_csv(file)
+
+        return
+
+    if isinstance(source.read(0), str):
+        yield from _rows_with_header(csv.reader(source))
+        return
+
+    # files uploaded through Streamlit are binary, so they are decoded as they are read
+    stream = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+    try:
+        yield from _rows_with_header(csv.reader(stream))
+    finally:
+        # leave the file open for the caller, as closing the wrapper would close the file too
+        stream.detach()
+
+
+def _rows_with_header(rows: Iterator[Iterable[Any]]) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Takes the first row as the header of the roster and pairs it up with every row that follows.
+
+    :param rows: Iterator of rows, starting with the header
+    :return: Iterator of the line number and the row of every non-empty row
+    """
+
+    try:
+        header = next(rows)
+    except StopIteration:
+        return
+
+    yield from _rows(header, rows)
+
+
+def _read_excel(source: str | BinaryIO, sheet: str = None) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Reads a roster from an Excel workbook one row at a time.
+
+    :param source: Path to the workbook, or a binary file-like object
+    :param sheet: Name of the worksheet to read. If not specified, the active worksheet is read
+    :return: Iterator of the line number and the row of every non-empty row
+    """
+
+    try:
+        import openpyxl
+    except ImportError as ex:
+        raise ImportError("openpyxl is required to read Excel rosters! Install it with pip install openpyxl.") \
+            from ex
+
+    # read-only workbooks load rows lazily instead of parsing the whole sheet up front
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+    try:
+        worksheet = workbook[sheet] if sheet is not None else workbook.active
+        yield from _rows_with_header(worksheet.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+class RosterResultWriter:
+    """
+    Writes the outcome of processing every row of a roster to a CSV file as soon as it is known, so that the results
+    of a large roster never need to be held in memory, and the results written so far survive an interrupted run.
+    """
+
+    # column names of the result file
+    COLUMNS: tuple[str, ...] = ("line", "status", "reference", "error")
+
+    # statuses written to the result file
+    SUCCESS: str = "SUCCESS"
+    FAILED: str = "FAILED"
+
+    # number of rows to write before flushing the result file
+    FLUSH_EVERY: int = 100
+
+    def __init__(self, destination: str | TextIO, flush_every: int = FLUSH_EVERY):
+        """
+        Initialises the writer and writes the header of the result file.
+
+        :param destination: Path to the result file, or a text file-like object
+        :param flush_every: Number of rows to write before flushing the result file
+        """
+
+        if not isinstance(destination, str) and not hasattr(destination, "write"):
+            raise ValueError("Destination must be a path or a file-like object!")
+
+        if not isinstance(flush_every, int) or flush_every < 1:
+            raise ValueError("Flush interval must be a positive integer!")
+
+        self._owned = isinstance(destination, str)
+        self._file = open(destination, "w", encoding="utf-8", newline="") if self._owned else destination
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(RosterResultWriter.COLUMNS)
+        self.flush_every = flush_every
+        self._pending = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def success(self, line: int, reference: str = None) -> None:
+        """
+        Writes a row which was processed successfully.
+
+        :param line: Line number of the row within the roster
+        :param reference: Reference number returned for the row, if any
+        """
+
+        self.succeeded += 1
+        self._write(line, RosterResultWriter.SUCCESS, reference, None)
+
+    def failure(self, line: int, error: str) -> None:
+        """
+        Writes a row which could not be processed.
+
+        :param line: Line number of the row within the roster
+        :param error: Reason why the row could not be processed
+        """
+
+        self.failed += 1
+        self._write(line, RosterResultWriter.FAILED, None, error)
+
+    def _write(self, line: int, status: str, reference: str | None, error: str | None) -> None:
+        """
+        Writes a row to the result file, flushing the file once enough rows have been written.
+
+        :param line: Line number of the row within the roster
+        :param status: Status of the row
+        :param reference: Reference number returned for the row, if any
+        :param error: Reason why the row could not be processed, if any
+        """
+
+        self._writer.writerow([line, status, reference or "", error or ""])
+        self._pending += 1
+
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self) -> None:
+        """Flushes the result file, and closes it if it was opened by the writer."""
+
+        self._file.flush()
+
+        if self._owned:
+            self._file.close()
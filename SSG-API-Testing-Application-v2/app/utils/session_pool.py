@@ -0,0 +1,209 @@
+"""
+This file contains the SessionPool class, which is used to reuse keep-alive HTTP sessions across requests made
+to the same API endpoint with the same client certificate.
+"""
+
+import threading
+import time
+
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import certifi
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """
+    Process-wide pool of requests.Session objects keyed by (cert_pem, key_pem, endpoint host).
+
+    Each session keeps its TCP connections alive, so that consecutive requests made with the same certificate and
+    private key to the same host skip the mutual-TLS handshake. Sessions are evicted in least-recently-used order
+    once the pool is full, or once they have been idle for longer than the configured idle timeout.
+
+    A session is checked out by get() until it is handed back with release(). An evicted session is removed from the
+    pool straight away, but it is only closed once every thread which checked it out has released it, so that
+    requests which are still using it are not cut off.
+    """
+
+    # maximum number of sessions (i.e. unique cert/key/host combinations) to keep alive at any point in time
+    MAX_SESSIONS: int = 16
+
+    # maximum number of connections each session can keep alive per host
+    POOL_MAXSIZE: int = 16
+
+    # number of seconds a session can stay unused before it is closed and removed from the pool
+    IDLE_TIMEOUT: float = 300.0
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, pool_maxsize: int = POOL_MAXSIZE,
+                 idle_timeout: float = IDLE_TIMEOUT):
+        """
+        Initialises the session pool.
+
+        :param max_sessions: Maximum number of sessions to keep in the pool
+        :param pool_maxsize: Maximum number of connections to keep alive within each session
+        :param idle_timeout: Number of seconds a session may remain unused before it is evicted
+        """
+
+        self._sessions: OrderedDict[tuple[str, str, str], tuple[requests.Session, float]] = OrderedDict()
+        self._checked_out: dict[requests.Session, int] = {}
+        self._retired: set[requests.Session] = set()
+        self._lock = threading.Lock()
+        self.configure(max_sessions, pool_maxsize, idle_timeout)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def configure(self, max_sessions: int = None, pool_maxsize: int = None, idle_timeout: float = None) -> None:
+        """
+        Changes the configuration of the pool. Fields that are not specified are left untouched.
+
+        Sessions that are already in the pool keep the connection pool size that they were created with.
+
+        :param max_sessions: Maximum number of sessions to keep in the pool
+        :param pool_maxsize: Maximum number of connections to keep alive within each session
+        :param idle_timeout: Number of seconds a session may remain unused before it is evicted
+        """
+
+        if max_sessions is not None:
+            if not isinstance(max_sessions, int) or max_sessions < 1:
+                raise ValueError("Maximum number of sessions must be a positive integer!")
+
+            self.max_sessions = max_sessions
+
+        if pool_maxsize is not None:
+            if not isinstance(pool_maxsize, int) or pool_maxsize < 1:
+                raise ValueError("Connection pool size must be a positive integer!")
+
+            self.pool_maxsize = pool_maxsize
+
+        if idle_timeout is not None:
+            if not isinstance(idle_timeout, (int, float)) or idle_timeout <= 0:
+                raise ValueError("Idle timeout must be a positive number!")
+
+            self.idle_timeout = idle_timeout
+
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def get(self, cert_pem: str, key_pem: str, endpoint: str) -> requests.Session:
+        """
+        Returns the session to use for sending a request to the endpoint with the given certificate and private key,
+        creating one if there is no such session in the pool. The session is checked out until it is handed back with
+        release().
+
+        :param cert_pem: Path to the certificate file
+        :param key_pem: Path to the private key file
+        :param endpoint: Endpoint URL which the request will be sent to
+        :return: requests.Session object
+        """
+
+        if not isinstance(endpoint, str) or len(endpoint) == 0:
+            raise ValueError("Endpoint must be a non-empty string!")
+
+        key = (cert_pem, key_pem, urlparse(endpoint).netloc)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict(now)
+
+            if key in self._sessions:
+                session, _ = self._sessions.pop(key)
+            else:
+                session = self._create_session(cert_pem, key_pem)
+
+            # reinserting the session moves it to the back of the LRU ordering
+            self._sessions[key] = (session, now)
+            self._checked_out[session] = self._checked_out.get(session, 0) + 1
+            self._evict(now)
+
+        return session
+
+    def release(self, session: requests.Session) -> None:
+        """
+        Hands back a session checked out by get(), closing it if it was evicted while checked out and no other thread
+        is still using it. Sessions which did not come from the pool are ignored.
+
+        :param session: requests.Session object returned by get()
+        """
+
+        with self._lock:
+            users = self._checked_out.get(session)
+
+            if users is None:
+                return
+
+            if users > 1:
+                self._checked_out[session] = users - 1
+                return
+
+            del self._checked_out[session]
+
+            if session not in self._retired:
+                return
+
+            self._retired.remove(session)
+
+        session.close()
+
+    def clear(self) -> None:
+        """Closes all sessions in the pool and removes them. Sessions which are checked out are closed on release."""
+
+        with self._lock:
+            while self._sessions:
+                _, (session, _) = self._sessions.popitem(last=False)
+                self._retire(session)
+
+    def _create_session(self, cert_pem: str, key_pem: str) -> requests.Session:
+        """
+        Creates a new session which presents the given certificate and private key to the server.
+
+        :param cert_pem: Path to the certificate file
+        :param key_pem: Path to the private key file
+        :return: requests.Session object
+        """
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.verify = certifi.where()
+        session.cert = (cert_pem, key_pem)
+
+        return session
+
+    def _evict(self, now: float) -> None:
+        """
+        Removes sessions that have been idle for too long or that exceed the size of the pool.
+        Must be called while holding the lock.
+
+        :param now: Current monotonic time
+        """
+
+        for key in [k for k, (_, last_used) in self._sessions.items() if now - last_used > self.idle_timeout]:
+            session, _ = self._sessions.pop(key)
+            self._retire(session)
+
+        while len(self._sessions) > self.max_sessions:
+            _, (session, _) = self._sessions.popitem(last=False)
+            self._retire(session)
+
+    def _retire(self, session: requests.Session) -> None:
+        """
+        Closes a session which was removed from the pool, or defers closing it until it is released if it is checked
+        out. Must be called while holding the lock.
+
+        :param session: requests.Session object which was removed from the pool
+        """
+
+        if session in self._checked_out:
+            self._retired.add(session)
+        else:
+            session.close()
+
+
+# shared pool used by every HTTPRequestBuilder within this process
+SESSION_POOL = SessionPool()
@@ -4,10 +4,14 @@ This file contains utility functions and values to initialise Streamlit session
 
 import os
 from tempfile import NamedTemporaryFile
+
+import requests
 import streamlit as st
 
-from typing import Union
+from typing import Callable, Iterable, Union
+from app.core.mirror.local_store import LocalStore, MirroredTable, shared_store
 from app.core.system.logger import Logger
+from app.utils.export_utils import export_pages
 from app.utils.string_utils import StringBuilder
 
 from app.core.constants import Endpoints  # noqa: E402
@@ -161,6 +165,119 @@ def validation_error_handler(errors: list[str], warnings: list[str]) -> bool:
     return len(errors) == 0
 
 
+def export_search_results(pages: Callable[[], Iterable[list[dict]]], file_format: str, file_name: str,
+                          key: str) -> None:
+    """
+    Exports every page of a search to a CSV or Parquet file, and shows a button to download the file.
+
+    :param pages: Function which returns the pages of the search, such as the pages() of a PageIterator
+    :param file_format: "csv" or "parquet"
+    :param file_name: Name of the downloaded file, without its extension
+    :param key: Key of the download button
+    """
+
+    destination = NamedTemporaryFile(suffix=f".{file_format}", delete=False)
+    destination.close()
+
+    try:
+        with st.spinner("Exporting search results..."):
+            try:
+                rows = export_pages(pages(), destination.name, file_format)
+            except (ImportError, ValueError, requests.RequestException) as ex:
+                LOGGER.error(f"Unable to export search results! Error: {ex}")
+                st.error(f"Unable to export search results! {ex}", icon="🚨")
+                return
+
+        LOGGER.info(f"Exported {rows} search results")
+        st.success(f"{rows} records exported!")
+
+        # the download button keeps its own copy of the contents, so the file is no longer needed once it is read
+        with open(destination.name, "rb") as file:
+            st.download_button("Download Export", file, file_name=f"{file_name}.{file_format}",
+                               mime="text/csv" if file_format == "csv" else "application/octet-stream", key=key)
+    finally:
+        os.remove(destination.name)
+
+
+def mirror_store(uen: str = None) -> LocalStore:
+    """
+    Returns the local store holding the records fetched from the API endpoint of the session for a training partner.
+
+    :param uen: UEN of the training partner. If not specified, the UEN of the session is used
+    :return: LocalStore
+    """
+
+    endpoint = st.session_state["url"].value if not does_not_have_url() else None
+    return shared_store(endpoint, uen or st.session_state.get("uen") or None)
+
+
+def display_local_record(table: MirroredTable, reference_number: str, uen: str = None) -> None:
+    """
+    Shows the copy of a record held in the local store of the endpoint of the session and the training partner, if
+    there is one, so that it can be looked at without calling the API.
+
+    :param table: Table of the local store holding the record
+    :param reference_number: Reference number of the record
+    :param uen: UEN of the training partner. If not specified, the UEN of the session is used
+    """
+
+    if reference_number is None or len(reference_number) == 0:
+        return
+
+    store = mirror_store(uen)
+    record = store.get(table, reference_number)
+
+    if record is not None:
+        synced_at = store.synced_at(table)
+        label = f"Local Copy (synced {synced_at:%Y-%m-%d %H:%M} UTC)" if synced_at is not None else "Local Copy"
+
+        with st.expander(label):
+            st.json(record)
+
+
+def warn_if_enrolled(trainee_id: str, course_run_id: str, uen: str = None) -> None:
+    """
+    Warns if the local store of the endpoint of the session and the training partner shows that a trainee already
+    has an active enrolment on a course run, which the API would reject a new enrolment for.
+
+    :param trainee_id: ID of the trainee
+    :param course_run_id: ID of the course run
+    :param uen: UEN of the training partner. If not specified, the UEN of the session is used
+    """
+
+    if not trainee_id or not course_run_id:
+        return
+
+    reference = mirror_store(uen).active_enrolment(trainee_id, course_run_id)
+
+    if reference is not None:
+        st.warning(f"According to the local mirror, this trainee already has enrolment {reference} on course run "
+                   f"{course_run_id}! Sync the mirror from the Search Enrolment tab if this is out of date.",
+                   icon="⚠️")
+
+
+def warn_if_not_enrolled(trainee_id: str, course_run_id: str, uen: str = None) -> None:
+    """
+    Warns if the local store of the endpoint of the session and the training partner holds the enrolments of a
+    course run, but none of them is an active enrolment of a trainee, as assessments can only be created for trainees
+    enrolled on the course run.
+
+    :param trainee_id: ID of the trainee
+    :param course_run_id: ID of the course run
+    :param uen: UEN of the training partner. If not specified, the UEN of the session is used
+    """
+
+    if not trainee_id or not course_run_id:
+        return
+
+    store = mirror_store(uen)
+
+    if len(store.find(LocalStore.ENROLMENTS, course_run_id=course_run_id, limit=1)) > 0 \
+            and store.active_enrolment(trainee_id, course_run_id) is None:
+        st.warning(f"According to the local mirror, this trainee is not enrolled on course run {course_run_id}! "
+                   "Sync the mirror from the Search Enrolment tab if this is out of date.", icon="⚠️")
+
+
 def does_not_have_encryption_key() -> bool:
     """Returns true if user encryption key is missing"""
     return ("encryption_key" not in st.session_state
@@ -4,6 +4,9 @@ This file contains verification functions for fields in the Sample Application.
 
 import re
 
+from typing import Iterable
+
+import numpy as np
 import OpenSSL.crypto
 
 
@@ -18,6 +21,21 @@ class Validators:
     _G_F_CHECKDIGIT = ["K", "L", "M", "N", "P", "Q", "R", "T", "U", "W", "X"]
     _M_CHECKDIGIT = ["K", "L", "J", "N", "P", "Q", "R", "T", "U", "W", "X"]
 
+    # combinations of entity type codes which may appear in a UEN of the third format
+    _UEN_ENTITY_TYPES = ["CC", "CD", "CH", "CL", "CM", "CP", "CS", "CX", "DP", "FB", "FC", "FM", "FN", "GA", "GB", "GS",
+                         "HC", "HS", "LL", "LP", "MB", "MC", "MD", "MH", "MM", "MQ", "NB", "NR", "PA", "PB", "PF", "RF",
+                         "RP", "SM", "SS", "TC", "TU", "VH", "XL"]
+
+    # patterns for each UEN format, compiled once
+    _UEN_BUSINESS = re.compile(r"[0-9]{8}[A-Z]{1}")
+    _UEN_LOCAL_COMPANY = re.compile(r"[0-9]{9}[A-Z]{1}")
+    _UEN_OTHERS = re.compile(r"T[0-9]{2}(" + "|".join(_UEN_ENTITY_TYPES) + r")[0-9]{4}[A-Z]{1}")
+
+    _EMAIL = re.compile(r"^[^@]+@[^@]+\.[^@]+")
+
+    # maximum number of digits in a phone number
+    PHONE_MAX_LENGTH: int = 20
+
     @staticmethod
     def verify_uen(uen: str) -> bool:
         """
@@ -48,12 +66,11 @@ class Validators:
             return False
 
         if len(uen) == 9:
-            return True if re.compile(r"[0-9]{8}[A-Z]{1}").match(uen) else False
+            return True if Validators._UEN_BUSINESS.match(uen) else False
 
         if len(uen) == 10:
-            match1 = re.compile(r"[0-9]{9}[A-Z]{1}").match(uen)
-            match2 = re.compile(r"T[0-9]{2}(CC|CD|CH|CL|CM|CP|CS|CX|DP|FB|FC|FM|FN|GA|GB|GS|HC|HS|LL|LP|MB|MC|MD|MH|MM|"
-                                r"MQ|NB|NR|PA|PB|PF|RF|RP|SM|SS|TC|TU|VH|XL)[0-9]{4}[A-Z]{1}").match(uen)
+            match1 = Validators._UEN_LOCAL_COMPANY.match(uen)
+            match2 = Validators._UEN_OTHERS.match(uen)
 
             # if there are no matches, None is returned
             # check the signature of the match() function to verify
@@ -204,4 +221,277 @@ class Validators:
         #     # unable to resolve DNS, might be an internet issue
         #     return False
 
-        return re.match(r"^[^@]+@[^@]+\.[^@]+", email)
+        return Validators._EMAIL.match(email)
+
+    @staticmethod
+    def verify_phone(phone: str) -> bool:
+        """
+        Verifies if an input string is a valid phone number, i.e. made up of only 1 to 20 digits.
+
+        :param phone: Phone number to verify
+        :return: True if the phone number is valid, False otherwise
+        """
+
+        if not isinstance(phone, str):
+            raise ValueError("Phone number must be a string!")
+
+        return 0 < len(phone) <= Validators.PHONE_MAX_LENGTH and all("0" <= char <= "9" for char in phone)
+
+
+class ColumnValidation:
+    """Encapsulates the outcome of validating every value in a column"""
+
+    def __init__(self, valid: np.ndarray, errors: np.ndarray):
+        """
+        Initialises the result.
+
+        :param valid: Boolean mask which is True for every valid row
+        :param errors: Error code of every row, which is an empty string for valid rows
+        """
+
+        self.valid = valid
+        self.errors = errors
+
+    def __repr__(self):
+        return f"ColumnValidation(rows={len(self)}, invalid={len(self.invalid_rows)})"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __len__(self):
+        return len(self.valid)
+
+    @property
+    def ok(self) -> bool:
+        """True if every row in the column is valid"""
+
+        return bool(self.valid.all())
+
+    @property
+    def invalid_rows(self) -> np.ndarray:
+        """Indices of the rows which are not valid"""
+
+        return np.flatnonzero(~self.valid)
+
+
+class BulkValidators:
+    """
+    Validates whole columns of values at once, such as the columns of a roster of trainees being imported.
+
+    Every method gives the same verdict for each row as the matching method in Validators, but computes the NRIC
+    check digits and the phone number checks with vectorised arithmetic over the code points of the column, and
+    reports an error code for each row instead of raising a ValueError on values which are not strings.
+    """
+
+    # error codes reported for invalid rows
+    NOT_STRING: str = "NOT_STRING"
+    INVALID_LENGTH: str = "INVALID_LENGTH"
+    INVALID_FORMAT: str = "INVALID_FORMAT"
+    INVALID_CHECKSUM: str = "INVALID_CHECKSUM"
+
+    # NRIC prefixes mapped to their check digit table and the offset added to their checksum
+    _NRIC_PREFIXES = {"S": (0, 0), "T": (0, 4), "F": (1, 0), "G": (1, 4), "M": (2, 3)}
+    _NRIC_WEIGHTS = np.array(Validators._NRIC_PRODUCT, dtype=np.int64)
+    _NRIC_CHECKDIGITS = np.array([[ord(char) for char in table]
+                                  for table in (Validators._S_T_CHECKDIGIT, Validators._G_F_CHECKDIGIT,
+                                                Validators._M_CHECKDIGIT)], dtype=np.uint32)
+
+    @staticmethod
+    def _column(values: Iterable) -> np.ndarray:
+        """
+        Converts a column into a one-dimensional NumPy array, without splitting up values that are sequences.
+
+        :param values: List, NumPy array or other iterable of values
+        :return: One-dimensional NumPy array
+        """
+
+        if isinstance(values, np.ndarray):
+            if values.ndim != 1:
+                raise ValueError("Column must be one-dimensional!")
+
+            return values
+
+        if isinstance(values, (str, bytes)) or not isinstance(values, Iterable):
+            raise ValueError("Column must be an iterable of values!")
+
+        items = list(values)
+        column = np.empty(len(items), dtype=object)
+        column[:] = items
+
+        return column
+
+    @staticmethod
+    def _lengths(column: np.ndarray) -> np.ndarray:
+        """
+        Returns the length of every string in the column, or -1 for values which are not strings.
+
+        :param column: One-dimensional NumPy array
+        :return: Array of lengths
+        """
+
+        if column.dtype.kind == "U":
+            return np.char.str_len(column).astype(np.int64)
+
+        return np.fromiter((len(value) if isinstance(value, str) else -1 for value in column),
+                           dtype=np.int64, count=len(column))
+
+    @staticmethod
+    def _code_points(strings: np.ndarray, width: int) -> np.ndarray:
+        """
+        Returns the Unicode code points of every string as a matrix with one row per string, padded with zeros.
+
+        :param strings: Array of strings
+        :param width: Number of code points in each row
+        :return: Matrix of code points
+        """
+
+        return np.ascontiguousarray(strings.astype(f"U{width}")).view(np.uint32).reshape(-1, width)
+
+    @staticmethod
+    def _result(lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns an empty mask and error array for a column, with every value that is not a string marked as such.
+
+        :param lengths: Lengths returned by _lengths()
+        :return: Tuple of mask and error array
+        """
+
+        valid = np.zeros(len(lengths), dtype=bool)
+        errors = np.full(len(lengths), "", dtype=object)
+        errors[lengths < 0] = BulkValidators.NOT_STRING
+
+        return valid, errors
+
+    @staticmethod
+    def _nric_error(nric: str) -> str:
+        """
+        Returns the error code of a single NRIC, following the same steps as Validators.verify_nric().
+
+        :param nric: NRIC string of length 9
+        :return: Error code, or an empty string if the NRIC is valid
+        """
+
+        if not all(char.isdecimal() for char in nric[1:8]) or nric[0] not in BulkValidators._NRIC_PREFIXES:
+            return BulkValidators.INVALID_FORMAT
+
+        return "" if Validators.verify_nric(nric) else BulkValidators.INVALID_CHECKSUM
+
+    @staticmethod
+    def validate_nric(values: Iterable) -> ColumnValidation:
+        """
+        Validates a column of NRIC numbers.
+
+        :param values: List, NumPy array or other iterable of NRIC numbers
+        :return: ColumnValidation of the column
+        """
+
+        column = BulkValidators._column(values)
+        lengths = BulkValidators._lengths(column)
+        valid, errors = BulkValidators._result(lengths)
+        errors[(lengths >= 0) & (lengths != 9)] = BulkValidators.INVALID_LENGTH
+
+        rows = np.flatnonzero(lengths == 9)
+        codes = BulkValidators._code_points(column[rows], 9)
+        body = codes[:, 1:8]
+
+        # int() accepts any Unicode decimal digit, so rows with non-ASCII characters are checked one at a time
+        fallback = (body > 127).any(axis=1)
+
+        for row in rows[fallback]:
+            errors[row] = BulkValidators._nric_error(column[row])
+            valid[row] = errors[row] == ""
+
+        rows, codes, body = rows[~fallback], codes[~fallback], body[~fallback]
+
+        table = np.full(len(rows), -1, dtype=np.int64)
+        offset = np.zeros(len(rows), dtype=np.int64)
+
+        for prefix, (index, extra) in BulkValidators._NRIC_PREFIXES.items():
+            matches = codes[:, 0] == ord(prefix)
+            table[matches] = index
+            offset[matches] = extra
+
+        digits = body.astype(np.int64) - ord("0")
+        well_formed = ((digits >= 0) & (digits <= 9)).all(axis=1) & (table >= 0)
+
+        checkdigit = 10 - (digits @ BulkValidators._NRIC_WEIGHTS + offset) % 11
+        expected = BulkValidators._NRIC_CHECKDIGITS[table.clip(0), checkdigit]
+        matched = well_formed & (codes[:, 8] == expected)
+
+        valid[rows] = matched
+        errors[rows[~well_formed]] = BulkValidators.INVALID_FORMAT
+        errors[rows[well_formed & ~matched]] = BulkValidators.INVALID_CHECKSUM
+
+        return ColumnValidation(valid, errors)
+
+    @staticmethod
+    def validate_uen(values: Iterable) -> ColumnValidation:
+        """
+        Validates a column of UENs.
+
+        :param values: List, NumPy array or other iterable of UENs
+        :return: ColumnValidation of the column
+        """
+
+        column = BulkValidators._column(values)
+        lengths = BulkValidators._lengths(column)
+        valid, errors = BulkValidators._result(lengths)
+        errors[(lengths >= 0) & (lengths != 9) & (lengths != 10)] = BulkValidators.INVALID_LENGTH
+
+        for row in np.flatnonzero(lengths == 9):
+            valid[row] = Validators._UEN_BUSINESS.match(column[row]) is not None
+
+        for row in np.flatnonzero(lengths == 10):
+            valid[row] = (Validators._UEN_LOCAL_COMPANY.match(column[row]) is not None
+                          or Validators._UEN_OTHERS.match(column[row]) is not None)
+
+        errors[((lengths == 9) | (lengths == 10)) & ~valid] = BulkValidators.INVALID_FORMAT
+
+        return ColumnValidation(valid, errors)
+
+    @staticmethod
+    def validate_email(values: Iterable) -> ColumnValidation:
+        """
+        Validates a column of emails.
+
+        :param values: List, NumPy array or other iterable of emails
+        :return: ColumnValidation of the column
+        """
+
+        column = BulkValidators._column(values)
+        lengths = BulkValidators._lengths(column)
+        valid, errors = BulkValidators._result(lengths)
+
+        for row in np.flatnonzero(lengths >= 0):
+            valid[row] = Validators._EMAIL.match(column[row]) is not None
+
+        errors[(lengths >= 0) & ~valid] = BulkValidators.INVALID_FORMAT
+
+        return ColumnValidation(valid, errors)
+
+    @staticmethod
+    def validate_phone(values: Iterable) -> ColumnValidation:
+        """
+        Validates a column of phone numbers.
+
+        :param values: List, NumPy array or other iterable of phone numbers
+        :return: ColumnValidation of the column
+        """
+
+        column = BulkValidators._column(values)
+        lengths = BulkValidators._lengths(column)
+        valid, errors = BulkValidators._result(lengths)
+        errors[(lengths == 0) | (lengths > Validators.PHONE_MAX_LENGTH)] = BulkValidators.INVALID_LENGTH
+
+        rows = np.flatnonzero((lengths > 0) & (lengths <= Validators.PHONE_MAX_LENGTH))
+        codes = BulkValidators._code_points(column[rows], Validators.PHONE_MAX_LENGTH)
+
+        # positions beyond the end of each string are padded with zeros, and are not part of the phone number
+        padding = np.arange(Validators.PHONE_MAX_LENGTH) >= lengths[rows][:, None]
+        digits = ((codes >= ord("0")) & (codes <= ord("9"))) | padding
+        matched = digits.all(axis=1)
+
+        valid[rows] = matched
+        errors[rows[~matched]] = BulkValidators.INVALID_FORMAT
+
+        return ColumnValidation(valid, errors)
@@ -4,13 +4,34 @@ from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.backends import default_backend
 from base64 import b64decode, b64encode
 import json
+import os
 from resources import config_path
 
+#cipher built from config.json, together with the modification time of config.json that it was built from
+cachedCipher = None
+cachedConfigTime = None
+
+#-------------------- Description --------------------
+#loadCipher returns the cipher used by doEncryption and doDecryption
+#The key and Initialization Vector are only read from config.json and decoded again when config.json has been modified (e.g. saved from the config window)
+#Each call to encryptor() or decryptor() on the returned cipher creates a fresh encryption or decryption context
+#Output parameter (cachedCipher) : Cipher object built from the key and Initialization Vector in config.json
+#-----------------------------------------------------
+def loadCipher():
+    global cachedCipher, cachedConfigTime
+    configTime = os.path.getmtime(config_path)
+    if cachedCipher is None or configTime != cachedConfigTime:
+        configInfoJson = json.loads(loadFile(config_path))
+        key = b64decode(configInfoJson["key"])
+        cachedCipher = Cipher(algorithms.AES(key), modes.CBC((configInfoJson["IV"]).encode()), backend=default_backend())
+        cachedConfigTime = configTime
+    return cachedCipher
+
 
 
 #-------------------- Description --------------------
 #doEncryption encrypt the payload in Bytes format. This method is used when encryption is required based on the API requirement (Request Encrypted)
-#doEncryption operate with an external Json file (config.json) where it would load the encryption key ("key") and Initialization Vector ("IV") which will be used to encrypt the payload
+#doEncryption operate with an external Json file (config.json) through loadCipher, where it would load the encryption key ("key") and Initialization Vector ("IV") which will be used to encrypt the payload
 #It uses cryptography libraries with a default backend and a preconfigured Initialization Vector - "SSGAPIInitVector"
 #Input parameter (payloadByte) : payload to encrypt in Bytes 
 #Output parameter (ciphertxt_out) : encrypted payload in Bytes
@@ -18,10 +39,7 @@ from resources import config_path
 #-----------------------------------------------------
 def doEncryption(payloadByte):
     #preConfiguration - obtained the required information from config.json file in the folder
-    configInfo = loadFile(config_path)
-    configInfoJson = json.loads(configInfo) 
-    key = b64decode(configInfoJson["key"])
-    cipher = Cipher(algorithms.AES(key), modes.CBC((configInfoJson["IV"]).encode()), backend=default_backend())
+    cipher = loadCipher()
     padder = padding.PKCS7(128).padder()
     
     encryptor = cipher.encryptor()
@@ -32,7 +50,7 @@ def doEncryption(payloadByte):
 
 #-------------------- Description --------------------
 #doDecryption encrypt the payload in Bytes format. This method is used when decryption is required based on the API requirement (Response Encrypted)
-#doDecryption operate with an external Json file (config.json) where it would load the encryption key ("key") and Initialization Vector ("IV") which will be used to decrypt the payload
+#doDecryption operate with an external Json file (config.json) through loadCipher, where it would load the encryption key ("key") and Initialization Vector ("IV") which will be used to decrypt the payload
 #It uses cryptography libraries with a default backend and a preconfigured Initialization Vector - "SSGAPIInitVector"
 #Input parameter (response) : response to decrypt in Bytes 
 #Output parameter (plain) : decrypted response in Bytes
@@ -40,10 +58,7 @@ def doEncryption(payloadByte):
 #-----------------------------------------------------
 def doDecryption(response):
     #preConfiguration - obtained the required information from config.json file in the folder
-    configInfo = loadFile(config_path)
-    configInfoJson = json.loads(configInfo)
-    key = b64decode(configInfoJson["key"])
-    cipher = Cipher(algorithms.AES(key), modes.CBC((configInfoJson["IV"]).encode()), backend=default_backend())
+    cipher = loadCipher()
     unpadder = padding.PKCS7(128).unpadder()
 
     result = b64decode(response)